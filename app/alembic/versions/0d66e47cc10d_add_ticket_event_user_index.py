@@ -0,0 +1,26 @@
+"""Add ticket event/user index
+
+Revision ID: 0d66e47cc10d
+Revises: e050e0c80704
+Create Date: 2026-10-17 21:48:37.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d66e47cc10d'
+down_revision: Union[str, None] = 'e050e0c80704'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tickets_event_id_user_id', 'tickets', ['event_id', 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_event_id_user_id', table_name='tickets')
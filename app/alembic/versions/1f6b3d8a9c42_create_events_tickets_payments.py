@@ -0,0 +1,90 @@
+"""Create Event, Ticket and Payment
+
+Revision ID: 1f6b3d8a9c42
+Revises: 371f97071b82
+Create Date: 2026-10-17 20:55:41.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f6b3d8a9c42'
+down_revision: Union[str, None] = '371f97071b82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the users migration predates the organizer role
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE roletype ADD VALUE IF NOT EXISTS 'organizer'")
+
+    op.create_table('events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=120), nullable=False),
+    sa.Column('description', sa.TEXT(), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('time', sa.Time(), nullable=False),
+    sa.Column('ticked_price', sa.Float(), nullable=False),
+    sa.Column('ticked_count', sa.Integer(), nullable=False),
+    sa.Column('location', sa.String(length=150), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.Enum('not_started', 'counting', 'finished', 'cancelled', name='eventstatus'), server_default='not_started', nullable=False),
+    sa.Column('organizer_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['organizer_id'], ['users.id'], name=op.f('fk_events_organizer_id_users')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_events'))
+    )
+    op.create_index(op.f('ix_events_status'), 'events', ['status'], unique=False)
+    op.create_index(op.f('ix_events_title'), 'events', ['title'], unique=True)
+
+    op.create_table('tickets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('available', 'not_available', name='tickedstatus'), server_default='not_available', nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], name=op.f('fk_tickets_event_id_events')),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_tickets_user_id_users')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_tickets'))
+    )
+    op.create_index(op.f('ix_tickets_status'), 'tickets', ['status'], unique=False)
+
+    op.create_table('payments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('payment_method', sa.Enum('cash', 'card', name='paymentmethod'), server_default='cash', nullable=False),
+    sa.Column('status', sa.Enum('pending', 'approved', 'declined', 'out_of_balance', name='paymentstatus'), server_default='pending', nullable=False),
+    sa.Column('card_number', sa.String(length=16), nullable=True),
+    sa.Column('exp_date', sa.String(length=5), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('ticket_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ticket_id'], ['tickets.id'], name=op.f('fk_payments_ticket_id_tickets')),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_payments_user_id_users')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_payments'))
+    )
+    op.create_index(op.f('ix_payments_payment_method'), 'payments', ['payment_method'], unique=False)
+    op.create_index(op.f('ix_payments_status'), 'payments', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payments_status'), table_name='payments')
+    op.drop_index(op.f('ix_payments_payment_method'), table_name='payments')
+    op.drop_table('payments')
+    op.drop_index(op.f('ix_tickets_status'), table_name='tickets')
+    op.drop_table('tickets')
+    op.drop_index(op.f('ix_events_title'), table_name='events')
+    op.drop_index(op.f('ix_events_status'), table_name='events')
+    op.drop_table('events')
+    sa.Enum(name='paymentstatus').drop(op.get_bind(), checkfirst=False)
+    sa.Enum(name='paymentmethod').drop(op.get_bind(), checkfirst=False)
+    sa.Enum(name='tickedstatus').drop(op.get_bind(), checkfirst=False)
+    sa.Enum(name='eventstatus').drop(op.get_bind(), checkfirst=False)
+    # Postgres can't drop an enum value, organizers are made users
+    op.execute("UPDATE users SET role = 'user' WHERE role = 'organizer'")
@@ -41,4 +41,5 @@ def downgrade() -> None:
     op.drop_index(op.f('ix_users_role'), table_name='users')
     op.drop_index(op.f('ix_users_email'), table_name='users')
     op.drop_table('users')
+    sa.Enum(name='roletype').drop(op.get_bind(), checkfirst=False)
     # ### end Alembic commands ###
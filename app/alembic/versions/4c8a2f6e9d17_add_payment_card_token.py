@@ -0,0 +1,26 @@
+"""Add payments.card_token
+
+Revision ID: 4c8a2f6e9d17
+Revises: b7d3e1f4a2c6
+Create Date: 2026-10-19 11:26:03.771940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8a2f6e9d17'
+down_revision: Union[str, None] = 'b7d3e1f4a2c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('payments', sa.Column('card_token', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('payments', 'card_token')
@@ -0,0 +1,44 @@
+"""Add events.search_vector and its GIN index
+
+Revision ID: 5a7d2e9b4c18
+Revises: c3e91a5f7d20
+Create Date: 2026-10-18 00:31:05.118420
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a7d2e9b4c18'
+down_revision: Union[str, None] = 'c3e91a5f7d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # adding a stored generated column rewrites the table
+    op.add_column(
+        'events',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(category, '')), 'B') || "
+                "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+                "setweight(to_tsvector('simple', coalesce(description, '')), 'C')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index('ix_events_search_vector', 'events', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_events_search_vector', table_name='events', postgresql_using='gin')
+    op.drop_column('events', 'search_vector')
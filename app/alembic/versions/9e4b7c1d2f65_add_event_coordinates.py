@@ -0,0 +1,30 @@
+"""Add events.latitude/longitude and their index
+
+Revision ID: 9e4b7c1d2f65
+Revises: 5a7d2e9b4c18
+Create Date: 2026-10-18 02:12:47.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b7c1d2f65'
+down_revision: Union[str, None] = '5a7d2e9b4c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('events', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('events', sa.Column('longitude', sa.Float(), nullable=True))
+    op.create_index('ix_events_latitude_longitude', 'events', ['latitude', 'longitude'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_events_latitude_longitude', table_name='events')
+    op.drop_column('events', 'longitude')
+    op.drop_column('events', 'latitude')
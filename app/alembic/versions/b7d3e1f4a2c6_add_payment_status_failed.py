@@ -0,0 +1,28 @@
+"""Add the failed Payment status
+
+Revision ID: b7d3e1f4a2c6
+Revises: 9e4b7c1d2f65
+Create Date: 2026-10-19 10:41:12.208337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e1f4a2c6'
+down_revision: Union[str, None] = '9e4b7c1d2f65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ADD VALUE can't run inside a transaction block before Postgres 12
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE paymentstatus ADD VALUE IF NOT EXISTS 'failed'")
+
+
+def downgrade() -> None:
+    # Postgres can't drop an enum value, failed Payments are made declined
+    op.execute("UPDATE payments SET status = 'declined' WHERE status = 'failed'")
@@ -0,0 +1,29 @@
+"""Add events.updated_at
+
+Revision ID: c3e91a5f7d20
+Revises: 8b1f2c6d4a93
+Create Date: 2026-10-17 23:48:37.552109
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e91a5f7d20'
+down_revision: Union[str, None] = '8b1f2c6d4a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing events count as last changed when they were created
+    op.add_column('events', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE events SET updated_at = created_at')
+    op.alter_column('events', 'updated_at', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('events', 'updated_at')
@@ -0,0 +1,32 @@
+"""Add event listing indexes
+
+Revision ID: e050e0c80704
+Revises: 1f6b3d8a9c42
+Create Date: 2026-10-17 21:00:12.408113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e050e0c80704'
+down_revision: Union[str, None] = '1f6b3d8a9c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_events_start_date_id', 'events', ['start_date', 'id'], unique=False)
+    op.create_index('ix_events_status_start_date_id', 'events', ['status', 'start_date', 'id'], unique=False)
+    op.create_index('ix_events_category_start_date_id', 'events', ['category', 'start_date', 'id'], unique=False)
+    op.create_index('ix_events_organizer_id_start_date_id', 'events', ['organizer_id', 'start_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_events_organizer_id_start_date_id', table_name='events')
+    op.drop_index('ix_events_category_start_date_id', table_name='events')
+    op.drop_index('ix_events_status_start_date_id', table_name='events')
+    op.drop_index('ix_events_start_date_id', table_name='events')
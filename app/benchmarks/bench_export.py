@@ -0,0 +1,144 @@
+"""Check that the User export streams in constant memory.
+
+`--rows` users are copied into the test database, then `/users/export` is
+called on the in-process app. The response body is counted and thrown away
+as it arrives, so the peak RSS of the process shows what the export itself
+holds. The run fails if the peak goes over `--max-rss-mb`.
+
+    cd app
+    python -m benchmarks.bench_export --rows 1000000 --max-rss-mb 300
+
+httpx buffers the whole body of an in-process response, so the app is
+called through ASGI directly.
+"""
+
+import asyncio
+import resource
+import time
+from typing import Any
+
+import typer
+from rich import print  # pylint: disable=W0622
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import app_client, create_engine, reset_database
+from database.helpers import copy_records
+from main import app
+from managers.auth import AuthManager
+from models import User
+from utils.enums import RoleType
+
+cli = typer.Typer(rich_markup_mode="rich")
+
+COPY_BATCH = 50_000
+COLUMNS = ["email", "password", "first_name", "last_name", "role", "banned", "verified"]
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident memory of this process so far, in MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed(engine: AsyncEngine, rows: int) -> None:
+    """Copy `rows` users into the database, the first one an admin."""
+    async with AsyncSession(engine) as session, session.begin():
+        for start in range(0, rows, COPY_BATCH):
+            records = [
+                (
+                    f"user{number}@example.com",
+                    "not-a-hash",
+                    "Bench",
+                    "User",
+                    (RoleType.admin if number == 0 else RoleType.user).value,
+                    False,
+                    True,
+                )
+                for number in range(start, min(start + COPY_BATCH, rows))
+            ]
+            await copy_records(session, User.__tablename__, COLUMNS, records)
+
+
+async def export(path: str, token: str) -> tuple[int, int, int]:
+    """Call the export route and return its status, body size and chunk count."""
+    status = 0
+    size = chunks = 0
+    requested = False
+
+    async def receive() -> dict[str, Any]:
+        # send the empty request body once, then wait as a client that
+        # never disconnects
+        nonlocal requested
+        if requested:
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status, size, chunks
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            chunks += 1
+
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    return status, size, chunks
+
+
+async def run(rows: int, file_format: str, max_rss_mb: float) -> None:
+    """Run the benchmark."""
+    engine = create_engine(pool_size=2)
+    await reset_database(engine)
+
+    start = time.perf_counter()
+    await seed(engine, rows)
+    print(f"seeded {rows} users in {time.perf_counter() - start:.1f}s, peak RSS {peak_rss_mb():.0f} MiB")
+
+    token = AuthManager.encode_token(User(id=1))
+    # the client sets the dependency overrides to the bench engine
+    async with app_client(engine):
+        before = peak_rss_mb()
+        start = time.perf_counter()
+        status, size, chunks = await export(f"/users/export?format={file_format}", token)
+        elapsed = time.perf_counter() - start
+
+    await engine.dispose()
+
+    assert status == 200, status  # noqa: PLR2004
+    peak = peak_rss_mb()
+    print(
+        f"exported {size / 2**20:.0f} MiB in {chunks} chunks in {elapsed:.1f}s "
+        f"({rows / elapsed:,.0f} rows/s), peak RSS {before:.0f} -> {peak:.0f} MiB"
+    )
+    if peak > max_rss_mb:
+        print(f"[red]peak RSS {peak:.0f} MiB is over the {max_rss_mb:.0f} MiB ceiling[/red]")
+        raise typer.Exit(1)
+
+
+@cli.command()
+def main(
+    rows: int = typer.Option(1_000_000, help="Users to seed and export."),
+    file_format: str = typer.Option("ndjson", "--format", help="ndjson or csv."),
+    max_rss_mb: float = typer.Option(300, help="Fail if the process' peak RSS goes over this."),
+) -> None:
+    """Export a large User table and check the memory ceiling."""
+    asyncio.run(run(rows, file_format, max_rss_mb))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,163 @@
+"""Time the radius search of events on a large table.
+
+`--events` events are copied into the test database, half of them spread
+over the world and half around a few cities, like real venues. Then
+`/events/nearby` is called through the in-process app around random cities
+and the latency percentiles and the plan of one query are printed.
+
+    cd app
+    python -m benchmarks.bench_nearby --events 1000000
+"""
+
+import asyncio
+import random
+import time
+from datetime import date, datetime, time as t
+
+import typer
+from rich import print  # pylint: disable=W0622
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import app_client, create_engine, reset_database
+from database.helpers import EventDB, copy_records
+from models import Event, User
+from utils.enums import EventStatus, RoleType
+
+cli = typer.Typer(rich_markup_mode="rich")
+
+COPY_BATCH = 50_000
+COLUMNS = [
+    "title",
+    "description",
+    "category",
+    "start_date",
+    "end_date",
+    "time",
+    "ticked_price",
+    "ticked_count",
+    "location",
+    "latitude",
+    "longitude",
+    "organizer_id",
+    "created_at",
+    "updated_at",
+    "status",
+]
+CITIES = {
+    "Tashkent": (41.2995, 69.2401),
+    "Samarkand": (39.6542, 66.9597),
+    "London": (51.5072, -0.1276),
+    "New York": (40.7128, -74.0060),
+    "Tokyo": (35.6762, 139.6503),
+    "Suva": (-18.1416, 178.4419),
+}
+
+
+async def seed(engine: AsyncEngine, events: int) -> None:
+    """Copy an organizer and `events` events into the database."""
+    rng = random.Random(42)
+    now = datetime.now()
+    cities = list(CITIES.items())
+
+    def place() -> tuple[str, float, float]:
+        if rng.random() < 0.5:  # noqa: PLR2004
+            return "Somewhere", rng.uniform(-60, 70), rng.uniform(-180, 180)
+        name, (lat, lon) = rng.choice(cities)
+        return name, lat + rng.gauss(0, 0.3), lon + rng.gauss(0, 0.3)
+
+    async with AsyncSession(engine) as session, session.begin():
+        session.add(
+            User(
+                email="organizer@example.com",
+                password="not-a-hash",
+                first_name="Bench",
+                last_name="Organizer",
+                role=RoleType.organizer,
+                verified=True,
+            )
+        )
+        await session.flush()
+        await session.execute(text("DROP INDEX ix_events_latitude_longitude"))
+        for start in range(0, events, COPY_BATCH):
+            records = [
+                (
+                    f"Event #{number}",
+                    "Benchmark event",
+                    "Concerts",
+                    date(2025, 1, 1 + number % 28),
+                    date(2025, 2, 1),
+                    t(18, 0),
+                    10.0,
+                    100,
+                    *place(),
+                    1,
+                    now,
+                    now,
+                    EventStatus.not_started.value,
+                )
+                for number in range(start, min(start + COPY_BATCH, events))
+            ]
+            await copy_records(session, Event.__tablename__, COLUMNS, records)
+        await session.execute(text("CREATE INDEX ix_events_latitude_longitude ON events (latitude, longitude)"))
+    async with engine.connect() as conn:
+        await conn.execute(text("COMMIT"))
+        await conn.execute(text("VACUUM ANALYZE events"))
+
+
+def report(name: str, latencies: list[float]) -> None:
+    """Print the percentiles of a list of latencies in milliseconds."""
+    ordered = sorted(latencies)
+
+    def percentile(p: int) -> float:
+        return ordered[min(len(ordered) - 1, len(ordered) * p // 100)]
+
+    print(f"{name:>10}: p50 {percentile(50):7.2f}ms, p95 {percentile(95):7.2f}ms, max {ordered[-1]:7.2f}ms")
+
+
+async def run(events: int, queries: int) -> None:
+    """Run the benchmark."""
+    engine = create_engine(pool_size=2)
+    await reset_database(engine)
+
+    start = time.perf_counter()
+    await seed(engine, events)
+    print(f"seeded {events} events in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(7)
+    async with app_client(engine) as client:
+        for radius_km in (5, 20, 100):
+            latencies = []
+            found = 0
+            for _ in range(queries):
+                lat, lon = rng.choice(list(CITIES.values()))
+                params = {"lat": lat, "lon": lon, "radius_km": radius_km, "limit": 20}
+                started = time.perf_counter()
+                response = await client.get("/events/nearby", params=params)
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.text  # noqa: PLR2004
+                found += len(response.json()["items"])
+            report(f"{radius_km} km", latencies)
+            print(f"{'':>10}  {found / queries:.1f} results/page")
+
+    query = EventDB.nearby_query(*CITIES["Tashkent"], 20).limit(21)
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    async with engine.connect() as conn:
+        plan = await conn.execute(text(f"EXPLAIN ANALYZE {sql}"))
+        print("\n".join(row[0] for row in plan))
+
+    await engine.dispose()
+
+
+@cli.command()
+def main(
+    events: int = typer.Option(1_000_000, help="Events to seed and search."),
+    queries: int = typer.Option(200, help="Searches per radius."),
+) -> None:
+    """Measure the latency of the radius search."""
+    asyncio.run(run(events, queries))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,121 @@
+"""Measure event-loop latency of an unrelated route during a login burst.
+
+One user is registered in the test database, then `--logins` concurrent
+POST /login/ requests are fired at the in-process app while GET / is polled.
+The latency of GET / should stay flat while the logins run, because bcrypt
+runs on the password hashing pool and not on the event loop. Pass `--inline`
+to hash on the event loop instead and see the difference.
+
+    cd app
+    python -m benchmarks.bench_password_hasher --logins 100
+    python -m benchmarks.bench_password_hasher --logins 100 --inline
+"""
+
+import asyncio
+import statistics
+import time
+
+import typer
+from httpx import AsyncClient
+from rich import print  # pylint: disable=W0622
+
+import managers.user
+from benchmarks.common import app_client, create_engine, reset_database
+from managers.password import pwd_context
+
+TEST_USER = {
+    "email": "benchmark@example.com",
+    "password": "test12345!",
+    "first_name": "Bench",
+    "last_name": "Mark",
+}
+
+cli = typer.Typer(rich_markup_mode="rich")
+
+
+class InlineHasher:
+    """Hash on the event loop, like the code did before the hashing pool."""
+
+    async def hash(self, password: str) -> str:
+        """Return the hash of a password."""
+        return pwd_context.hash(password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Return True if the password matches the hash."""
+        return pwd_context.verify(password, hashed)
+
+
+async def poll(client: AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    """Request GET / every `interval` seconds until `stop` is set.
+
+    The latency includes any delay in waking up from the sleep, so time the
+    event loop spends blocked shows up in the numbers.
+    """
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        await client.get("/")
+        latencies.append((time.perf_counter() - start - interval) * 1000)
+    return latencies
+
+
+def summary(latencies: list[float]) -> str:
+    """Format the latency percentiles in milliseconds."""
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (
+        f"n={len(ordered)} p50={statistics.median(ordered):.1f}ms "
+        f"p99={p99:.1f}ms max={ordered[-1]:.1f}ms"
+    )
+
+
+async def run(logins: int, inline: bool, interval: float) -> None:
+    """Run the benchmark."""
+    engine = create_engine(max_overflow=logins)
+    await reset_database(engine)
+
+    if inline:
+        managers.user.password_hasher = InlineHasher()
+
+    async with app_client(engine) as client:
+        await client.post("/register/", json=TEST_USER)
+
+        stop = asyncio.Event()
+        idle = asyncio.create_task(poll(client, stop, interval))
+        await asyncio.sleep(1)
+        stop.set()
+        idle_latencies = await idle
+
+        stop = asyncio.Event()
+        busy = asyncio.create_task(poll(client, stop, interval))
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.post("/login/", json={"email": TEST_USER["email"], "password": TEST_USER["password"]})
+              for _ in range(logins))
+        )
+        burst = time.perf_counter() - start
+        stop.set()
+        busy_latencies = await busy
+
+    await engine.dispose()
+
+    failed = sum(response.status_code != 200 for response in responses)  # noqa: PLR2004
+    print(f"[bold]Hashing:[/bold] {'inline on the event loop' if inline else 'worker pool'}")
+    print(f"{logins} logins in {burst:.2f}s ({failed} failed)")
+    print(f"GET / while idle:   {summary(idle_latencies)}")
+    print(f"GET / during burst: {summary(busy_latencies)}")
+
+
+@cli.command()
+def main(
+    logins: int = typer.Option(100, help="Number of concurrent logins."),
+    inline: bool = typer.Option(False, help="Hash on the event loop instead of the pool."),
+    interval: float = typer.Option(0.01, help="Seconds between GET / requests."),
+) -> None:
+    """Measure GET / latency while a burst of logins runs."""
+    asyncio.run(run(logins, inline, interval))
+
+
+if __name__ == "__main__":
+    cli()
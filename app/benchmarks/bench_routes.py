@@ -0,0 +1,437 @@
+"""Measure the throughput, latency and queries of every router.
+
+The test database is seeded with `--users` users, `--events` events and
+`--tickets` tickets (see database/seed.py), then `--requests` requests are
+sent to each route, `--concurrency` at a time. The routes that write use
+the rows made by the ones before them: events are created, then edited,
+tickets are bought for them and then paid for.
+
+The app runs in-process by default. With `--serve` it runs in a uvicorn
+process of its own, and with `--url` the requests go to a server that is
+already running on the test database (restart it before each run, its
+caches don't know the database was reset). The statements per request are
+counted in-process, and read from the Server-Timing header of a server.
+
+Every run is saved as JSON in benchmarks/results, named after the commit,
+and two runs are compared with the `compare` command.
+
+    cd app
+    python -m benchmarks.bench_routes run --requests 500 --concurrency 10
+    python -m benchmarks.bench_routes run --serve --workers 2
+    python -m benchmarks.bench_routes compare benchmarks/results/1a2b3c4.json benchmarks/results/5d6e7f8.json
+"""
+
+import asyncio
+import itertools
+import json
+import re
+import subprocess
+import time
+from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+import httpx
+import typer
+from httpx import AsyncClient, Response
+from rich import print  # pylint: disable=W0622
+from rich.table import Table
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmarks.common import app_client, count_queries, create_engine, percentile, reset_database, uvicorn_server
+from database.seed import CATEGORIES, SeedCounts, Seeder
+from managers.auth import AuthManager
+from managers.password import pwd_context
+from models import Event, User
+from utils.enums import RoleType
+
+cli = typer.Typer(no_args_is_help=True, rich_markup_mode="rich")
+
+RESULTS = Path(__file__).parent / "results"
+PASSWORD = "bench-p@ssw0rd"
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+class Call(NamedTuple):
+    """One request to send."""
+
+    method: str
+    url: str
+    options: dict[str, Any] = {}
+
+
+@dataclass
+class Route:
+    """A route to measure.
+
+    `call(number)` builds the request number `number`, and `keep(number,
+    response)` is given every response with the `expected` status code.
+    """
+
+    name: str
+    expected: int
+    call: Callable[[int], Call]
+    keep: Optional[Callable[[int, Response], None]] = None
+
+
+@dataclass
+class RouteResult:
+    """The measures of one route, latencies in milliseconds."""
+
+    route: str
+    requests: int
+    errors: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    # None when a server doesn't send the Server-Timing header
+    queries_per_request: Optional[float]
+
+
+@dataclass
+class Fixture:
+    """The seeded rows the routes are called with, and the rows they make."""
+
+    admin: str
+    users: list[tuple[int, str]]
+    organizers: list[int]
+    places: list[tuple[float, float]]
+    events: list[tuple[int, int]] = field(default_factory=list)
+    tickets: list[tuple[int, int, int]] = field(default_factory=list)
+
+    @staticmethod
+    def headers(user_id: int) -> dict[str, str]:
+        """Return the Authorization header of a user."""
+        return {"Authorization": f"Bearer {AuthManager.encode_token(User(id=user_id))}"}
+
+
+async def seed(engine: AsyncEngine, counts: SeedCounts) -> Fixture:
+    """Reset and fill the test database, then add an admin."""
+    await reset_database(engine)
+    await Seeder(engine, counts, password_hash=pwd_context.hash(PASSWORD)).run()
+    async with engine.begin() as conn:
+        admin = await conn.scalar(
+            insert(User)
+            .values(
+                email="admin@example.com",
+                password=pwd_context.hash(PASSWORD),
+                first_name="Bench",
+                last_name="Admin",
+                role=RoleType.admin,
+                banned=False,
+                verified=True,
+            )
+            .returning(User.id)
+        )
+        active = (User.banned.is_(False), User.verified.is_(True))
+        users = (await conn.execute(select(User.id, User.email).where(User.role == RoleType.user, *active))).all()
+        organizers = (await conn.scalars(select(User.id).where(User.role == RoleType.organizer, *active))).all()
+        places = (
+            await conn.execute(select(Event.latitude, Event.longitude).where(Event.latitude.is_not(None)).limit(100))
+        ).all()
+    return Fixture(
+        admin=Fixture.headers(admin)["Authorization"],
+        users=[tuple(user) for user in users],
+        organizers=list(organizers),
+        places=[tuple(place) for place in places],
+    )
+
+
+def routes(fixture: Fixture, requests: int) -> list[Route]:  # noqa: C901
+    """Return the routes to measure, in the order they must run."""
+    users, organizers = fixture.users, fixture.organizers
+    admin = {"Authorization": fixture.admin}
+
+    def user(number: int) -> tuple[int, str]:
+        return users[number % len(users)]
+
+    def new_event(number: int) -> Call:
+        organizer = organizers[number % len(organizers)]
+        event = {
+            "title": f"Bench event {number}",
+            "description": "An event made by the route benchmark",
+            "category": CATEGORIES[number % len(CATEGORIES)],
+            "start_date": "2040-01-01",
+            "end_date": "2040-01-02",
+            "time": "19:00:00",
+            "ticked_price": 25,
+            "ticked_count": requests,
+            "location": "Tashkent",
+            "latitude": 41.3111,
+            "longitude": 69.2797,
+        }
+        return Call("POST", "/events/", {"json": event, "headers": Fixture.headers(organizer)})
+
+    def keep_event(number: int, response: Response) -> None:
+        fixture.events.append((response.json()["id"], organizers[number % len(organizers)]))
+
+    def event(number: int) -> tuple[int, int]:
+        return fixture.events[number % len(fixture.events)]
+
+    def keep_ticket(number: int, response: Response) -> None:
+        fixture.tickets.append((response.json()["id"], event(number)[0], user(number)[0]))
+
+    def ticket(number: int) -> tuple[int, int, int]:
+        return fixture.tickets[number % len(fixture.tickets)]
+
+    return [
+        Route(
+            "register",
+            201,
+            lambda number: Call(
+                "POST",
+                "/register/",
+                {
+                    "json": {
+                        "email": f"new.user.{number}@example.com",
+                        "password": PASSWORD,
+                        "first_name": "New",
+                        "last_name": "User",
+                    }
+                },
+            ),
+        ),
+        Route("login", 200, lambda number: Call("POST", "/login/", {"json": {"email": user(number)[1], "password": PASSWORD}})),
+        Route(
+            "refresh",
+            200,
+            lambda number: Call(
+                "POST", "/refresh/", {"json": {"refresh": AuthManager.encode_refresh_token(User(id=user(number)[0]))}}
+            ),
+        ),
+        Route("users_me", 200, lambda number: Call("GET", "/users/me", {"headers": Fixture.headers(user(number)[0])})),
+        Route("users_list", 200, lambda number: Call("GET", "/users/", {"headers": admin})),
+        Route(
+            "events_list",
+            200,
+            lambda number: Call(
+                "GET", "/events/list/", {"params": {"limit": 20, "category": CATEGORIES[number % len(CATEGORIES)]}}
+            ),
+        ),
+        Route(
+            "events_search",
+            200,
+            lambda number: Call("GET", "/events/search", {"params": {"q": CATEGORIES[number % len(CATEGORIES)]}}),
+        ),
+        Route(
+            "events_nearby",
+            200,
+            lambda number: Call(
+                "GET",
+                "/events/nearby",
+                {"params": dict(zip(("lat", "lon"), fixture.places[number % len(fixture.places)]))},
+            ),
+        ),
+        Route("event_create", 201, new_event, keep_event),
+        Route(
+            "event_update",
+            200,
+            lambda number: Call(
+                "PATCH",
+                f"/events/{event(number)[0]}",
+                {"json": {"ticked_price": 25 + number % 10}, "headers": Fixture.headers(event(number)[1])},
+            ),
+        ),
+        Route(
+            "ticket_buy",
+            201,
+            lambda number: Call(
+                "POST", f"/events/{event(number)[0]}/tickets", {"headers": Fixture.headers(user(number)[0])}
+            ),
+            keep_ticket,
+        ),
+        Route(
+            "tickets_mine",
+            200,
+            lambda number: Call("GET", f"/events/{ticket(number)[1]}/tickets", {"headers": Fixture.headers(ticket(number)[2])}),
+        ),
+        Route(
+            "payment_create",
+            201,
+            lambda number: Call(
+                "POST",
+                f"/tickets/{ticket(number)[0]}/payments",
+                {"json": {"payment_method": "cash"}, "headers": Fixture.headers(ticket(number)[2])},
+            ),
+        ),
+        Route(
+            "payments_list",
+            200,
+            lambda number: Call("GET", f"/tickets/{ticket(number)[0]}/payments", {"headers": Fixture.headers(ticket(number)[2])}),
+        ),
+    ]
+
+
+async def measure(
+    client: AsyncClient, route: Route, requests: int, concurrency: int, engine: Optional[AsyncEngine]
+) -> RouteResult:
+    """Send `requests` requests to a route, `concurrency` at a time."""
+    numbers = itertools.count()
+    latencies: list[float] = []
+    failures: list[Response] = []
+    # statements per response, from the Server-Timing header
+    timed: list[int] = []
+
+    async def send() -> None:
+        while (number := next(numbers)) < requests:
+            call = route.call(number)
+            start = time.perf_counter()
+            response = await client.request(call.method, call.url, **call.options)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if match := SERVER_TIMING_QUERIES.search(response.headers.get("Server-Timing", "")):
+                timed.append(int(match.group(1)))
+            if response.status_code != route.expected:
+                failures.append(response)
+            elif route.keep:
+                route.keep(number, response)
+
+    with count_queries(engine) if engine else nullcontext() as statements:
+        start = time.perf_counter()
+        await asyncio.gather(*(send() for _ in range(concurrency)))
+        seconds = time.perf_counter() - start
+
+    if failures:
+        print(f"[red]{route.name}: {len(failures)} errors, first: {failures[0].status_code} {failures[0].text[:200]}")
+    ordered = sorted(latencies)
+    if statements is not None:
+        queries: Optional[float] = len(statements) / requests
+    else:
+        queries = sum(timed) / len(timed) if timed else None
+    return RouteResult(
+        route=route.name,
+        requests=requests,
+        errors=len(failures),
+        seconds=round(seconds, 3),
+        throughput=round(requests / seconds, 1),
+        p50_ms=round(percentile(ordered, 50), 2),
+        p95_ms=round(percentile(ordered, 95), 2),
+        p99_ms=round(percentile(ordered, 99), 2),
+        queries_per_request=round(queries, 2) if queries is not None else None,
+    )
+
+
+@asynccontextmanager
+async def http_client(url: str, concurrency: int) -> AsyncGenerator[AsyncClient, Any]:
+    """Yield a client for a server that runs in another process."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with AsyncClient(base_url=url, timeout=300, limits=limits) as client:
+        yield client
+
+
+def show(result: RouteResult) -> None:
+    """Print the measures of one route."""
+    queries = "-" if result.queries_per_request is None else f"{result.queries_per_request:.1f}"
+    print(
+        f"{result.route:>14} {result.throughput:7.1f} req/s p50 {result.p50_ms:7.2f} "
+        f"p95 {result.p95_ms:7.2f} p99 {result.p99_ms:7.2f}ms {queries:>4} q/req"
+    )
+
+
+def git_commit() -> tuple[str, bool]:
+    """Return the current commit and whether the tree has uncommitted changes."""
+    try:
+        commit = subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True  # noqa: S607
+        ).stdout.strip()
+        changes = subprocess.run(  # noqa: S603
+            ["git", "status", "--porcelain", "--untracked-files=no"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, bool(changes)
+
+
+async def run(counts: SeedCounts, requests: int, concurrency: int, url: Optional[str]) -> list[RouteResult]:
+    """Seed the database and measure every route."""
+    engine = create_engine(pool_size=max(concurrency, 4) + 1)
+    fixture = await seed(engine, counts)
+
+    if url:
+        client_context, counted = http_client(url, concurrency), None
+    else:
+        client_context, counted = app_client(engine), engine
+
+    results = []
+    async with client_context as client:
+        for route in routes(fixture, requests):
+            results.append(await measure(client, route, requests, concurrency, counted))
+            show(results[-1])
+    await engine.dispose()
+    return results
+
+
+@cli.command(name="run")
+def run_command(  # noqa: PLR0913
+    requests: int = typer.Option(300, min=1, help="Requests per route."),
+    concurrency: int = typer.Option(10, min=1, help="Requests in flight at the same time."),
+    users: int = typer.Option(2000, help="Users to seed."),
+    events: int = typer.Option(2000, help="Events to seed."),
+    tickets: int = typer.Option(50_000, help="Tickets to seed."),
+    url: Optional[str] = typer.Option(None, help="Base URL of a server on the test database."),
+    serve: bool = typer.Option(False, help="Start a uvicorn server on the test database."),
+    port: int = typer.Option(8123, help="Port of the server started by --serve."),
+    workers: int = typer.Option(1, help="Worker processes of the server started by --serve."),
+    output: Optional[Path] = typer.Option(None, help="JSON file of the results, benchmarks/results/<commit>.json by default."),
+) -> None:
+    """Measure every route and save the results."""
+    counts = SeedCounts(users=users, organizers=max(1, users // 100), events=events, tickets=tickets)
+    with uvicorn_server(port, workers) if serve else nullcontext(url) as target:
+        print(f"{requests} requests per route, {concurrency} at a time, on {target or 'the in-process app'}")
+        results = asyncio.run(run(counts, requests, concurrency, target))
+
+    commit, dirty = git_commit()
+    output = output or RESULTS / f"{commit}{'-dirty' if dirty else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "commit": commit,
+                "dirty": dirty,
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "target": target or "in-process",
+                "workers": workers if serve else None,
+                "requests": requests,
+                "concurrency": concurrency,
+                "seed": asdict(counts),
+                "routes": [asdict(result) for result in results],
+            },
+            indent=2,
+        )
+    )
+    print(f"Saved to {output}")
+
+
+@cli.command()
+def compare(before: Path, after: Path) -> None:
+    """Print the change of every route between two saved runs."""
+    old, new = (
+        {route["route"]: route for route in json.loads(path.read_text())["routes"]} for path in (before, after)
+    )
+    columns = {"throughput": "req/s", "p50_ms": "p50 ms", "p95_ms": "p95 ms", "p99_ms": "p99 ms"}
+    columns["queries_per_request"] = "queries/req"
+
+    def change(name: str, key: str) -> str:
+        if old[name][key] is None or new[name][key] is None:
+            return "-"
+        if not old[name][key]:
+            return f"{new[name][key]:g}"
+        return f"{new[name][key]:g} ({(new[name][key] / old[name][key] - 1) * 100:+.0f}%)"
+
+    table = Table("route", *columns.values(), title=f"{before.stem} -> {after.stem}")
+    for name in new:
+        if name in old:
+            table.add_row(name, *(change(name, key) for key in columns))
+    print(table)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,188 @@
+"""Time the event search on a large table.
+
+`--events` events are copied into the test database, with titles and
+descriptions drawn from a vocabulary where a few words are very common and
+most are rare, like real text. The GIN index is built after the load. Then
+`/events/search` is called through the in-process app for words of three
+frequencies, and the latency percentiles and the plan of one query are
+printed. `--ilike` also times the unindexed ILIKE search it replaces.
+
+    cd app
+    python -m benchmarks.bench_search --events 1000000
+"""
+
+import asyncio
+import random
+import time
+from datetime import date, datetime, time as t
+
+import typer
+from rich import print  # pylint: disable=W0622
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import app_client, create_engine, reset_database
+from database.helpers import copy_records
+from models import Event, User
+from utils.enums import EventStatus, RoleType
+
+cli = typer.Typer(rich_markup_mode="rich")
+
+COPY_BATCH = 50_000
+VOCABULARY = 5_000
+COLUMNS = [
+    "title",
+    "description",
+    "category",
+    "start_date",
+    "end_date",
+    "time",
+    "ticked_price",
+    "ticked_count",
+    "location",
+    "organizer_id",
+    "created_at",
+    "updated_at",
+    "status",
+]
+CATEGORIES = ["Concerts", "Sport", "Theatre", "Exhibitions", "Festivals", "Conferences"]
+LOCATIONS = ["Tashkent", "Samarkand", "Bukhara", "Khiva", "Namangan", "Andijan", "Fergana", "Nukus"]
+
+
+def words(rng: random.Random, weights: list[float], count: int) -> str:
+    """Return `count` words of the vocabulary, drawn by their weight."""
+    return " ".join(f"w{number}" for number in rng.choices(range(VOCABULARY), weights, k=count))
+
+
+async def seed(engine: AsyncEngine, events: int) -> None:
+    """Copy an organizer and `events` events into the database."""
+    rng = random.Random(42)
+    # Zipf: the n-th most common word is n times rarer than the first
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY)]
+    now = datetime.now()
+
+    async with AsyncSession(engine) as session, session.begin():
+        session.add(
+            User(
+                email="organizer@example.com",
+                password="not-a-hash",
+                first_name="Bench",
+                last_name="Organizer",
+                role=RoleType.organizer,
+                verified=True,
+            )
+        )
+        await session.flush()
+        await session.execute(text("DROP INDEX ix_events_search_vector"))
+        for start in range(0, events, COPY_BATCH):
+            records = [
+                (
+                    f"{words(rng, weights, 3)} #{number}",
+                    words(rng, weights, 30),
+                    rng.choice(CATEGORIES),
+                    date(2025, 1, 1 + number % 28),
+                    date(2025, 2, 1),
+                    t(18, 0),
+                    10.0,
+                    100,
+                    rng.choice(LOCATIONS),
+                    1,
+                    now,
+                    now,
+                    EventStatus.not_started.value,
+                )
+                for number in range(start, min(start + COPY_BATCH, events))
+            ]
+            await copy_records(session, Event.__tablename__, COLUMNS, records)
+        await session.execute(
+            text("CREATE INDEX ix_events_search_vector ON events USING gin (search_vector)")
+        )
+    async with engine.connect() as conn:
+        await conn.execute(text("COMMIT"))
+        await conn.execute(text("VACUUM ANALYZE events"))
+
+
+def report(name: str, latencies: list[float]) -> None:
+    """Print the percentiles of a list of latencies in milliseconds."""
+    ordered = sorted(latencies)
+
+    def percentile(p: int) -> float:
+        return ordered[min(len(ordered) - 1, len(ordered) * p // 100)]
+
+    print(f"{name:>14}: p50 {percentile(50):7.2f}ms, p95 {percentile(95):7.2f}ms, max {ordered[-1]:7.2f}ms")
+
+
+async def run(events: int, queries: int, ilike: bool) -> None:
+    """Run the benchmark."""
+    engine = create_engine(pool_size=2)
+    await reset_database(engine)
+
+    start = time.perf_counter()
+    await seed(engine, events)
+    print(f"seeded {events} events in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(7)
+    bands = {
+        "common words": range(0, 10),
+        "medium words": range(100, 500),
+        "rare words": range(2_000, VOCABULARY),
+        "two words": range(0, 500),
+    }
+
+    async with app_client(engine) as client:
+        for name, band in bands.items():
+            latencies = []
+            matches = 0
+            for _ in range(queries):
+                q = " ".join(f"w{rng.choice(band)}" for _ in range(2 if name == "two words" else 1))
+                started = time.perf_counter()
+                response = await client.get("/events/search", params={"q": q, "limit": 20})
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.text  # noqa: PLR2004
+                matches += len(response.json()["items"])
+            report(name, latencies)
+            print(f"{'':>14}  {matches / queries:.1f} results/page")
+
+    async with engine.connect() as conn:
+        rank = "ts_rank_cd(search_vector, websearch_to_tsquery('simple', 'w300'))"
+        plan = await conn.execute(
+            text(
+                f"EXPLAIN ANALYZE SELECT id, {rank} AS rank FROM events "  # noqa: S608
+                "WHERE search_vector @@ websearch_to_tsquery('simple', 'w300') "
+                "ORDER BY rank DESC, id LIMIT 21"
+            )
+        )
+        print("\n".join(row[0] for row in plan))
+
+        if ilike:
+            latencies = []
+            for _ in range(min(queries, 10)):
+                word = f"w{rng.choice(bands['medium words'])} "
+                query = (
+                    select(Event.id)
+                    .where(or_(*(column.ilike(f"%{word}%") for column in (Event.title, Event.description))))
+                    .order_by(Event.id)
+                    .limit(21)
+                )
+                started = time.perf_counter()
+                await conn.execute(query)
+                latencies.append((time.perf_counter() - started) * 1000)
+            report("ILIKE", latencies)
+            total = await conn.scalar(select(func.count()).select_from(Event))
+            print(f"{'':>14}  over {total} events")
+
+    await engine.dispose()
+
+
+@cli.command()
+def main(
+    events: int = typer.Option(1_000_000, help="Events to seed and search."),
+    queries: int = typer.Option(200, help="Searches per word frequency."),
+    ilike: bool = typer.Option(False, help="Also time the unindexed ILIKE search."),
+) -> None:
+    """Measure the latency of the event search."""
+    asyncio.run(run(events, queries, ilike))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,124 @@
+"""Time the serialization of a page of Events.
+
+`--items` Events are built in memory, without a database, and turned into
+a response body the three ways a route can do it:
+
+- validated: FastAPI validates the ORM objects against EventPageSchema and
+  renders them with the stdlib json encoder, the old default
+- orjson: the same validation, rendered by ORJSONResponse, the default now
+- rows: the plain dicts of `EventDB.page_rows` sent straight to
+  ORJSONResponse, as the event listing does when nothing is expanded
+
+    cd app
+    python -m benchmarks.bench_serialization --items 10000
+"""
+
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime, time as t
+from typing import Any
+
+import orjson
+import typer
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from rich import print  # pylint: disable=W0622
+
+from models import Event
+from schemas.event_schemas import EventPageSchema
+from utils.enums import EventStatus
+
+cli = typer.Typer(rich_markup_mode="rich")
+
+FIELD = create_response_field(name="Response_get_events", type_=EventPageSchema)
+
+
+def make_events(items: int) -> list[Event]:
+    """Return `items` Events as they come out of the database."""
+    return [
+        Event(
+            id=number,
+            title=f"Event {number}",
+            description="A fairly ordinary event description, a sentence or two long.",
+            category="Concerts",
+            start_date=date(2024, 1, 1 + number % 28),
+            end_date=date(2024, 2, 1),
+            time=t(18, 0),
+            ticked_price=10.0,
+            ticked_count=100,
+            location="Tashkent",
+            organizer_id=1,
+            created_at=datetime(2024, 1, 1, 12, 0, 0, number),
+            updated_at=datetime(2024, 1, 2, 12, 0, 0, number),
+            status=EventStatus.not_started,
+        )
+        for number in range(1, items + 1)
+    ]
+
+
+def as_row(event: Event) -> dict[str, Any]:
+    """Return the dict `EventDB.page_rows` would give for an Event."""
+    return {
+        "title": event.title,
+        "description": event.description,
+        "category": event.category,
+        "start_date": datetime.combine(event.start_date, t()),
+        "end_date": datetime.combine(event.end_date, t()),
+        "time": event.time,
+        "ticked_price": int(event.ticked_price),
+        "ticked_count": event.ticked_count,
+        "location": event.location,
+        "id": event.id,
+        "organizer_id": event.organizer_id,
+        "created_at": event.created_at,
+        "updated_at": event.updated_at,
+        "status": event.status,
+    }
+
+
+async def validated(events: list[Event], response_class: type[JSONResponse]) -> bytes:
+    """Validate and render the page as a route with a response_model does."""
+    content = await serialize_response(field=FIELD, response_content={"items": events, "next_cursor": None})
+    return response_class(content).body
+
+
+async def run(items: int, repeat: int) -> None:
+    """Run the benchmark."""
+    events = make_events(items)
+    rows = [as_row(event) for event in events]
+
+    async def rows_only() -> bytes:
+        return ORJSONResponse({"items": rows, "next_cursor": None}).body
+
+    ways: dict[str, Callable[[], Awaitable[bytes]]] = {
+        "validated": lambda: validated(events, JSONResponse),
+        "orjson": lambda: validated(events, ORJSONResponse),
+        "rows": rows_only,
+    }
+
+    bodies = {}
+    for name, render in ways.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            bodies[name] = await render()
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{name:>9}: median {statistics.median(timings):8.2f}ms for {items} items, {len(bodies[name]):,} bytes")
+
+    assert orjson.loads(bodies["rows"]) == orjson.loads(bodies["validated"]), "the bodies differ"
+
+
+@cli.command()
+def main(
+    items: int = typer.Option(10_000, help="Events in the page."),
+    repeat: int = typer.Option(10, help="Times to render each way."),
+) -> None:
+    """Compare the ways of rendering a page of Events."""
+    asyncio.run(run(items, repeat))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,120 @@
+"""Measure how fast the settlement worker drains a backlog of pending Payments.
+
+`--payments` pending card Payments are created in the test database, then
+drained by a SettlementWorker with the given batch size and concurrency.
+`--latency-ms` is added to every charge, like a call to a real processor.
+Every Payment must end up settled exactly once.
+
+    cd app
+    python -m benchmarks.bench_settlement --payments 20000 --batch-size 200 --concurrency 4
+    python -m benchmarks.bench_settlement --payments 20000 --batch-size 1 --concurrency 1
+"""
+
+import asyncio
+import time
+from datetime import date, time as t
+
+import typer
+from rich import print  # pylint: disable=W0622
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import create_engine, reset_database
+from managers.password import pwd_context
+from managers.payment_gateway import StubCardProcessor
+from managers.settlement import SettlementWorker
+from models import Event, Payment, Ticket, User
+from utils.enums import PaymentMethod, PaymentStatus, RoleType
+
+cli = typer.Typer(rich_markup_mode="rich")
+
+
+async def run(payments: int, batch_size: int, concurrency: int, latency_ms: int) -> None:
+    """Run the benchmark."""
+    engine = create_engine(pool_size=concurrency)
+    await reset_database(engine)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                email="buyer@example.com",
+                password=pwd_context.hash("test12345!"),
+                first_name="Bench",
+                last_name="Buyer",
+                role=RoleType.organizer,
+                banned=False,
+                verified=True,
+            )
+        )
+        await conn.execute(
+            insert(Event).values(
+                title="Popular event",
+                description="Everybody wants to go",
+                category="Concerts",
+                start_date=date(2030, 1, 1),
+                end_date=date(2030, 1, 1),
+                time=t(20, 0),
+                ticked_price=10,
+                ticked_count=0,
+                location="Tashkent",
+                organizer_id=1,
+            )
+        )
+        await conn.execute(insert(Ticket), [{"user_id": 1, "event_id": 1}] * payments)
+        await conn.execute(
+            insert(Payment),
+            [
+                {
+                    "amount": 10,
+                    "payment_method": PaymentMethod.card,
+                    "status": PaymentStatus.pending,
+                    "card_number": "************4242",
+                    "exp_date": "12/99",
+                    "card_token": "stub:12/99:4242",
+                    "user_id": 1,
+                    "ticket_id": ticket_id,
+                }
+                for ticket_id in range(1, payments + 1)
+            ],
+        )
+
+    worker = SettlementWorker(
+        session_factory=async_sessionmaker(engine, expire_on_commit=False),
+        gateway=StubCardProcessor(latency=latency_ms / 1000),
+        batch_size=batch_size,
+        concurrency=concurrency,
+        poll_interval=0,
+    )
+    start = time.perf_counter()
+    settled = await worker.drain()
+    elapsed = time.perf_counter() - start
+
+    async with engine.connect() as conn:
+        pending = (
+            await conn.execute(select(func.count()).select_from(Payment).where(Payment.status == PaymentStatus.pending))
+        ).scalar_one()
+    await engine.dispose()
+
+    stats = worker.stats()
+    print(f"{payments} payments, batches of {batch_size}, concurrency {concurrency}, {latency_ms}ms per charge")
+    print(f"{elapsed:.2f}s, {settled / elapsed:.0f} payments/s, {stats['batches']} batches")
+    print(f"avg batch {stats['avg_batch_ms']:.1f}ms, statuses: {stats['by_status']}")
+
+    assert settled == payments, "wrong number of settled payments"
+    assert pending == 0, "payments left pending"
+    print("[green]Every payment settled once.")
+
+
+@cli.command()
+def main(
+    payments: int = typer.Option(20000, help="Pending payments to settle."),
+    batch_size: int = typer.Option(200, help="Payments claimed per batch."),
+    concurrency: int = typer.Option(4, help="Batches settled at the same time."),
+    latency_ms: int = typer.Option(0, help="Delay added to every charge."),
+) -> None:
+    """Drain a backlog of pending payments with the settlement worker."""
+    asyncio.run(run(payments, batch_size, concurrency, latency_ms))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,118 @@
+"""Fire concurrent ticket purchases at one event and check nothing oversells.
+
+An event with `--inventory` seats is created in the test database, then
+`--buyers` different users each try to buy one ticket at the same time
+through POST /events/{id}/tickets on the in-process app. Exactly
+`--inventory` purchases must succeed, every other one must get a 409, and
+the event must end with no seats left.
+
+With `--quantity` above 1 every buyer asks for that many seats through the
+bulk endpoint instead, and `--inventory` should be a multiple of it.
+
+    cd app
+    python -m benchmarks.bench_ticket_purchase --buyers 2000 --inventory 100
+    python -m benchmarks.bench_ticket_purchase --buyers 2000 --inventory 100 --quantity 4
+"""
+
+import asyncio
+import time
+from collections import Counter
+from datetime import date, time as t
+
+import typer
+from httpx import AsyncClient, Response
+from rich import print  # pylint: disable=W0622
+from sqlalchemy import func, insert, select
+
+from benchmarks.common import app_client, create_engine, reset_database
+from managers.auth import AuthManager
+from managers.password import pwd_context
+from models import Event, Ticket, User
+from utils.enums import RoleType
+
+cli = typer.Typer(rich_markup_mode="rich")
+
+
+async def run(buyers: int, inventory: int, quantity: int, pool_size: int) -> None:
+    """Run the benchmark."""
+    engine = create_engine(pool_size=pool_size)
+    await reset_database(engine)
+
+    password = pwd_context.hash("test12345!")
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "email": f"buyer{number}@example.com",
+                    "password": password,
+                    "first_name": "Bench",
+                    "last_name": "Buyer",
+                    "role": RoleType.organizer if number == 0 else RoleType.user,
+                    "banned": False,
+                    "verified": True,
+                }
+                for number in range(buyers)
+            ],
+        )
+        await conn.execute(
+            insert(Event).values(
+                title="Popular event",
+                description="Everybody wants to go",
+                category="Concerts",
+                start_date=date(2030, 1, 1),
+                end_date=date(2030, 1, 1),
+                time=t(20, 0),
+                ticked_price=10,
+                ticked_count=inventory,
+                location="Tashkent",
+                organizer_id=1,
+            )
+        )
+
+    tokens = [AuthManager.encode_token(User(id=user_id)) for user_id in range(1, buyers + 1)]
+
+    async def buy(client: AsyncClient, token: str) -> Response:
+        headers = {"Authorization": f"Bearer {token}"}
+        if quantity == 1:
+            return await client.post("/events/1/tickets", headers=headers)
+        return await client.post("/events/1/tickets/bulk", json={"quantity": quantity}, headers=headers)
+
+    async with app_client(engine) as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(buy(client, token) for token in tokens))
+        elapsed = time.perf_counter() - start
+
+    async with engine.connect() as conn:
+        tickets = (await conn.execute(select(func.count()).select_from(Ticket))).scalar_one()
+        seats_left = (await conn.execute(select(Event.ticked_count).where(Event.id == 1))).scalar_one()
+    await engine.dispose()
+
+    codes = Counter(response.status_code for response in responses)
+    sales = inventory // quantity
+    print(f"{buyers} buyers of {quantity} seats, {inventory} seats, pool of {pool_size} connections")
+    print(f"{elapsed:.2f}s, {buyers / elapsed:.0f} purchases/s, status codes: {dict(codes)}")
+    print(f"tickets in database: {tickets}, seats left: {seats_left}")
+
+    assert codes[201] == sales, "wrong number of successful purchases"  # noqa: PLR2004
+    assert codes[409] == buyers - sales, "unexpected failures"  # noqa: PLR2004
+    assert tickets == inventory, "wrong number of tickets"
+    assert seats_left == 0, "seats left over"
+    print("[green]No overselling.")
+
+
+@cli.command()
+def main(
+    buyers: int = typer.Option(2000, help="Number of concurrent buyers."),
+    inventory: int = typer.Option(100, help="Seats for the event."),
+    quantity: int = typer.Option(1, help="Seats each buyer asks for."),
+    pool_size: int = typer.Option(20, help="Database connections to use."),
+) -> None:
+    """Check concurrent purchases sell exactly the event's inventory."""
+    if inventory % quantity:
+        raise typer.BadParameter("--inventory must be a multiple of --quantity")
+    asyncio.run(run(buyers, inventory, quantity, pool_size))
+
+
+if __name__ == "__main__":
+    cli()
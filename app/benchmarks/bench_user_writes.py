@@ -0,0 +1,103 @@
+"""Count the round-trips and time of the admin User write routes.
+
+`--users` users are created in the test database, then every one of them is
+banned, unbanned, given a new password and deleted through the in-process
+app, one request at a time. For each route the SQL statements per request
+and the latency percentiles are printed. Authentication is cached after the
+first request, so the statements are the route's own.
+
+Run it on two commits to compare them.
+
+    cd app
+    python -m benchmarks.bench_user_writes --users 500
+"""
+
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+import typer
+from httpx import AsyncClient, Response
+from rich import print  # pylint: disable=W0622
+from sqlalchemy import insert
+
+import managers.user
+from benchmarks.common import app_client, count_queries, create_engine, reset_database
+from managers.auth import AuthManager
+from managers.password import pwd_context
+from models import User
+from utils.enums import RoleType
+
+cli = typer.Typer(rich_markup_mode="rich")
+
+
+class NoHasher:
+    """Skip bcrypt, so the timings only show the database work."""
+
+    async def hash(self, password: str) -> str:
+        """Return the password unchanged."""
+        return password
+
+
+async def run(users: int) -> None:
+    """Run the benchmark."""
+    engine = create_engine(pool_size=2)
+    await reset_database(engine)
+
+    password = pwd_context.hash("test12345!")
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "email": f"user{number}@example.com",
+                    "password": password,
+                    "first_name": "Bench",
+                    "last_name": "User",
+                    "role": RoleType.admin if number == 0 else RoleType.user,
+                    "banned": False,
+                    "verified": True,
+                }
+                for number in range(users + 1)
+            ],
+        )
+
+    managers.user.password_hasher = NoHasher()
+    headers = {"Authorization": f"Bearer {AuthManager.encode_token(User(id=1))}"}
+    routes: dict[str, Callable[[AsyncClient, int], Awaitable[Response]]] = {
+        "ban": lambda client, user_id: client.post(f"/users/{user_id}/ban", headers=headers),
+        "unban": lambda client, user_id: client.post(f"/users/{user_id}/unban", headers=headers),
+        "password": lambda client, user_id: client.post(
+            f"/users/{user_id}/password", json={"password": "n3w p@ssword"}, headers=headers
+        ),
+        "delete": lambda client, user_id: client.delete(f"/users/{user_id}", headers=headers),
+    }
+
+    async with app_client(engine) as client:
+        await client.get("/users/me", headers=headers)
+        for name, request in routes.items():
+            latencies = []
+            with count_queries(engine) as statements:
+                for user_id in range(2, users + 2):
+                    start = time.perf_counter()
+                    response = await request(client, user_id)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    assert response.status_code == 204, response.text  # noqa: PLR2004
+            quantiles = statistics.quantiles(latencies, n=100)
+            print(
+                f"{name:>8}: {len(statements) / users:.1f} statements/request, "
+                f"p50 {quantiles[49]:.2f}ms, p95 {quantiles[94]:.2f}ms"
+            )
+
+    await engine.dispose()
+
+
+@cli.command()
+def main(users: int = typer.Option(500, help="Users to write to, one request per route each.")) -> None:
+    """Measure the round-trips of the admin User write routes."""
+    asyncio.run(run(users))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,109 @@
+"""Helpers shared by the benchmarks.
+
+The benchmarks run against the test database, the same one `test_setup.py`
+prepares, and drop and recreate its tables.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from collections.abc import AsyncGenerator, Generator, Sequence
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
+
+import httpx
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from database.db import Base, get_database, get_read_database, get_session_factory
+from main import app
+from settings import get_settings
+
+DATABASE_URL = (
+    "postgresql+asyncpg://"
+    f"{get_settings().db_user}:{get_settings().db_password}@"
+    f"{get_settings().db_address}:{get_settings().db_port}/"
+    f"{get_settings().test_db_name}"
+)
+
+
+def create_engine(pool_size: int = 20, max_overflow: int = 0) -> AsyncEngine:
+    """Return an engine on the test database."""
+    return create_async_engine(DATABASE_URL, echo=False, pool_size=pool_size, max_overflow=max_overflow)
+
+
+async def reset_database(engine: AsyncEngine) -> None:
+    """Drop and recreate every table."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@asynccontextmanager
+async def app_client(engine: AsyncEngine) -> AsyncGenerator[AsyncClient, Any]:
+    """Yield a client for the in-process app, using `engine` for every request."""
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_database_override() -> AsyncGenerator[AsyncSession, Any]:
+        async with sessions() as session, session.begin():
+            yield session
+
+    app.dependency_overrides[get_database] = get_database_override
+    app.dependency_overrides[get_read_database] = get_database_override
+    app.dependency_overrides[get_session_factory] = lambda: sessions
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver", timeout=300) as client:
+            yield client
+    finally:
+        app.dependency_overrides = {}
+
+
+@contextmanager
+def count_queries(engine: AsyncEngine) -> Generator[list[str], Any, None]:
+    """Collect the SQL statements run on `engine` inside the block."""
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ANN001, PLR0913
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@contextmanager
+def uvicorn_server(port: int, workers: int = 1) -> Generator[str, Any, None]:
+    """Run the app with uvicorn on the test database, and yield its URL.
+
+    The server is a separate process, so it reads .env itself: only the
+    database name is changed.
+    """
+    url = f"http://127.0.0.1:{port}"
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers)]
+    process = subprocess.Popen(  # noqa: S603
+        [*command, "--log-level", "warning", "--no-access-log"],
+        env={**os.environ, "DB_NAME": get_settings().test_db_name},
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(url, timeout=1)
+                break
+            except httpx.TransportError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"uvicorn did not start on {url}") from None
+                time.sleep(0.2)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def percentile(ordered: Sequence[float], p: float) -> float:
+    """Return the nearest-rank percentile `p` of sorted values."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
@@ -0,0 +1,65 @@
+"""The shared cache and its namespaces.
+
+Tags:
+- `user:{id}` is on everything read from that User's row
+- `event:{id}` is on everything read from that Event's row
+- `events` is on every cached Event listing
+"""
+
+import asyncio
+from typing import Any
+
+from sqlalchemy.event import listen
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from settings import get_settings
+from utils.cache import Cache, CacheBackend, MemoryBackend, RedisBackend, invalidate
+
+
+def create_backend() -> CacheBackend:
+    """Return the backend named by the `cache_backend` setting."""
+    if get_settings().cache_backend == "redis":
+        try:
+            from redis import asyncio as redis  # noqa: PLC0415
+        except ImportError as err:
+            raise RuntimeError("The redis cache backend needs the 'redis' package installed") from err
+        return RedisBackend(redis.from_url(get_settings().cache_redis_url))
+    return MemoryBackend(get_settings().cache_max_size)
+
+
+backend = create_backend()
+
+principal_cache = Cache(backend, "principal", get_settings().auth_cache_ttl_seconds)
+user_cache = Cache(backend, "user", get_settings().cache_ttl_seconds)
+event_cache = Cache(backend, "event", get_settings().cache_ttl_seconds)
+event_page_cache = Cache(backend, "events", get_settings().events_cache_ttl_seconds)
+
+namespaces = (principal_cache, user_cache, event_cache, event_page_cache)
+
+# invalidations started by a commit hook, kept so they are not garbage collected
+_pending: set[asyncio.Task[None]] = set()
+
+
+async def forget(session: AsyncSession, *tags: str) -> None:
+    """Invalidate `tags` now, and again once `session` commits or rolls back.
+
+    Call this whenever a cached row changes. Until the commit, another
+    request can still read the old row and cache it again, and a read in
+    `session` itself can cache the new row, which a rollback then undoes.
+    """
+    await invalidate(backend, *tags)
+
+    def after_end(_session: Any, *_: Any) -> None:
+        task = asyncio.get_running_loop().create_task(invalidate(backend, *tags))
+        _pending.add(task)
+        task.add_done_callback(_pending.discard)
+
+    listen(session.sync_session, "after_commit", after_end, once=True)
+    listen(session.sync_session, "after_soft_rollback", after_end, once=True)
+
+
+async def clear() -> None:
+    """Remove every entry and reset the counters of every namespace."""
+    await backend.clear()
+    for namespace in namespaces:
+        namespace.reset_stats()
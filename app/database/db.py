@@ -1,12 +1,18 @@
 """Setup the Database and support functions.."""
 
+import logging
+import time
 from collections.abc import AsyncGenerator
-from typing import Any
+from typing import Any, Optional
 
-from sqlalchemy import MetaData
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import MetaData, exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 from settings import get_settings
+from database.instrumentation import instrument
+from database.pool import InstrumentedQueuePool
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = (
     "postgresql+asyncpg://"
@@ -33,11 +39,86 @@ class Base(DeclarativeBase):
     )
 
 
-async_engine = create_async_engine(DATABASE_URL, echo=False)
+def engine_options() -> dict[str, Any]:
+    """Return the pool settings for `create_async_engine`."""
+    options: dict[str, Any] = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": get_settings().db_pool_size,
+        "max_overflow": get_settings().db_max_overflow,
+        "pool_timeout": get_settings().db_pool_timeout,
+        "pool_recycle": get_settings().db_pool_recycle,
+        "pool_pre_ping": get_settings().db_pool_pre_ping,
+    }
+    if get_settings().db_statement_cache_size is not None:
+        options["connect_args"] = {"prepared_statement_cache_size": get_settings().db_statement_cache_size}
+    return options
+
+
+async_engine = create_async_engine(DATABASE_URL, echo=False, **engine_options())
 async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+instrument(async_engine, get_settings().db_slow_query_ms)
+
+
+replica_engine: Optional[AsyncEngine] = None
+replica_session: Optional[async_sessionmaker[AsyncSession]] = None
+if get_settings().db_replica_url:
+    replica_options = engine_options()
+    replica_options["connect_args"] = {
+        **replica_options.get("connect_args", {}),
+        "timeout": get_settings().db_replica_connect_timeout,
+    }
+    replica_engine = create_async_engine(get_settings().db_replica_url, echo=False, **replica_options)
+    replica_session = async_sessionmaker(replica_engine, expire_on_commit=False)
+    instrument(replica_engine, get_settings().db_slow_query_ms)
+
+# monotonic time until which the replica is skipped after a failed connection
+_replica_down_until = 0.0
 
 
 async def get_database() -> AsyncGenerator[AsyncSession, Any]:
     """Return the database connection as a Generator."""
     async with async_session() as session, session.begin():
         yield session
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Return the session factory for work that outlives the route.
+
+    Dependencies with yield are closed before a StreamingResponse body is
+    sent, so a streamed body opens its own session from this factory.
+    """
+    return async_session
+
+
+async def _connect_replica() -> Optional[AsyncSession]:
+    """Return a read-only session on the replica, or None if it is unavailable."""
+    global _replica_down_until  # noqa: PLW0603
+
+    if replica_session is None or time.monotonic() < _replica_down_until:
+        return None
+
+    session = replica_session()
+    try:
+        await session.connection(execution_options={"postgresql_readonly": True})
+    except (OSError, exc.DBAPIError, exc.TimeoutError) as err:
+        await session.close()
+        _replica_down_until = time.monotonic() + get_settings().db_replica_retry_seconds
+        logger.warning("Read replica unavailable, using the primary: %s", err)
+        return None
+    return session
+
+
+async def get_read_database() -> AsyncGenerator[AsyncSession, Any]:
+    """Return a database connection for read-only routes as a Generator.
+
+    This is a connection to the read replica if one is configured and
+    reachable, otherwise to the primary. Routes using it must not write.
+    """
+    session = await _connect_replica()
+    if session is None:
+        async with async_session() as session, session.begin():
+            yield session
+        return
+
+    async with session:
+        yield session
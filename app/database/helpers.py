@@ -1,35 +1,210 @@
-from models import User, Event
-from typing import Any
-from sqlalchemy import select
-from collections.abc import Sequence
+from models import User, Event, Ticket, Payment, IdempotencyKey
+from typing import Any, Optional, TypeVar
+from datetime import date, datetime
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Row,
+    Select,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    inspect,
+    literal,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from utils.enums import EventStatus, PaymentStatus, TickedStatus
+from utils.geo import EARTH_RADIUS_KM, bounding_box
+from collections.abc import Iterable, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
+from database.cache import event_cache, user_cache
+from sqlalchemy.orm import joinedload, make_transient_to_detached, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
 
+T = TypeVar("T")
 
+# Relationships that `?expand=` can load, and how. Many-to-one is joined into
+# the main query, collections are loaded with one extra SELECT .. IN query.
+EVENT_EXPANSIONS: dict[str, LoaderOption] = {
+    "organizer": joinedload(Event.organizer),
+    "tickets": selectinload(Event.tickets),
+}
+USER_EXPANSIONS: dict[str, LoaderOption] = {
+    "events": selectinload(User.events),
+    "tickets": selectinload(User.tickets),
+    "payments": selectinload(User.payments),
+}
+
+
+def loader_options(expansions: dict[str, LoaderOption], expand: Iterable[str]) -> list[LoaderOption]:
+    """Return the loader options for the expanded relationships."""
+    return [expansions[name] for name in sorted(expand)]
+
+
+async def copy_records(
+    session: AsyncSession, table: str, columns: Sequence[str], records: Iterable[Sequence[Any]]
+) -> None:
+    """Load rows into a table with COPY, on the session's connection.
+
+    COPY is much faster than INSERT for large batches, but it goes around
+    SQLAlchemy: no defaults are applied and the identity map is not updated.
+    """
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(table, records=records, columns=list(columns))
+
+
+# the Event columns in the field order and types of EventResponseSchema, so
+# a row of them serializes to the same JSON as the schema would produce.
+# ticked_price keeps its column type, see managers.event_manager.event_item
+EVENT_RESPONSE_COLUMNS = (
+    Event.title,
+    Event.description,
+    Event.category,
+    cast(Event.start_date, DateTime).label("start_date"),
+    cast(Event.end_date, DateTime).label("end_date"),
+    Event.time,
+    Event.ticked_price,
+    Event.ticked_count,
+    Event.location,
+    Event.latitude,
+    Event.longitude,
+    Event.id,
+    Event.organizer_id,
+    Event.created_at,
+    Event.updated_at,
+    Event.status,
+)
+
+
+def event_distance_km(latitude: float, longitude: float) -> ColumnElement[float]:
+    """Return the haversine distance in km from a point to each Event, see utils.geo."""
+    phi1, phi2 = func.radians(latitude), func.radians(Event.latitude)
+    a = func.power(func.sin((phi2 - phi1) / 2), 2) + func.cos(phi1) * func.cos(phi2) * func.power(
+        func.sin(func.radians(Event.longitude - longitude) / 2), 2
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
+
+
+def row_values(instance: Any, exclude: Iterable[str] = ()) -> dict[str, Any]:
+    """Return the column values of a loaded ORM object, to cache them.
+
+    Columns named in `exclude` are left out, and stay unloaded on the
+    object `from_row_values` rebuilds.
+    """
+    return {
+        column.key: getattr(instance, column.key)
+        for column in inspect(instance).mapper.column_attrs
+        if not column.deferred and column.key not in exclude
+    }
+
+
+def from_row_values(model: type[T], values: dict[str, Any]) -> T:
+    """Rebuild a detached ORM object from its `row_values`.
+
+    Its relationships are not loaded and raise like any unloaded one.
+    """
+    instance = model(**values)
+    make_transient_to_detached(instance)
+    return instance
 
 
 class UserDB:
 
     @staticmethod
-    async def all(session: AsyncSession) -> Sequence[User]:
+    async def all(session: AsyncSession, expand: Iterable[str] = ()) -> Sequence[User]:
         """Return all Users in the database."""
-        result = await session.execute(select(User))
+        result = await session.execute(select(User).options(*loader_options(USER_EXPANSIONS, expand)))
         return result.scalars().all()
 
     @staticmethod
-    async def get(session: AsyncSession, user_id: int | None = None, email: str | None = None) -> User | None:
+    async def get(
+        session: AsyncSession,
+        user_id: int | None = None,
+        email: str | None = None,
+        expand: Iterable[str] = (),
+        use_cache: bool = True,
+    ) -> User | None:
+        """Return a specific user by their id or email address.
+
+        Without `expand` the row is read from `user_cache`, unless `use_cache`
+        is False, and a User read from it is detached from the session. The
+        cache never holds the password hash, so a cached User has no
+        `password` loaded: read the User with `use_cache=False` to check it.
+        """
         if user_id:
-            """Return a specific user by their email address."""
-            result = await session.execute(select(User).where(User.id == user_id))
-            return result.scalars().first()
+            if expand:
+                result = await session.execute(
+                    select(User).where(User.id == user_id).options(*loader_options(USER_EXPANSIONS, expand))
+                )
+                return result.scalars().first()
+            query = select(User).where(User.id == user_id)
+            key = f"id:{int(user_id)}"
 
         elif email:
-            """Return a specific user by their email address."""
-            result = await session.execute(select(User).where(User.email == email))
-            return result.scalars().first()
+            query = select(User).where(User.email == email)
+            key = f"email:{email}"
 
         else:
             raise ValueError("Provide user_id or email to get related user.")
 
+        if not use_cache:
+            return (await session.execute(query)).scalars().first()
+
+        async def load() -> Optional[dict[str, Any]]:
+            user = (await session.execute(query)).scalars().first()
+            return row_values(user, exclude=("password",)) if user else None
+
+        values = await user_cache.get_or_load(key, load, lambda values: [f"user:{values['id']}"])
+        return from_row_values(User, values) if values else None
+
+    @staticmethod
+    def export_query() -> Select[Any]:
+        """Return the query of the User export, ordered by id. Passwords are left out."""
+        return select(
+            User.id, User.email, User.first_name, User.last_name, User.role, User.banned, User.verified
+        ).order_by(User.id)
+
+    @staticmethod
+    async def exists(session: AsyncSession, user_id: int) -> bool:
+        """Return True if there is a User with this id."""
+        result = await session.execute(select(exists().where(User.id == user_id)))
+        return bool(result.scalar())
+
+    @staticmethod
+    async def import_users(session: AsyncSession, records: Sequence[tuple[str, str, str, str]]) -> set[str]:
+        """Insert (email, password, first_name, last_name) rows in bulk.
+
+        The rows are copied into a temporary table, then inserted in one
+        statement that skips emails already taken. Return the emails that
+        were inserted.
+        """
+        await session.execute(
+            text(
+                "CREATE TEMPORARY TABLE user_import ("
+                "email varchar(120), password varchar(255), first_name varchar(30), last_name varchar(50)"
+                ") ON COMMIT DROP"
+            )
+        )
+        await copy_records(session, "user_import", ("email", "password", "first_name", "last_name"), records)
+        result = await session.execute(
+            text(
+                "INSERT INTO users (email, password, first_name, last_name, banned, verified) "
+                "SELECT email, password, first_name, last_name, false, true FROM user_import "
+                "ON CONFLICT (email) DO NOTHING RETURNING email"
+            )
+        )
+        inserted = set(result.scalars())
+        await session.execute(text("DROP TABLE user_import"))
+        return inserted
+
     @staticmethod
     async def create(session: AsyncSession, user_data: dict[str, Any]) -> User:
         """Add a new user to the database."""
@@ -44,14 +219,402 @@ class EventDB:
     async def all(session: AsyncSession) -> Sequence[Event]:
         """Return all Events in the database."""
         result = await session.execute(select(Event))
-        # print(result.scalars().all())
+        return result.scalars().all()
+
+    @staticmethod
+    def filters(
+        status: Optional[EventStatus] = None,
+        category: Optional[str] = None,
+        start_from: Optional[date] = None,
+        start_to: Optional[date] = None,
+        organizer_id: Optional[int] = None,
+    ) -> list[ColumnElement[bool]]:
+        """Return the WHERE clauses of the Event listing filters that are set."""
+        clauses = []
+        if status is not None:
+            clauses.append(Event.status == status)
+        if category is not None:
+            clauses.append(Event.category == category)
+        if organizer_id is not None:
+            clauses.append(Event.organizer_id == organizer_id)
+        if start_from is not None:
+            clauses.append(Event.start_date >= start_from)
+        if start_to is not None:
+            clauses.append(Event.start_date <= start_to)
+        return clauses
+
+    @staticmethod
+    def export_query(*filters: ColumnElement[bool]) -> Select[Any]:
+        """Return the query of the Event export, ordered by id."""
+        return (
+            select(
+                Event.id,
+                Event.title,
+                Event.description,
+                Event.category,
+                Event.start_date,
+                Event.end_date,
+                Event.time,
+                Event.ticked_price,
+                Event.ticked_count,
+                Event.location,
+                Event.latitude,
+                Event.longitude,
+                Event.status,
+                Event.organizer_id,
+                Event.created_at,
+                Event.updated_at,
+            )
+            .where(*filters)
+            .order_by(Event.id)
+        )
+
+    @staticmethod
+    async def page(
+        session: AsyncSession,
+        limit: int,
+        after: Optional[tuple[date, int]] = None,
+        status: Optional[EventStatus] = None,
+        category: Optional[str] = None,
+        start_from: Optional[date] = None,
+        start_to: Optional[date] = None,
+        organizer_id: Optional[int] = None,
+        expand: Iterable[str] = (),
+    ) -> Sequence[Event]:
+        """Return up to `limit` Events ordered by (start_date, id).
+
+        `after` is the (start_date, id) of the last row of the previous page.
+        Every filter is applied in SQL so the composite indexes on the events
+        table can be used.
+        """
+        query = select(Event).options(*loader_options(EVENT_EXPANSIONS, expand))
+        query = EventDB.paginate(query, limit, after, status, category, start_from, start_to, organizer_id)
+        result = await session.execute(query)
+        return result.unique().scalars().all()
+
+    @staticmethod
+    async def page_rows(
+        session: AsyncSession,
+        limit: int,
+        after: Optional[tuple[date, int]] = None,
+        status: Optional[EventStatus] = None,
+        category: Optional[str] = None,
+        start_from: Optional[date] = None,
+        start_to: Optional[date] = None,
+        organizer_id: Optional[int] = None,
+    ) -> Sequence[Row[Any]]:
+        """Return the same page as `page`, as rows of EVENT_RESPONSE_COLUMNS.
+
+        No Event objects are built, and the rows can be sent as they are.
+        """
+        query = select(*EVENT_RESPONSE_COLUMNS)
+        query = EventDB.paginate(query, limit, after, status, category, start_from, start_to, organizer_id)
+        result = await session.execute(query)
+        return result.all()
+
+    @staticmethod
+    async def search(session: AsyncSession, text_query: str, limit: int, offset: int = 0) -> Sequence[Row[Any]]:
+        """Return up to `limit` Events matching a web search query, best first.
+
+        `text_query` takes the syntax of web search engines: words, "quoted
+        phrases", `or` and `-excluded` words, and never fails to parse. The
+        rows are EVENT_RESPONSE_COLUMNS plus `rank`. Matching uses the GIN
+        index on `search_vector`, only the matches are ranked.
+        """
+        query = func.websearch_to_tsquery("simple", text_query)
+        rank = func.ts_rank_cd(Event.search_vector, query)
+        result = await session.execute(
+            select(*EVENT_RESPONSE_COLUMNS, rank.label("rank"))
+            .where(Event.search_vector.bool_op("@@")(query))
+            .order_by(rank.desc(), Event.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return result.all()
+
+    @staticmethod
+    def nearby_query(latitude: float, longitude: float, radius_km: float) -> Select[Any]:
+        """Return the query of the Events within `radius_km` of a point, nearest first.
+
+        The rows are EVENT_RESPONSE_COLUMNS plus `distance_km`. The index on
+        (latitude, longitude) narrows the Events down to the bounding box of
+        the circle, only those get their distance computed.
+        """
+        box = bounding_box(latitude, longitude, radius_km)
+        if box.wraps:
+            in_longitude = or_(Event.longitude >= box.min_lon, Event.longitude <= box.max_lon)
+        else:
+            in_longitude = Event.longitude.between(box.min_lon, box.max_lon)
+        distance = event_distance_km(latitude, longitude)
+        return (
+            select(*EVENT_RESPONSE_COLUMNS, distance.label("distance_km"))
+            .where(Event.latitude.between(box.min_lat, box.max_lat), in_longitude, distance <= radius_km)
+            .order_by(distance, Event.id)
+        )
+
+    @staticmethod
+    async def nearby(
+        session: AsyncSession, latitude: float, longitude: float, radius_km: float, limit: int, offset: int = 0
+    ) -> Sequence[Row[Any]]:
+        """Return up to `limit` rows of `nearby_query`."""
+        query = EventDB.nearby_query(latitude, longitude, radius_km)
+        result = await session.execute(query.limit(limit).offset(offset))
+        return result.all()
+
+    @staticmethod
+    def paginate(query: Select[Any], limit: int, after: Optional[tuple[date, int]], *filters: Any) -> Select[Any]:
+        """Add the `filters` arguments, the (start_date, id) order and the limit to an Event query."""
+        query = query.where(*EventDB.filters(*filters))
+        if after is not None:
+            query = query.where(tuple_(Event.start_date, Event.id) > tuple_(*after))
+        return query.order_by(Event.start_date, Event.id).limit(limit)
+
+
+    @staticmethod
+    async def update(
+        session: AsyncSession, event_id: int, organizer_id: int, values: dict[str, Any]
+    ) -> Optional[Event]:
+        """Update an Event owned by `organizer_id` and return it.
+
+        The ownership check and the update are one UPDATE .. RETURNING
+        statement. Return None if no Event has this id and organizer.
+        """
+        owned = (Event.id == event_id, Event.organizer_id == organizer_id)
+        if values:
+            query = update(Event).where(*owned).values(**values).returning(Event)
+        else:
+            query = select(Event).where(*owned)
+        result = await session.execute(
+            query, execution_options={"synchronize_session": False, "populate_existing": True}
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def exists(session: AsyncSession, event_id: int) -> bool:
+        """Return True if there is an Event with this id."""
+        result = await session.execute(select(exists().where(Event.id == event_id)))
+        return bool(result.scalar())
+
+    @staticmethod
+    async def get(
+        session: AsyncSession, event_id: int, expand: Iterable[str] = (), use_cache: bool = True
+    ) -> Optional[Event]:
+        """Return one Event, with the relationships named in `expand`.
+
+        Without `expand` the row is read from `event_cache`, unless
+        `use_cache` is False, and an Event read from it is detached from the
+        session.
+        """
+        query = select(Event).where(Event.id == event_id).options(*loader_options(EVENT_EXPANSIONS, expand))
+        if expand or not use_cache:
+            result = await session.execute(query)
+            return result.unique().scalars().first()
+
+        async def load() -> Optional[dict[str, Any]]:
+            event = (await session.execute(query)).scalars().first()
+            return row_values(event) if event else None
+
+        values = await event_cache.get_or_load(event_id, load, lambda _: [f"event:{event_id}"])
+        return from_row_values(Event, values) if values else None
+
+
+class TicketDB:
+
+    @staticmethod
+    async def buy(
+        session: AsyncSession, event_id: int, user_id: int, on_sale: Sequence[EventStatus]
+    ) -> Optional[Ticket]:
+        """Take one seat from an Event and create its Ticket.
+
+        The seat count is decremented only if a seat is left and the Event
+        status is in `on_sale`, and the Ticket is inserted from the updated
+        row, all in one statement. The Event row stays locked only until the
+        transaction ends. Return None if no seat could be taken.
+
+        A bought Ticket is not_available. Its created_at is the app's clock,
+        like the model default of any other Ticket, not the database's.
+        """
+        seat = (
+            update(Event)
+            .where(Event.id == event_id, Event.ticked_count >= 1, Event.status.in_(on_sale))
+            .values(ticked_count=Event.ticked_count - 1)
+            .returning(Event.id)
+            .cte("seat")
+        )
+        result = await session.execute(
+            insert(Ticket)
+            .from_select(
+                ["user_id", "event_id", "status", "created_at"],
+                select(
+                    literal(user_id),
+                    seat.c.id,
+                    literal(TickedStatus.not_available, Ticket.status.type),
+                    literal(datetime.now(), DateTime),
+                ),
+            )
+            .returning(Ticket)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def buy_many(
+        session: AsyncSession, event_id: int, user_id: int, quantity: int, on_sale: Sequence[EventStatus]
+    ) -> Optional[Sequence[Row[tuple[int, TickedStatus]]]]:
+        """Take `quantity` seats from an Event and create their Tickets.
+
+        The seats are taken with the same conditional decrement as `buy`, all
+        or nothing, then every Ticket is inserted with one multi-row INSERT,
+        with the status and created_at of `buy`. Return the (id, status) of
+        the new Tickets, or None if there were not enough seats.
+        """
+        seats = await session.execute(
+            update(Event)
+            .where(Event.id == event_id, Event.ticked_count >= quantity, Event.status.in_(on_sale))
+            .values(ticked_count=Event.ticked_count - quantity)
+            .returning(Event.id)
+            .execution_options(synchronize_session=False)
+        )
+        if seats.first() is None:
+            return None
+
+        ticket = {
+            "user_id": user_id,
+            "event_id": event_id,
+            "status": TickedStatus.not_available,
+            "created_at": datetime.now(),
+        }
+        result = await session.execute(
+            insert(Ticket)
+            .values([ticket] * quantity)
+            .returning(Ticket.id, Ticket.status)
+        )
+        return result.all()
+
+    @staticmethod
+    async def for_user(session: AsyncSession, event_id: int, user_id: int) -> Sequence[Ticket]:
+        """Return a User's Tickets for one Event."""
+        result = await session.execute(
+            select(Ticket).where(Ticket.event_id == event_id, Ticket.user_id == user_id).order_by(Ticket.id)
+        )
         return result.scalars().all()
 
 
+class PaymentDB:
+
+    @staticmethod
+    async def lock_ticket(session: AsyncSession, ticket_id: int, user_id: int) -> Optional[Row[tuple[Ticket, float]]]:
+        """Lock a User's Ticket for payment and return it with its price.
+
+        The lock makes concurrent payments for the same Ticket run one after
+        the other, until the transaction ends.
+        """
+        result = await session.execute(
+            select(Ticket, Event.ticked_price)
+            .join(Event, Event.id == Ticket.event_id)
+            .where(Ticket.id == ticket_id, Ticket.user_id == user_id)
+            .with_for_update(of=Ticket)
+        )
+        return result.first()
+
+    @staticmethod
+    async def has_payment(session: AsyncSession, ticket_id: int, statuses: Sequence[PaymentStatus]) -> bool:
+        """Return True if the Ticket has a Payment in one of `statuses`."""
+        result = await session.execute(
+            select(exists().where(Payment.ticket_id == ticket_id, Payment.status.in_(statuses)))
+        )
+        return bool(result.scalar())
+
+    @staticmethod
+    async def get(session: AsyncSession, payment_id: int) -> Optional[Payment]:
+        """Return a Payment by its id."""
+        return await session.get(Payment, payment_id)
+
+    @staticmethod
+    async def for_ticket(session: AsyncSession, ticket_id: int, user_id: int) -> Sequence[Payment]:
+        """Return a User's Payments for one Ticket."""
+        result = await session.execute(
+            select(Payment).where(Payment.ticket_id == ticket_id, Payment.user_id == user_id).order_by(Payment.id)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def claim_pending(session: AsyncSession, limit: int) -> Sequence[Row[Any]]:
+        """Lock up to `limit` pending Payments and return what is needed to charge them.
+
+        Rows already locked by another settlement transaction are skipped, so
+        several workers can claim batches at the same time without blocking
+        or settling a Payment twice.
+        """
+        result = await session.execute(
+            select(Payment.id, Payment.amount, Payment.payment_method, Payment.card_token)
+            .where(Payment.status == PaymentStatus.pending)
+            .order_by(Payment.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return result.all()
+
+    @staticmethod
+    async def set_statuses(session: AsyncSession, statuses: Sequence[dict[str, Any]]) -> None:
+        """Write the status of several Payments in one executemany UPDATE.
+
+        `statuses` is a list of {"id": ..., "status": ...} dicts.
+        """
+        await session.execute(update(Payment), statuses)
+
+
+class IdempotencyDB:
+
+    @staticmethod
+    async def claim(
+        session: AsyncSession, user_id: int, key: str, request_hash: str, expires_at: datetime
+    ) -> Optional[int]:
+        """Reserve an idempotency key for the current request.
+
+        Return the id of the key row if this request owns the key, either
+        because it is new or because the previous use has expired. Return
+        None if a live row exists. A concurrent request with the same key
+        waits here until the first one's transaction ends.
+        """
+        statement = pg_insert(IdempotencyKey).values(
+            user_id=user_id, key=key, request_hash=request_hash, expires_at=expires_at
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+            set_={
+                "request_hash": statement.excluded.request_hash,
+                "expires_at": statement.excluded.expires_at,
+                "response": None,
+            },
+            where=IdempotencyKey.expires_at < datetime.now(),
+        ).returning(IdempotencyKey.id)
+        result = await session.execute(statement)
+        return result.scalar()
+
     @staticmethod
-    async def get(session: AsyncSession, event_id: int):
-        print(Event.id, '>>>>>>>>', event_id)
-        result = await session.execute(select(Event).where(Event.id == event_id))
+    async def get(session: AsyncSession, user_id: int, key: str) -> Optional[IdempotencyKey]:
+        """Return the stored idempotency key row."""
+        result = await session.execute(
+            select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        )
         return result.scalars().first()
 
+    @staticmethod
+    async def save_response(session: AsyncSession, key_id: int, response: dict[str, Any]) -> None:
+        """Store the response to replay for a claimed key."""
+        await session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == key_id)
+            .values(response=response)
+            .execution_options(synchronize_session=False)
+        )
 
+    @staticmethod
+    async def purge_expired(session: AsyncSession, now: datetime) -> int:
+        """Delete every expired key and return how many were deleted."""
+        result = await session.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.expires_at < now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
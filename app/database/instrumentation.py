@@ -0,0 +1,101 @@
+"""Count and time the SQL statements of each request.
+
+`instrument` adds cursor execute hooks to an engine. While a `QueryStats`
+is set in `current_queries`, which the request timing middleware does for
+every request, each statement run in the same task is added to it.
+Statements slower than `slow_query_ms` are logged, with the types of their
+parameters but never the values.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+current_queries: ContextVar[Optional["QueryStats"]] = ContextVar("current_queries", default=None)
+
+# statements are cut to this length in the logs
+MAX_STATEMENT_LENGTH = 1000
+
+
+class QueryStats:
+    """The statements run for one request."""
+
+    def __init__(self) -> None:
+        """Start with no statements."""
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, seconds: float) -> None:
+        """Record one statement that took `seconds`."""
+        self.count += 1
+        self.total += seconds
+        if seconds > self.slowest:
+            self.slowest = seconds
+            self.slowest_statement = statement
+
+
+def parameter_shapes(parameters: Any) -> Any:  # noqa: ANN401
+    """Return the types of bind parameters, in the same layout.
+
+    Many rows sent at once are shown as their count and the first row.
+    """
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, list) and parameters and isinstance(parameters[0], (dict, list, tuple)):
+        return f"{len(parameters)} x {parameter_shapes(parameters[0])}"
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def shorten(statement: str) -> str:
+    """Return a statement on one line, cut to MAX_STATEMENT_LENGTH."""
+    statement = " ".join(statement.split())
+    if len(statement) > MAX_STATEMENT_LENGTH:
+        return statement[:MAX_STATEMENT_LENGTH] + "..."
+    return statement
+
+
+def instrument(engine: AsyncEngine, slow_query_ms: float, ignore: tuple[str, ...] = ()) -> None:
+    """Time every statement run on `engine`, see the module docstring.
+
+    A `slow_query_ms` of 0 or less logs no statement. Statements starting
+    with one of the `ignore` prefixes are not recorded.
+    """
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ANN001, PLR0913
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ANN001, PLR0913
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        if statement.startswith(ignore):
+            return
+        stats = current_queries.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        if 0 < slow_query_ms <= seconds * 1000:
+            logger.warning(
+                "Slow query, %.1fms: %s parameters: %s",
+                seconds * 1000,
+                shorten(statement),
+                parameter_shapes(parameters),
+                extra={"duration_ms": round(seconds * 1000, 2), "statement": shorten(statement)},
+            )
+
+    def handle_error(context: ExceptionContext) -> None:
+        # a failed statement gets no after_cursor_execute
+        if context.connection is not None and context.connection.info.get("query_start"):
+            context.connection.info["query_start"].pop()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
@@ -0,0 +1,75 @@
+"""Connection pool instrumentation."""
+
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+
+class PoolStats:
+    """Counters for the connection checkouts of one pool."""
+
+    def __init__(self) -> None:
+        """Start with every counter at zero."""
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        """Record one checkout that took `wait` seconds."""
+        self.acquisitions += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """The default async pool, plus timing of every connection checkout.
+
+    The wait includes queueing for a free connection, opening a new one when
+    the pool grows and the pre-ping if it is enabled.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Create the pool with fresh counters."""
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        """Keep the counters when the engine is disposed."""
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def connect(self) -> PoolProxiedConnection:
+        """Check out a connection and record how long it took."""
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.record(time.perf_counter() - start)
+
+
+def pool_status(engine: AsyncEngine) -> dict[str, Any]:
+    """Return the current state and checkout counters of an engine's pool."""
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        raise TypeError("The engine does not use an InstrumentedQueuePool")
+
+    stats = pool.stats
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,  # noqa: SLF001
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "acquisitions": stats.acquisitions,
+        "timeouts": stats.timeouts,
+        "avg_wait_ms": stats.total_wait / stats.acquisitions * 1000 if stats.acquisitions else 0.0,
+        "max_wait_ms": stats.max_wait * 1000,
+    }
@@ -0,0 +1,360 @@
+"""Generate realistic fake data in bulk, for load tests.
+
+`Seeder` makes users, organizers, events, tickets and payments and loads
+them with COPY on several connections at once. Rows get explicit ids, so
+the tables can be filled in parallel and still point at each other; the id
+sequences are moved past them at the end.
+
+A table that is empty when the seeding starts is loaded without its
+foreign keys and secondary indexes, which are put back once it is full:
+checking and indexing row by row would take most of the time.
+
+Names, places and texts come from Faker, but only a few hundred of each are
+generated and then combined at random: Faker is far too slow to call once
+per row. Ticket sales follow a Zipf distribution, a few events sell most of
+the tickets, like on a real ticketing site.
+"""
+
+import asyncio
+import itertools
+import random
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as t, timedelta
+from typing import Any, Callable, Optional
+
+from faker import Faker
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from database.helpers import copy_records
+from models import Event, Payment, Ticket, User
+from utils.enums import EventStatus, PaymentMethod, PaymentStatus, RoleType, TickedStatus
+
+CATEGORIES = ["Concerts", "Sport", "Theatre", "Exhibitions", "Festivals", "Conferences", "Cinema", "Kids"]
+# how many of each Faker value to make and then combine
+POOL_SIZE = 500
+
+USER_COLUMNS = ["id", "email", "password", "first_name", "last_name", "role", "banned", "verified"]
+EVENT_COLUMNS = [
+    "id",
+    "title",
+    "description",
+    "category",
+    "start_date",
+    "end_date",
+    "time",
+    "ticked_price",
+    "ticked_count",
+    "location",
+    "latitude",
+    "longitude",
+    "organizer_id",
+    "created_at",
+    "updated_at",
+    "status",
+]
+TICKET_COLUMNS = ["id", "status", "created_at", "user_id", "event_id"]
+PAYMENT_COLUMNS = [
+    "id",
+    "amount",
+    "created_at",
+    "payment_method",
+    "status",
+    "card_number",
+    "exp_date",
+    "card_token",
+    "user_id",
+    "ticket_id",
+]
+
+
+@dataclass
+class SeedCounts:
+    """How much of each kind of row to make."""
+
+    users: int = 10_000
+    organizers: int = 100
+    events: int = 10_000
+    tickets: int = 1_000_000
+    # share of the tickets that have a payment
+    paid: float = 0.7
+    # Zipf exponent of the ticket sales, 0 spreads them evenly
+    skew: float = 1.1
+
+
+@dataclass
+class SeedReport:
+    """The rows made per table, and how long each table took."""
+
+    rows: dict[str, int] = field(default_factory=dict)
+    seconds: dict[str, float] = field(default_factory=dict)
+
+
+class Seeder:
+    """Fill a database with fake data, see the module docstring.
+
+    `workers` connections COPY `batch_size` rows at a time. `password_hash`
+    is stored for every user, so any of them can log in with its password.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        engine: AsyncEngine,
+        counts: SeedCounts,
+        password_hash: str,
+        workers: int = 4,
+        batch_size: int = 50_000,
+        seed: int = 42,
+    ) -> None:
+        """Create a seeder, nothing is generated yet."""
+        self.engine = engine
+        self.counts = counts
+        self.password_hash = password_hash
+        self.workers = workers
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.faker = Faker()
+        self.faker.seed_instance(seed)
+        self.now = datetime.now().replace(microsecond=0)
+
+    async def run(self, on_table: Callable[[str, int, float], None] = lambda *_: None) -> SeedReport:
+        """Generate and load every table, calling `on_table` as each is done."""
+        report = SeedReport()
+        first = await self.first_ids()
+
+        users = range(first["users"], first["users"] + self.counts.users + self.counts.organizers)
+        organizers = users[: self.counts.organizers]
+        events = range(first["events"], first["events"] + self.counts.events)
+        prices = [self.rng.choice((5, 10, 15, 20, 30, 50, 80, 120)) for _ in events]
+
+        # how many tickets each event sold, most go to a few events
+        weights = [1 / (rank + 1) ** self.counts.skew for rank in range(len(events))]
+        self.rng.shuffle(weights)
+        sold = [0] * len(events)
+        ticket_events = self.rng.choices(
+            range(len(events)), cum_weights=list(itertools.accumulate(weights)), k=self.counts.tickets
+        )
+        for index in ticket_events:
+            sold[index] += 1
+        buyers = [self.rng.choice(users) for _ in ticket_events]
+
+        tables: list[tuple[type, list[str], Iterator[tuple[Any, ...]]]] = [
+            (User, USER_COLUMNS, self.user_rows(users, organizers)),
+            (Event, EVENT_COLUMNS, self.event_rows(events, organizers, prices, sold)),
+            (Ticket, TICKET_COLUMNS, self.ticket_rows(first["tickets"], events, ticket_events, buyers)),
+            (
+                Payment,
+                PAYMENT_COLUMNS,
+                self.payment_rows(first["payments"], first["tickets"], prices, ticket_events, buyers),
+            ),
+        ]
+        for model, columns, rows in tables:
+            started = time.perf_counter()
+            if first[model.__tablename__] == 1:
+                async with self.without_constraints(model.__tablename__):
+                    count = await self.copy(model.__tablename__, columns, rows)
+            else:
+                count = await self.copy(model.__tablename__, columns, rows)
+            report.rows[model.__tablename__] = count
+            report.seconds[model.__tablename__] = time.perf_counter() - started
+            on_table(model.__tablename__, count, report.seconds[model.__tablename__])
+
+        await self.restart_sequences()
+        return report
+
+    async def first_ids(self) -> dict[str, int]:
+        """Return the first free id of each table."""
+        ids = {}
+        async with self.engine.connect() as conn:
+            for model in (User, Event, Ticket, Payment):
+                ids[model.__tablename__] = (await conn.scalar(select(func.coalesce(func.max(model.id), 0)))) + 1
+        return ids
+
+    @asynccontextmanager
+    async def without_constraints(self, table: str) -> AsyncIterator[None]:
+        """Drop the foreign keys and the indexes of a table, and add them back after the block.
+
+        The primary key stays, the next tables' foreign keys need it.
+        """
+        async with self.engine.begin() as conn:
+            foreign_keys = (
+                await conn.execute(
+                    text(
+                        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                        "WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'"
+                    ),
+                    {"table": table},
+                )
+            ).all()
+            indexes = (
+                await conn.execute(
+                    text(
+                        "SELECT indexname, indexdef FROM pg_indexes "
+                        "WHERE schemaname = current_schema() AND tablename = :table AND indexname NOT IN "
+                        "(SELECT conname FROM pg_constraint WHERE conrelid = CAST(:table AS regclass))"
+                    ),
+                    {"table": table},
+                )
+            ).all()
+            for name, _ in foreign_keys:
+                await conn.execute(text(f'ALTER TABLE "{table}" DROP CONSTRAINT "{name}"'))
+            for name, _ in indexes:
+                await conn.execute(text(f'DROP INDEX "{name}"'))
+        try:
+            yield
+        finally:
+            async with self.engine.begin() as conn:
+                for name, definition in foreign_keys:
+                    await conn.execute(text(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}'))
+                for _, definition in indexes:
+                    await conn.execute(text(definition))
+
+    async def restart_sequences(self) -> None:
+        """Move the id sequences past the copied ids."""
+        async with self.engine.begin() as conn:
+            for model in (User, Event, Ticket, Payment):
+                table = model.__tablename__
+                await conn.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "  # noqa: S608
+                        f"(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+                    )
+                )
+
+    async def copy(self, table: str, columns: Sequence[str], rows: Iterable[tuple[Any, ...]]) -> int:
+        """COPY `rows` into a table in batches, on `workers` connections at once.
+
+        Every connection commits its batches when the table is done, so the
+        next table can refer to all of them.
+        """
+        queue: asyncio.Queue[Optional[list[tuple[Any, ...]]]] = asyncio.Queue(maxsize=self.workers * 2)
+
+        async def consume() -> None:
+            async with AsyncSession(self.engine) as session, session.begin():
+                while (batch := await queue.get()) is not None:
+                    await copy_records(session, table, columns, batch)
+
+        consumers = [asyncio.create_task(consume()) for _ in range(self.workers)]
+        count = 0
+        try:
+            for batch in batched(rows, self.batch_size):
+                count += len(batch)
+                # lets the connections send the last batch while this one is built
+                await queue.put(batch)
+            for _ in consumers:
+                await queue.put(None)
+            await asyncio.gather(*consumers)
+        except BaseException:
+            for consumer in consumers:
+                consumer.cancel()
+            raise
+        return count
+
+    def user_rows(self, users: range, organizers: range) -> Iterator[tuple[Any, ...]]:
+        """Yield the users, the first ones are the organizers."""
+        first_names = [self.faker.first_name() for _ in range(POOL_SIZE)]
+        last_names = [self.faker.last_name() for _ in range(POOL_SIZE)]
+        domains = [self.faker.free_email_domain() for _ in range(20)]
+        for user_id in users:
+            first_name, last_name = self.rng.choice(first_names), self.rng.choice(last_names)
+            role = RoleType.organizer if user_id in organizers else RoleType.user
+            yield (
+                user_id,
+                f"{first_name}.{last_name}.{user_id}@{self.rng.choice(domains)}".lower(),
+                self.password_hash,
+                first_name[:30],
+                last_name[:50],
+                role.value,
+                self.rng.random() < 0.01,  # noqa: PLR2004
+                self.rng.random() < 0.95,  # noqa: PLR2004
+            )
+
+    def event_rows(
+        self, events: range, organizers: range, prices: list[int], sold: list[int]
+    ) -> Iterator[tuple[Any, ...]]:
+        """Yield the events, with seats left over after the tickets sold."""
+        places = [self.faker.location_on_land() for _ in range(POOL_SIZE)]
+        phrases = [self.faker.catch_phrase() for _ in range(POOL_SIZE)]
+        descriptions = [self.faker.paragraph(nb_sentences=4) for _ in range(POOL_SIZE)]
+        today = date.today()
+        for index, event_id in enumerate(events):
+            latitude, longitude, city, country, _ = self.rng.choice(places)
+            start = today + timedelta(days=self.rng.randint(-180, 365))
+            if start < today:
+                status = self.rng.choice((EventStatus.finished, EventStatus.finished, EventStatus.cancelled))
+            else:
+                status = EventStatus.not_started
+            created = self.now - timedelta(days=self.rng.randint(1, 400))
+            yield (
+                event_id,
+                f"{self.rng.choice(phrases)} #{event_id}"[:120],
+                self.rng.choice(descriptions),
+                self.rng.choice(CATEGORIES),
+                start,
+                start + timedelta(days=self.rng.choice((0, 0, 0, 1, 2))),
+                t(self.rng.choice((10, 12, 15, 18, 19, 20)), self.rng.choice((0, 30))),
+                float(prices[index]),
+                self.rng.randint(0, max(10, sold[index] // 4)),
+                f"{city}, {country}"[:150],
+                float(latitude),
+                float(longitude),
+                self.rng.choice(organizers),
+                created,
+                created,
+                status.value,
+            )
+
+    def ticket_rows(
+        self, first_id: int, events: range, ticket_events: list[int], buyers: list[int]
+    ) -> Iterator[tuple[Any, ...]]:
+        """Yield one ticket per entry of `ticket_events`, bought by the user in `buyers`."""
+        for number, (index, user_id) in enumerate(zip(ticket_events, buyers)):
+            status = TickedStatus.available if self.rng.random() < 0.05 else TickedStatus.not_available  # noqa: PLR2004
+            yield (
+                first_id + number,
+                status.value,
+                self.now - timedelta(seconds=self.rng.randint(0, 365 * 86400)),
+                user_id,
+                events[index],
+            )
+
+    def payment_rows(
+        self, first_id: int, first_ticket: int, prices: list[int], ticket_events: list[int], buyers: list[int]
+    ) -> Iterator[tuple[Any, ...]]:
+        """Yield a payment by its buyer for a `paid` share of the tickets.
+
+        Pending card payments get a token of the stub card processor.
+        """
+        statuses = [PaymentStatus.approved] * 90 + [PaymentStatus.declined] * 6 + [PaymentStatus.pending] * 3
+        statuses.append(PaymentStatus.out_of_balance)
+        payment_id = first_id
+        for number, index in enumerate(ticket_events):
+            if self.rng.random() >= self.counts.paid:
+                continue
+            card = self.rng.random() < 0.8  # noqa: PLR2004
+            payment_status = self.rng.choice(statuses)
+            last_four = f"{self.rng.randint(0, 9999):04d}"
+            exp_date = f"{self.rng.randint(1, 12):02d}/{self.rng.randint(26, 31)}"
+            yield (
+                payment_id,
+                float(prices[index]),
+                self.now - timedelta(seconds=self.rng.randint(0, 365 * 86400)),
+                (PaymentMethod.card if card else PaymentMethod.cash).value,
+                payment_status.value,
+                f"{'*' * 12}{last_four}" if card else None,
+                exp_date if card else None,
+                f"stub:{exp_date}:{last_four}" if card and payment_status == PaymentStatus.pending else None,
+                buyers[number],
+                first_ticket + number,
+            )
+            payment_id += 1
+
+
+def batched(rows: Iterable[tuple[Any, ...]], size: int) -> Iterator[list[tuple[Any, ...]]]:
+    """Yield lists of `size` rows, the last one may be shorter."""
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
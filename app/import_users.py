@@ -0,0 +1,54 @@
+"""CLI command importing Users in bulk from a CSV or NDJSON file."""
+
+import asyncio
+from pathlib import Path
+from typing import Any, Optional
+
+import typer
+from rich import print  # pylint: disable=W0622
+
+from database.db import async_session
+from managers.password import password_hasher
+from managers.user_import import UserImporter, guess_format
+
+app = typer.Typer(no_args_is_help=True, rich_markup_mode="rich")
+
+
+async def run(content: str, fmt: str) -> dict[str, Any]:
+    """Import the file in one transaction.
+
+    Nothing else hashes in this process, so the whole login pool is used.
+    """
+    try:
+        async with async_session() as session, session.begin():
+            return await UserImporter.import_users(content, fmt, session, hasher=password_hasher)
+    finally:
+        password_hasher.shutdown()
+
+
+@app.command()
+def import_users(
+        path: Path = typer.Argument(..., exists=True, dir_okay=False, help="CSV or NDJSON file of Users."),
+        file_format: Optional[str] = typer.Option(None, "--format", help="csv or ndjson, taken from the extension by default."),
+) -> None:
+    """Create Users from a file, reporting the rows that were skipped.
+
+    CSV files need a header line with email, password, first_name and last_name.
+    """
+    try:
+        fmt = file_format or guess_format(path.name)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    if fmt not in ("csv", "ndjson"):
+        raise typer.BadParameter("--format must be csv or ndjson")
+
+    summary = asyncio.run(run(path.read_text(encoding="utf-8-sig"), fmt))
+    for error in summary["errors"]:
+        print(f"[red]line {error['line']}[/red] {error['email'] or ''}: {error['error']}")
+    print(f"{summary['received']} rows, [green]{summary['created']} created[/green], {summary['failed']} failed")
+    if summary["failed"]:
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
@@ -1,9 +1,46 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from settings import get_settings
 from routers import routers
+from managers.password import import_password_hasher, password_hasher
+from managers.payment_manager import PaymentManager
+from managers.settlement import settlement_worker
+from utils.request_timing import RequestTimingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    """Start and stop the resources shared by all requests."""
+    cleanup = None
+    if get_settings().idempotency_cleanup_interval_seconds > 0:
+        cleanup = asyncio.create_task(
+            PaymentManager.run_idempotency_cleanup(get_settings().idempotency_cleanup_interval_seconds)
+        )
+    settle_in_app = get_settings().payment_settlement == "worker" and get_settings().settlement_autostart
+    if settle_in_app:
+        settlement_worker.start()
+
+    yield
+
+    if settle_in_app:
+        await settlement_worker.stop()
+    if cleanup is not None:
+        cleanup.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await cleanup
+    password_hasher.shutdown()
+    import_password_hasher.shutdown()
+
 
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     title=get_settings().title,
     description=get_settings().description,
     version=get_settings().version,
@@ -22,4 +59,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
\ No newline at end of file
+)
+
+# added last so it wraps the other middleware and times the whole request
+if get_settings().request_timing:
+    app.add_middleware(RequestTimingMiddleware)
@@ -1,7 +1,8 @@
 """Define the Autorization Manager."""
 
 import datetime
-from typing import Optional
+from dataclasses import dataclass
+from typing import Optional, Union
 
 import jwt
 from fastapi import Depends, HTTPException, Request, status
@@ -9,6 +10,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from models import User
 from settings import get_settings
+from database.cache import forget, principal_cache
 from database.db import get_database
 from database.helpers import UserDB
 from utils.enums import RoleType
@@ -29,6 +31,29 @@ class ResponseMessages:
     VALIDATION_RESENT = "Validation email re-sent"
 
 
+@dataclass(frozen=True)
+class Principal:
+    """The parts of a User that the route guards need.
+
+    This is what `CustomHTTPBearer` stores in `request.state.user`.
+    """
+
+    id: int
+    role: RoleType
+    banned: bool
+    verified: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """Build a Principal from a User row."""
+        return cls(id=user.id, role=user.role, banned=bool(user.banned), verified=bool(user.verified))
+
+
+async def forget_user(session: AsyncSession, user_id: Union[int, str]) -> None:
+    """Drop the cached Principal and rows of a User. Call this whenever a User row changes."""
+    await forget(session, f"user:{int(user_id)}")
+
+
 class AuthManager:
     """Handle the JWT Auth."""
 
@@ -86,7 +111,8 @@ class AuthManager:
             if payload["typ"] != "refresh":
                 raise HTTPException(status.HTTP_401_UNAUTHORIZED, ResponseMessages.INVALID_TOKEN)
 
-            user_data = await UserDB.get(session, user_id=payload["sub"])
+            # the ban status is read from the database, not from the cache
+            user_data = await UserDB.get(session, user_id=payload["sub"], use_cache=False)
 
             if not user_data:
                 raise HTTPException(status.HTTP_404_NOT_FOUND, ResponseMessages.USER_NOT_FOUND)
@@ -106,18 +132,35 @@ class AuthManager:
             return new_token
 
 
+    @staticmethod
+    async def load_principal(session: AsyncSession, user_id: int) -> Optional[Principal]:
+        """Return the Principal of a User, or None if there is no such User.
+
+        The User is read from the database, so `principal_cache` is the only
+        cache between a ban and the requests it blocks.
+        """
+        user = await UserDB.get(session, user_id=user_id, use_cache=False)
+        return Principal.from_user(user) if user else None
+
+
 class CustomHTTPBearer(HTTPBearer):
     """Our own custom HTTPBearer class."""
 
-    async def __call__(self, request: Request, db: AsyncSession = Depends(get_database)) -> Optional[
-        HTTPAuthorizationCredentials]:
-        """Override the default __call__ function."""
+    async def __call__(self, request: Request, db: AsyncSession = Depends(get_database)) -> Optional[Principal]:
+        """Override the default __call__ function.
+
+        The User is looked up in `principal_cache` first, so most requests
+        don't need a database round-trip.
+        """
         res = await super().__call__(request)
 
         try:
             if res:
                 payload = jwt.decode(res.credentials, get_settings().secret_key, algorithms=["HS256"])
-                user_data = await UserDB.get(db, user_id=payload["sub"])
+                user_id = int(payload["sub"])
+                user_data = await principal_cache.get_or_load(
+                    user_id, lambda: AuthManager.load_principal(db, user_id), lambda _: [f"user:{user_id}"]
+                )
                 # block a banned or unverified user
                 if user_data:
                     if bool(user_data.banned):
@@ -1,14 +1,50 @@
 """Define the Event manager."""
 
-from fastapi import HTTPException, status, Request
-from collections.abc import Sequence
-from sqlalchemy import update
+from collections.abc import Awaitable, Callable, Hashable, Sequence
+from datetime import date
+from typing import Any, Optional, Union
+
+from fastapi import HTTPException, Response, status, Request
+from fastapi.responses import ORJSONResponse
 from models import Event
-from sqlalchemy.ext.asyncio import AsyncSession
-from schemas.event_schemas import EventRequestSchema, EventResponseSchema, EventEditRequestSchema
-from database.helpers import EventDB
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from schemas.event_schemas import EventRequestSchema, EventResponseSchema, EventEditRequestSchema, EventPatchRequestSchema
+from database.cache import event_page_cache, forget
+from database.helpers import EVENT_EXPANSIONS, EventDB
+from settings import get_settings
+from utils.enums import EventStatus
+from utils.expand import parse_expand
+from utils.http_cache import CachedBody, http_date, not_modified, version_etag
+from utils.pagination import decode_cursor, encode_cursor
+
+
+
+
+async def forget_events(session: AsyncSession, event_id: Optional[int] = None) -> None:
+    """Drop the cached Event listings, and the cached row of `event_id`.
+
+    Call this whenever an Event row changes.
+    """
+    tags = ["events"] if event_id is None else ["events", f"event:{event_id}"]
+    await forget(session, *tags)
 
 
+# a float column validated the way EventResponseSchema does: a whole number
+# becomes an int, and a fractional price is rejected rather than rounded
+ticked_price_adapter = TypeAdapter(EventResponseSchema.model_fields["ticked_price"].annotation)
+
+
+def event_item(row: Row[Any]) -> dict[str, Any]:
+    """Return a row of EVENT_RESPONSE_COLUMNS as an item of a response.
+
+    Only the price differs from the schema output in the row itself, so it
+    is the only field that is validated.
+    """
+    item = row._asdict()
+    item["ticked_price"] = ticked_price_adapter.validate_python(item["ticked_price"])
+    return item
 
 
 class EventManager:
@@ -24,7 +60,7 @@ class EventManager:
             session.add(event)
             await session.flush()
             await session.refresh(event)
-            # print(event, type(event))
+            await forget_events(session)
 
             return event
 
@@ -33,17 +69,169 @@ class EventManager:
 
 
     @staticmethod
-    async def get_all_events(session: AsyncSession) -> Sequence[Event]:
-        """Get all Events."""
-        return await EventDB.all(session)
+    async def list_events(
+        session: AsyncSession,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        event_status: Optional[EventStatus] = None,
+        category: Optional[str] = None,
+        start_from: Optional[date] = None,
+        start_to: Optional[date] = None,
+        organizer_id: Optional[int] = None,
+        expand: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Return one page of Events and the cursor for the next page.
+
+        Without `expand` the items are plain dicts that already have the
+        types of EventResponseSchema, so the route can send them without
+        validating them again.
+        """
+        limit = min(limit or get_settings().events_page_size, get_settings().events_max_page_size)
+        relationships = EventManager.parse_expand(expand)
+
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError as err:
+                raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from err
+
+        # fetch one extra row to find out if there is a next page
+        filters = {
+            "status": event_status,
+            "category": category,
+            "start_from": start_from,
+            "start_to": start_to,
+            "organizer_id": organizer_id,
+        }
+        events: Sequence[Any]
+        if relationships:
+            events = await EventDB.page(session, limit=limit + 1, after=after, expand=relationships, **filters)
+        else:
+            events = await EventDB.page_rows(session, limit=limit + 1, after=after, **filters)
+
+        next_cursor = None
+        if len(events) > limit:
+            events = events[:limit]
+            next_cursor = encode_cursor(events[-1].start_date, events[-1].id)
+
+        if not relationships:
+            events = [event_item(row) for row in events]
+        return {"items": events, "next_cursor": next_cursor}
+
+
+    @staticmethod
+    async def search_events(
+        session: AsyncSession, text_query: str, limit: Optional[int] = None, offset: int = 0
+    ) -> dict[str, Any]:
+        """Return one page of the Events matching a search, best match first.
+
+        Like the plain listing, the items are dicts with the types of the
+        response schema and can be sent as they are.
+        """
+        limit = min(limit or get_settings().events_page_size, get_settings().events_max_page_size)
+
+        # fetch one extra row to find out if there is a next page
+        rows = await EventDB.search(session, text_query, limit=limit + 1, offset=offset)
+
+        next_offset = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_offset = offset + limit
+        return {"items": [event_item(row) for row in rows], "next_offset": next_offset}
+
+    @staticmethod
+    async def nearby_events(
+        session: AsyncSession,
+        latitude: float,
+        longitude: float,
+        radius_km: Optional[float] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> dict[str, Any]:
+        """Return one page of the Events within `radius_km` of a point, nearest first.
+
+        Events without coordinates are never found. The items are dicts with
+        the types of the response schema, like those of `search_events`.
+        """
+        radius_km = radius_km or get_settings().events_nearby_radius_km
+        limit = min(limit or get_settings().events_page_size, get_settings().events_max_page_size)
+
+        rows = await EventDB.nearby(session, latitude, longitude, radius_km, limit=limit + 1, offset=offset)
+
+        next_offset = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_offset = offset + limit
+        return {"items": [event_item(row) for row in rows], "next_offset": next_offset}
+
+    @staticmethod
+    async def read_events(session: AsyncSession, event_id: Optional[int] = None, **listing: Any) -> CachedBody:
+        """Return one Event, or a page of them, rendered with its validators.
+
+        The ETag comes from the id and updated_at of every Event in the body.
+        Only a single Event gets a Last-Modified: the newest updated_at of a
+        page goes back when that Event leaves it, so a client's
+        If-Modified-Since would keep matching a changed page. `listing` is
+        passed to `list_events`.
+        """
+        if event_id is not None:
+            event = await EventManager.get_event_by_id(event_id, session)
+            content = EventResponseSchema.model_validate(event).model_dump(mode="json")
+            return CachedBody(
+                ORJSONResponse(content).body, version_etag([(event.id, event.updated_at)]), event.updated_at
+            )
+
+        page = await EventManager.list_events(session, **listing)
+        versions = [(item["id"], item["updated_at"]) for item in page["items"]]
+        return CachedBody(ORJSONResponse(page).body, version_etag(versions, page["next_cursor"]), None)
+
+    @staticmethod
+    async def cached_read(
+        request: Request,
+        key: Hashable,
+        read: Callable[[AsyncSession], Awaitable[CachedBody]],
+        session_factory: async_sessionmaker[AsyncSession],
+    ) -> Response:
+        """Send a public Event read from `event_page_cache`, calling `read` on a miss.
+
+        A miss is read on a session of `session_factory`, on the primary: the
+        cache is emptied when a change commits there, and a replica that
+        hasn't caught up yet would put the old body back for the whole TTL.
+        A client whose If-None-Match or If-Modified-Since shows it already
+        has the body gets an empty 304.
+        """
+
+        async def load() -> CachedBody:
+            async with session_factory() as session:
+                return await read(session)
+
+        cached = await event_page_cache.get_or_load(key, load, lambda _: ["events"])
+
+        headers = {
+            "ETag": cached.etag,
+            "Cache-Control": f"public, max-age={get_settings().events_cache_max_age_seconds}",
+        }
+        if cached.last_modified is not None:
+            headers["Last-Modified"] = http_date(cached.last_modified)
+
+        if not_modified(request, cached.etag, cached.last_modified):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(cached.body, media_type="application/json", headers=headers)
+
+    @staticmethod
+    def parse_expand(expand: Optional[str]) -> frozenset[str]:
+        """Return the Event relationships to load, or raise a 400."""
+        try:
+            return parse_expand(expand, EVENT_EXPANSIONS)
+        except ValueError as err:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(err)) from err
 
 
     @staticmethod
-    async def get_event_by_id(event_id: int, session: AsyncSession) -> EventResponseSchema:
-        """Return one event by ID."""
-        # print(event_id, type(event_id))
-        # event = await session.get(Event, event_id)
-        event = await EventDB.get(session=session, event_id=event_id)
+    async def get_event_by_id(event_id: int, session: AsyncSession, expand: Optional[str] = None) -> EventResponseSchema:
+        """Return one event by ID, with the relationships named in `expand`."""
+        event = await EventDB.get(session=session, event_id=event_id, expand=EventManager.parse_expand(expand))
         if event is None:
             raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f'Event {event_id} not found')
 
@@ -52,29 +240,26 @@ class EventManager:
 
 
     @staticmethod
-    async def update_event(organizer_id: int, event_id: int, event_data: EventEditRequestSchema, session: AsyncSession)->None:
-        """Update an event."""
+    async def update_event(
+        organizer_id: int,
+        event_id: int,
+        event_data: Union[EventEditRequestSchema, EventPatchRequestSchema],
+        session: AsyncSession,
+    ) -> Event:
+        """Update an event and return it.
 
-        check_event = await EventDB.get(session, event_id)
-        if check_event is None:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f'Event {event_id} not found')
-
-        if check_event.organizer_id != organizer_id:
+        A PATCH writes only the fields that were sent, a PUT replaces every
+        field, so an optional one it leaves out, like the coordinates, is
+        cleared. The ownership check and the update are a single statement.
+        Only when it matches no row is a second query run, to tell 404 from
+        403.
+        """
+        partial = isinstance(event_data, EventPatchRequestSchema)
+        event = await EventDB.update(session, event_id, organizer_id, event_data.model_dump(exclude_unset=partial))
+        if event is None:
+            if not await EventDB.exists(session, event_id):
+                raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f'Event {event_id} not found')
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Is user not in organizer or admin")
 
-        await session.execute(update(Event).where(Event.id == event_id).values(
-            title=event_data.title,
-            description=event_data.description,
-            category=event_data.category,
-            start_date=event_data.start_date,
-            end_date=event_data.end_date,
-            time=event_data.time,
-            ticked_price=event_data.ticked_price,
-            ticked_count=event_data.ticked_count,
-            location=event_data.location,
-            status=event_data.status,
-        ))
-
-        await session.refresh(check_event)
-        return check_event
-
+        await forget_events(session, event_id)
+        return event
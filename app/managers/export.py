@@ -0,0 +1,63 @@
+"""Stream query results as NDJSON or CSV.
+
+The rows are read through a server-side cursor, `export_chunk_size` at a
+time, and each batch is sent as soon as it is encoded. Memory use stays the
+same however many rows there are.
+"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import date, time
+from enum import Enum
+from typing import Any, Literal
+
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from settings import get_settings
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def plain(value: Any) -> Any:
+    """Return a value as something JSON and CSV can hold."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(columns: Sequence[str], rows: Sequence[Row[Any]]) -> str:
+    """Return the rows as NDJSON lines."""
+    return "".join(json.dumps({column: plain(value) for column, value in zip(columns, row)}) + "\n" for row in rows)
+
+
+def encode_csv(rows: Sequence[Sequence[Any]]) -> str:
+    """Return the rows as CSV lines."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_export(
+    session_factory: async_sessionmaker[AsyncSession], query: Select[Any], fmt: ExportFormat
+) -> AsyncIterator[str]:
+    """Yield the rows of `query` in chunks, encoded as `fmt`.
+
+    The session is opened here and not taken from the route, because the
+    route's session is closed before the response body is sent.
+    """
+    chunk_size = get_settings().export_chunk_size
+    async with session_factory() as session, session.begin():
+        result = await session.stream(query.execution_options(yield_per=chunk_size))
+        columns = list(result.keys())
+        if fmt == "csv":
+            yield encode_csv([columns])
+
+        async for rows in result.partitions():
+            yield encode_ndjson(columns, rows) if fmt == "ndjson" else encode_csv(rows)
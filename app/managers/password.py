@@ -0,0 +1,199 @@
+"""Define the Password hasher.
+
+bcrypt takes a few hundred milliseconds of CPU per call, so it must never
+run on the event loop. All hashing and verification goes through
+`password_hasher`, which runs it on a bounded thread or process pool.
+
+The scheme and cost come from the settings, see `build_context`.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from passlib.context import CryptContext
+from passlib.utils.handlers import PrefixWrapper
+
+from settings import get_settings
+
+# stores the password itself, marked so it can't be mistaken for a hash
+PLAINTEXT = PrefixWrapper("plaintext_marked", "plaintext", prefix="$plaintext$")
+
+
+def build_context(scheme: str, bcrypt_rounds: int) -> CryptContext:
+    """Return the CryptContext that makes new hashes with `scheme`.
+
+    bcrypt and argon2 hashes verify whatever the scheme, and `needs_update`
+    flags those of another scheme or with fewer than `bcrypt_rounds`, so
+    they are replaced on the next login. argon2 is argon2id and needs the
+    argon2-cffi package, it is only imported when an argon2 hash is used.
+
+    "plaintext" hashes are only known to a context that makes them, so a
+    server configured for bcrypt or argon2 never accepts one.
+    """
+    schemes: list[Any] = ["bcrypt", "argon2"]
+    default = scheme
+    if scheme == "plaintext":
+        schemes.append(PLAINTEXT)
+        default = PLAINTEXT.name
+    return CryptContext(
+        schemes=schemes,
+        default=default,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        argon2__type="ID",
+    )
+
+
+pwd_context = build_context(get_settings().password_scheme, get_settings().password_bcrypt_rounds)
+
+# the (scheme, bcrypt_rounds) of pwd_context, handed to the process pool workers
+_profile = (get_settings().password_scheme, get_settings().password_bcrypt_rounds)
+
+
+def use_profile(scheme: str, bcrypt_rounds: int) -> None:
+    """Switch `pwd_context` to another scheme and cost, in every module that imported it.
+
+    A process pool started before is restarted on its next job, so its
+    workers switch too. "plaintext" is refused unless `testing` is set.
+    """
+    global _profile  # noqa: PLW0603
+    if scheme == "plaintext" and not get_settings().testing:
+        raise ValueError('password_scheme "plaintext" is only allowed when testing is set')
+    pwd_context.load(build_context(scheme, bcrypt_rounds))
+    _profile = (scheme, bcrypt_rounds)
+
+
+def _hash(password: str) -> str:
+    """Hash a password. Module level so it can run in a process pool."""
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed: str) -> bool:
+    """Verify a password. Module level so it can run in a process pool."""
+    return pwd_context.verify(password, hashed)
+
+
+def _verify_and_update(password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """Verify a password and rehash it if needed, see `PasswordHasher.verify_and_update`."""
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class PasswordHasher:
+    """Hash and verify passwords on a worker pool.
+
+    At most `max_workers` jobs are handed to the pool at once, the rest wait
+    in a queue whose depth is reported by `stats()`.
+    """
+
+    def __init__(self, executor_type: str, max_workers: int) -> None:
+        """Create the hasher. The pool itself is started on first use."""
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unknown password executor type: {executor_type}")
+
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self._executor_profile: Optional[tuple[str, int]] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.in_flight = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.total_wait = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        """Return the worker pool, creating it if needed.
+
+        Process pool workers load the profile of `pwd_context` when they
+        start, and the pool is replaced once `use_profile` changes it; jobs
+        already handed to the old pool still finish there.
+        """
+        if self._executor is not None and self.executor_type == "process" and self._executor_profile != _profile:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, initializer=use_profile, initargs=_profile
+                )
+                self._executor_profile = _profile
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password")
+        return self._executor
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run `func` on the pool once a slot is free."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+
+        queued_at = time.perf_counter()
+        if self._semaphore.locked():
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.total_wait += time.perf_counter() - queued_at
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        """Return the hash of a password."""
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Return True if the password matches the hash."""
+        return await self._run(_verify, password, hashed)
+
+    async def verify_and_update(self, password: str, hashed: str) -> tuple[bool, Optional[str]]:
+        """Return whether the password matches, and its new hash if the old one is outdated.
+
+        The new hash is None when the password is wrong or the hash is of
+        the configured scheme and cost already.
+        """
+        return await self._run(_verify_and_update, password, hashed)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the pool size, queue depth and job counters."""
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "completed": self.completed,
+            "avg_wait_ms": self.total_wait / self.completed * 1000 if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._semaphore = None
+
+
+password_hasher = PasswordHasher(
+    executor_type=get_settings().password_executor,
+    max_workers=get_settings().password_workers,
+)
+
+# bulk imports get their own pool, so logins never queue behind one
+import_password_hasher = PasswordHasher(
+    executor_type=get_settings().password_executor,
+    max_workers=get_settings().user_import_hash_workers,
+)
@@ -0,0 +1,119 @@
+"""Define the Payment gateway.
+
+`PaymentGateway` is what the payment code talks to. The only implementation
+is `StubCardProcessor`, a local stand-in for the external card processor so
+payments can be developed and load tested offline.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Optional, Protocol
+
+from settings import get_settings
+from utils.enums import PaymentMethod, PaymentStatus
+
+
+class PaymentGateway(Protocol):
+    """Charge a payment and return its outcome.
+
+    Only the masked card number is stored, so a Payment settled later is
+    charged through a token the gateway gives for the card when the Payment
+    is created.
+    """
+
+    async def charge(
+        self, amount: float, method: PaymentMethod, card_number: Optional[str], exp_date: Optional[str]
+    ) -> PaymentStatus:
+        """Charge `amount` to the full card details of the request.
+
+        Return approved, declined or out_of_balance.
+        """
+        ...
+
+    async def tokenize(self, card_number: str, exp_date: str) -> str:
+        """Register a card with the gateway and return a token to charge it later."""
+        ...
+
+    async def charge_token(self, amount: float, method: PaymentMethod, card_token: Optional[str]) -> PaymentStatus:
+        """Charge `amount` to a card given by its token, see `charge`."""
+        ...
+
+
+def luhn_valid(card_number: str) -> bool:
+    """Return True if the card number passes the Luhn checksum."""
+    total = 0
+    for position, digit in enumerate(int(char) for char in reversed(card_number)):
+        if position % 2:
+            digit *= 2
+            if digit > 9:  # noqa: PLR2004
+                digit -= 9
+        total += digit
+    return total % 10 == 0
+
+
+def card_expired(exp_date: str, today: Optional[datetime] = None) -> bool:
+    """Return True if a MM/YY expiry date is in the past."""
+    today = today or datetime.now()
+    month, year = (int(part) for part in exp_date.split("/"))
+    return (2000 + year, month) < (today.year, today.month)
+
+
+class StubCardProcessor:
+    """A deterministic fake card processor.
+
+    Cash is always approved. A card is declined if it has expired or ends in
+    0002, and is out of balance if it ends in 9995. Every other card is
+    approved. `latency` seconds are added to each call to mimic the network.
+
+    Its tokens hold the expiry date and the last four digits, which is all
+    it needs to decide the outcome.
+    """
+
+    DECLINE_SUFFIX = "0002"
+    OUT_OF_BALANCE_SUFFIX = "9995"
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Create the processor."""
+        self.latency = latency
+
+    async def charge(
+        self, amount: float, method: PaymentMethod, card_number: Optional[str], exp_date: Optional[str]
+    ) -> PaymentStatus:
+        """Charge `amount` and return approved, declined or out_of_balance."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method == PaymentMethod.cash:
+            return PaymentStatus.approved
+        return self.outcome(card_number, exp_date)
+
+    async def tokenize(self, card_number: str, exp_date: str) -> str:
+        """Return a token for the card."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return f"stub:{exp_date}:{card_number[-4:]}"
+
+    async def charge_token(self, amount: float, method: PaymentMethod, card_token: Optional[str]) -> PaymentStatus:
+        """Charge `amount` to a tokenized card."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method == PaymentMethod.cash:
+            return PaymentStatus.approved
+        if not card_token:
+            return PaymentStatus.declined
+        _, exp_date, last_four = card_token.split(":")
+        return self.outcome(last_four, exp_date)
+
+    def outcome(self, card_number: Optional[str], exp_date: Optional[str]) -> PaymentStatus:
+        """Return the result of charging a card, going by its last digits."""
+        if not card_number or not exp_date or card_expired(exp_date):
+            return PaymentStatus.declined
+        if card_number.endswith(self.DECLINE_SUFFIX):
+            return PaymentStatus.declined
+        if card_number.endswith(self.OUT_OF_BALANCE_SUFFIX):
+            return PaymentStatus.out_of_balance
+        return PaymentStatus.approved
+
+
+payment_gateway: PaymentGateway = StubCardProcessor(latency=get_settings().payment_gateway_latency_ms / 1000)
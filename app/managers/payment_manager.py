@@ -0,0 +1,179 @@
+"""Define the Payment manager."""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database.db import async_session
+from database.helpers import IdempotencyDB, PaymentDB
+from managers.payment_gateway import card_expired, luhn_valid, payment_gateway
+from models import Payment
+from schemas.payment_schemas import PaymentRequestSchema, PaymentResponseSchema
+from settings import get_settings
+from utils.enums import PaymentMethod, PaymentStatus
+
+logger = logging.getLogger(__name__)
+
+# a Ticket with a Payment in one of these states cannot be paid again
+ACTIVE_PAYMENT = (PaymentStatus.pending, PaymentStatus.approved)
+
+
+class PaymentErrorMessages:
+    """Define text error responses."""
+
+    TICKET_INVALID = "This Ticket does not exist"
+    ALREADY_PAID = "This Ticket is already paid for"
+    KEY_REUSED = "This Idempotency-Key was already used for a different request"
+    KEY_IN_PROGRESS = "A request with this Idempotency-Key is still being processed"
+
+
+def mask_card_number(card_number: Optional[str]) -> Optional[str]:
+    """Return the card number with all but the last four digits hidden."""
+    if not card_number:
+        return None
+    return "*" * (len(card_number) - 4) + card_number[-4:]
+
+
+def request_hash(ticket_id: int, payment_data: PaymentRequestSchema) -> str:
+    """Return a fingerprint of a payment request, to spot reused keys.
+
+    The request holds the full card number, which has few enough unknown
+    digits to be found from a plain hash, so the fingerprint is an HMAC
+    keyed with the secret key.
+    """
+    body = f"{ticket_id}:{payment_data.model_dump_json()}"
+    return hmac.new(get_settings().secret_key.encode(), body.encode(), hashlib.sha256).hexdigest()
+
+
+class PaymentManager:
+    """Class to Manage the Payments."""
+
+    @staticmethod
+    async def create_payment(
+        ticket_id: int,
+        user_id: int,
+        payment_data: PaymentRequestSchema,
+        session_factory: async_sessionmaker[AsyncSession],
+        idempotency_key: Optional[str] = None,
+    ) -> tuple[dict[str, Any], bool]:
+        """Pay for a Ticket and return the Payment and whether it was replayed.
+
+        The Payment is committed as pending, with the idempotency key, before
+        an inline charge, and the result of the charge is written in a second
+        transaction. So the Ticket isn't locked during the call to the
+        gateway, and a failure after the charge can't undo the record of it.
+
+        When an `idempotency_key` is given, the first request with that key
+        stores its response and any retry gets the same response back
+        without charging again. A Payment that was pending is read again, so
+        the retry sees how it was settled. Errors are not stored, since the
+        transaction holding the key is rolled back with them.
+        """
+        inline = get_settings().payment_settlement == "inline"
+        async with session_factory() as session, session.begin():
+            key_id = None
+            if idempotency_key is not None:
+                fingerprint = request_hash(ticket_id, payment_data)
+                expires_at = datetime.now() + timedelta(hours=get_settings().idempotency_key_ttl_hours)
+                key_id = await IdempotencyDB.claim(session, user_id, idempotency_key, fingerprint, expires_at)
+                if key_id is None:
+                    return await PaymentManager.replay(session, user_id, idempotency_key, fingerprint), True
+
+            row = await PaymentDB.lock_ticket(session, ticket_id, user_id)
+            if row is None:
+                raise HTTPException(status.HTTP_404_NOT_FOUND, PaymentErrorMessages.TICKET_INVALID)
+            if await PaymentDB.has_payment(session, ticket_id, ACTIVE_PAYMENT):
+                raise HTTPException(status.HTTP_409_CONFLICT, PaymentErrorMessages.ALREADY_PAID)
+
+            # a card that fails the local checks is declined without a charge
+            _, price = row
+            card_valid = payment_data.payment_method == PaymentMethod.cash or (
+                luhn_valid(payment_data.card_number) and not card_expired(payment_data.exp_date)
+            )
+            card_token = None
+            # in "worker" mode the card is charged later, through its token
+            if card_valid and not inline and payment_data.payment_method == PaymentMethod.card:
+                card_token = await payment_gateway.tokenize(payment_data.card_number, payment_data.exp_date)
+            payment = Payment(
+                amount=price,
+                payment_method=payment_data.payment_method,
+                status=PaymentStatus.pending if card_valid else PaymentStatus.declined,
+                card_number=mask_card_number(payment_data.card_number),
+                exp_date=payment_data.exp_date,
+                card_token=card_token,
+                user_id=user_id,
+                ticket_id=ticket_id,
+            )
+            session.add(payment)
+            await session.flush()
+
+            response = PaymentResponseSchema.model_validate(payment).model_dump(mode="json")
+            if key_id is not None:
+                await IdempotencyDB.save_response(session, key_id, response)
+
+        # in "worker" mode the Payment stays pending until it is settled
+        if not (card_valid and inline):
+            return response, False
+
+        # a charge that raises may have taken the money, so, as in the
+        # settlement worker, the Payment is marked failed and not charged again
+        try:
+            payment.status = await payment_gateway.charge(
+                price, payment_data.payment_method, payment_data.card_number, payment_data.exp_date
+            )
+        except Exception:
+            logger.exception("Charging Payment %d failed", payment.id)
+            payment.status = PaymentStatus.failed
+
+        response = PaymentResponseSchema.model_validate(payment).model_dump(mode="json")
+        async with session_factory() as session, session.begin():
+            await PaymentDB.set_statuses(session, [{"id": payment.id, "status": payment.status}])
+            if key_id is not None:
+                await IdempotencyDB.save_response(session, key_id, response)
+        return response, False
+
+    @staticmethod
+    async def replay(session: AsyncSession, user_id: int, key: str, fingerprint: str) -> dict[str, Any]:
+        """Return the stored response for an idempotency key that is in use.
+
+        A stored pending Payment is returned as it is now, since it may have
+        been settled after the response was stored.
+        """
+        stored = await IdempotencyDB.get(session, user_id, key)
+        if stored is None or stored.response is None:
+            raise HTTPException(status.HTTP_409_CONFLICT, PaymentErrorMessages.KEY_IN_PROGRESS)
+        if stored.request_hash != fingerprint:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, PaymentErrorMessages.KEY_REUSED)
+        if stored.response["status"] == PaymentStatus.pending.value:
+            payment = await PaymentDB.get(session, stored.response["id"])
+            return PaymentResponseSchema.model_validate(payment).model_dump(mode="json")
+        return stored.response
+
+    @staticmethod
+    async def get_payments(ticket_id: int, user_id: int, session: AsyncSession) -> Sequence[Payment]:
+        """Return a User's Payments for a Ticket."""
+        return await PaymentDB.for_ticket(session, ticket_id, user_id)
+
+    @staticmethod
+    async def purge_expired_keys(session: AsyncSession) -> int:
+        """Delete the expired idempotency keys and return how many there were."""
+        return await IdempotencyDB.purge_expired(session, datetime.now())
+
+    @staticmethod
+    async def run_idempotency_cleanup(interval: float) -> None:
+        """Delete expired idempotency keys every `interval` seconds, forever."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with async_session() as session, session.begin():
+                    deleted = await PaymentManager.purge_expired_keys(session)
+                logger.info("Deleted %d expired idempotency keys", deleted)
+            except Exception:
+                logger.exception("Idempotency key cleanup failed")
@@ -0,0 +1,161 @@
+"""Define the Payment settlement worker.
+
+With `payment_settlement = "worker"` the payment route only records a pending
+Payment. The worker then claims pending Payments in batches, charges them
+through the payment gateway and writes all the results back in one UPDATE.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database.db import async_session
+from database.helpers import PaymentDB
+from managers.payment_gateway import PaymentGateway, payment_gateway
+from settings import get_settings
+from utils.enums import PaymentStatus
+
+logger = logging.getLogger(__name__)
+
+
+class SettlementWorker:
+    """Settle pending Payments in batches.
+
+    `concurrency` loops run side by side, each in its own transaction. They
+    claim batches with FOR UPDATE SKIP LOCKED, so they never wait on, or
+    settle, each other's Payments. The charges of one batch run
+    concurrently. A charge that raises marks its Payment `failed`: the
+    gateway may have taken the money, so it is never charged again, and the
+    other charges of the batch are written as usual.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        gateway: PaymentGateway,
+        batch_size: int,
+        concurrency: int,
+        poll_interval: float,
+    ) -> None:
+        """Create the worker. Nothing runs until `start` or `drain`."""
+        self.session_factory = session_factory
+        self.gateway = gateway
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._tasks: list[asyncio.Task[None]] = []
+
+        self.started_at: Optional[float] = None
+        self.batches = 0
+        self.settled = 0
+        self.errors = 0
+        self.by_status: Counter[str] = Counter()
+        self.batch_seconds = 0.0
+        self.last_batch_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Return True while the settlement loops are running."""
+        return bool(self._tasks)
+
+    async def settle_batch(self) -> int:
+        """Claim and settle one batch, and return how many Payments it had."""
+        started = time.perf_counter()
+        async with self.session_factory() as session, session.begin():
+            payments = await PaymentDB.claim_pending(session, self.batch_size)
+            if not payments:
+                return 0
+
+            results = await asyncio.gather(
+                *(
+                    self.gateway.charge_token(payment.amount, payment.payment_method, payment.card_token)
+                    for payment in payments
+                ),
+                return_exceptions=True,
+            )
+            statuses = []
+            for payment, result in zip(payments, results):
+                if isinstance(result, Exception):
+                    self.errors += 1
+                    logger.error("Charging Payment %d failed", payment.id, exc_info=result)
+                    result = PaymentStatus.failed  # noqa: PLW2901
+                statuses.append(result)
+            await PaymentDB.set_statuses(
+                session, [{"id": payment.id, "status": result} for payment, result in zip(payments, statuses)]
+            )
+
+        elapsed = time.perf_counter() - started
+        self.batches += 1
+        self.settled += len(payments)
+        self.by_status.update(result.value for result in statuses)
+        self.batch_seconds += elapsed
+        self.last_batch_seconds = elapsed
+        return len(payments)
+
+    async def _loop(self) -> None:
+        """Settle batches until cancelled, sleeping when there is no backlog."""
+        while True:
+            try:
+                settled = await self.settle_batch()
+            except Exception:
+                self.errors += 1
+                logger.exception("Payment settlement batch failed")
+                settled = 0
+            if settled < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _drain_loop(self) -> None:
+        """Settle batches until one comes back empty."""
+        while await self.settle_batch():
+            pass
+
+    def start(self) -> None:
+        """Start the settlement loops in the background."""
+        if self.running:
+            return
+        self.started_at = time.monotonic()
+        self._tasks = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """Stop the settlement loops, rolling back any batch in progress."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self) -> int:
+        """Settle every pending Payment, then return how many were settled."""
+        settled = self.settled
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        await asyncio.gather(*(self._drain_loop() for _ in range(self.concurrency)))
+        return self.settled - settled
+
+    def stats(self) -> dict[str, Any]:
+        """Return the settlement counters and throughput."""
+        uptime = time.monotonic() - self.started_at if self.started_at is not None else 0.0
+        return {
+            "running": self.running,
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            "batches": self.batches,
+            "settled": self.settled,
+            "errors": self.errors,
+            "by_status": dict(self.by_status),
+            "avg_batch_ms": self.batch_seconds / self.batches * 1000 if self.batches else 0.0,
+            "last_batch_ms": self.last_batch_seconds * 1000,
+            "payments_per_second": self.settled / uptime if uptime else 0.0,
+        }
+
+
+settlement_worker = SettlementWorker(
+    session_factory=async_session,
+    gateway=payment_gateway,
+    batch_size=get_settings().settlement_batch_size,
+    concurrency=get_settings().settlement_concurrency,
+    poll_interval=get_settings().settlement_poll_interval_seconds,
+)
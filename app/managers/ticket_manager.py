@@ -0,0 +1,70 @@
+"""Define the Ticket manager."""
+
+from collections.abc import Sequence
+from typing import Any, NoReturn
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.helpers import EventDB, TicketDB
+from managers.event_manager import forget_events
+from models import Ticket
+from utils.enums import EventStatus
+
+# Tickets can only be bought for events in one of these states
+ON_SALE = (EventStatus.not_started, EventStatus.counting)
+
+
+class TicketErrorMessages:
+    """Define text error responses."""
+
+    EVENT_INVALID = "This Event does not exist"
+    NOT_ON_SALE = "Tickets for this Event are not on sale"
+    SOLD_OUT = "This Event is sold out"
+    NOT_ENOUGH_SEATS = "Not enough tickets left for this Event"
+
+
+class TicketManager:
+    """Class to Manage the Tickets."""
+
+    @staticmethod
+    async def buy_ticket(event_id: int, user_id: int, session: AsyncSession) -> Ticket:
+        """Buy one ticket for an Event.
+
+        The seat is taken with a conditional decrement of the Event's
+        `ticked_count`, so concurrent buyers can never oversell it.
+        """
+        ticket = await TicketDB.buy(session, event_id=event_id, user_id=user_id, on_sale=ON_SALE)
+        if ticket is None:
+            await TicketManager.raise_unavailable(event_id, session)
+        # the Event's seat count changed
+        await forget_events(session, event_id)
+        return ticket
+
+    @staticmethod
+    async def buy_tickets(event_id: int, user_id: int, quantity: int, session: AsyncSession) -> dict[str, Any]:
+        """Buy `quantity` tickets for an Event, all or nothing."""
+        tickets = await TicketDB.buy_many(
+            session, event_id=event_id, user_id=user_id, quantity=quantity, on_sale=ON_SALE
+        )
+        if tickets is None:
+            await TicketManager.raise_unavailable(event_id, session)
+        await forget_events(session, event_id)
+        return {"event_id": event_id, "tickets": [{"id": id_, "status": status_} for id_, status_ in tickets]}
+
+    @staticmethod
+    async def raise_unavailable(event_id: int, session: AsyncSession) -> NoReturn:
+        """Raise the reason the seats could not be taken for an Event."""
+        event = await EventDB.get(session, event_id, use_cache=False)
+        if event is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, TicketErrorMessages.EVENT_INVALID)
+        if event.status not in ON_SALE:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, TicketErrorMessages.NOT_ON_SALE)
+        if event.ticked_count > 0:
+            raise HTTPException(status.HTTP_409_CONFLICT, TicketErrorMessages.NOT_ENOUGH_SEATS)
+        raise HTTPException(status.HTTP_409_CONFLICT, TicketErrorMessages.SOLD_OUT)
+
+    @staticmethod
+    async def get_user_tickets(event_id: int, user_id: int, session: AsyncSession) -> Sequence[Ticket]:
+        """Return the Tickets a User holds for an Event."""
+        return await TicketDB.for_user(session, event_id=event_id, user_id=user_id)
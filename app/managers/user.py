@@ -3,18 +3,17 @@
 from typing import Any, Optional, Type
 from email_validator import EmailNotValidError, validate_email
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
 from sqlalchemy import delete, update
 from sqlalchemy.exc import IntegrityError
-from database.helpers import UserDB
-from managers.auth import AuthManager
+from database.helpers import USER_EXPANSIONS, UserDB
+from managers.auth import AuthManager, forget_user
+from managers.password import password_hasher, pwd_context  # noqa: F401
 from models import User
 from collections.abc import Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 from utils.enums import RoleType
 from schemas.user import UserChangePasswordRequest, UserEditRequest
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from utils.expand import parse_expand
 
 
 class ErrorMessages:
@@ -45,7 +44,7 @@ class UserManager:
         # and can cause random testing issues
         new_user = user_data.copy()
 
-        new_user["password"] = pwd_context.hash(user_data["password"])
+        new_user["password"] = await password_hasher.hash(user_data["password"])
         new_user["banned"] = False
         new_user["verified"] = True
 
@@ -53,8 +52,9 @@ class UserManager:
             email_validation = validate_email(new_user["email"], check_deliverability=False)
             new_user["email"] = email_validation.email
 
-            # actually add the new user to the database
-            _ = await UserDB.create(session, user_data=new_user)
+            # actually add the new user to the database, the flush fills in
+            # the id and the role's server default
+            user_do = await UserDB.create(session, user_data=new_user)
             await session.flush()
 
         except IntegrityError as err:
@@ -63,9 +63,6 @@ class UserManager:
         except EmailNotValidError as err:
             raise HTTPException(status.HTTP_400_BAD_REQUEST, ErrorMessages.EMAIL_INVALID) from err
 
-        user_do = await UserDB.get(session, email=new_user["email"])
-        assert user_do
-
         token = AuthManager.encode_token(user_do)
         refresh = AuthManager.encode_refresh_token(user_do)
 
@@ -73,15 +70,27 @@ class UserManager:
 
     @staticmethod
     async def login(user_data: dict[str, str], session: AsyncSession) -> tuple[str, str]:
-        """Log in an existing User."""
-        user_do = await UserDB.get(session, email=user_data["email"])
+        """Log in an existing User.
+
+        The User is read from the database: the cache holds no password
+        hash, and a ban or verification must count from the next login.
+        """
+        user_do = await UserDB.get(session, email=user_data["email"], use_cache=False)
 
-        if not user_do or not pwd_context.verify(user_data["password"], str(user_do.password)) or bool(user_do.banned):
+        valid, new_hash = False, None
+        if user_do:
+            valid, new_hash = await password_hasher.verify_and_update(user_data["password"], str(user_do.password))
+
+        if not valid or bool(user_do.banned):
             raise HTTPException(status.HTTP_400_BAD_REQUEST, ErrorMessages.AUTH_INVALID)
 
         if not bool(user_do.verified):
             raise HTTPException(status.HTTP_400_BAD_REQUEST, ErrorMessages.NOT_VERIFIED)
 
+        # the hash is of an older scheme or cost, store one of the current
+        if new_hash is not None:
+            await session.execute(update(User).where(User.id == user_do.id).values(password=new_hash))
+
         token = AuthManager.encode_token(user_do)
         refresh = AuthManager.encode_refresh_token(user_do)
 
@@ -90,74 +99,91 @@ class UserManager:
     @staticmethod
     async def delete_user(user_id: int, session: AsyncSession) -> None:
         """Delete the User with specified ID."""
-        check_user = await UserDB.get(session, user_id=user_id)
-        if not check_user:
+        result = await session.execute(delete(User).where(User.id == user_id).returning(User.id))
+        if result.scalar() is None:
             raise HTTPException(status.HTTP_404_NOT_FOUND, ErrorMessages.USER_INVALID)
-
-        await session.execute(delete(User).where(User.id == user_id))
+        await forget_user(session, user_id)
 
     @staticmethod
-    async def update_user(user_id: int, user_data: UserEditRequest, session: AsyncSession) -> None:
-        """Update the User with specified ID."""
-        check_user = await UserDB.get(session, user_id=user_id)
-        if not check_user:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, ErrorMessages.USER_INVALID)
-
-        await session.execute(
+    async def update_user(user_id: int, user_data: UserEditRequest, session: AsyncSession) -> User:
+        """Update the User with specified ID and return it."""
+        result = await session.execute(
             update(User).where(User.id == user_id).values(
                 email=user_data.email,
                 first_name=user_data.first_name,
                 last_name=user_data.last_name,
-                password=pwd_context.hash(user_data.password),
-            )
+                password=await password_hasher.hash(user_data.password),
+            ).returning(User),
+            execution_options={"populate_existing": True},
         )
+        user = result.scalar()
+        if user is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, ErrorMessages.USER_INVALID)
+        await forget_user(session, user_id)
+        return user
 
     @staticmethod
     async def change_password(user_id: int, user_data: UserChangePasswordRequest, session: AsyncSession) -> None:
         """Change the specified user's Password."""
-        check_user = await UserDB.get(session, user_id=user_id)
-        if not check_user:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, ErrorMessages.USER_INVALID)
-
-        await session.execute(
-            update(User).where(User.id == user_id).values(password=pwd_context.hash(user_data.password))
+        result = await session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(password=await password_hasher.hash(user_data.password))
+            .returning(User.id)
         )
+        if result.scalar() is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, ErrorMessages.USER_INVALID)
 
     @staticmethod
     async def set_ban_status(user_id: int, state: Optional[bool], my_id: int, session: AsyncSession) -> None:
-        """Ban or un-ban the specified user based on supplied status."""
+        """Ban or un-ban the specified user based on supplied status.
+
+        The update only matches a User whose ban status changes; when it
+        matches nothing, a second query finds out whether the User exists.
+        """
         if my_id == user_id:
             raise HTTPException(status.HTTP_400_BAD_REQUEST, ErrorMessages.CANT_SELF_BAN)
 
-        check_user = await UserDB.get(session, user_id)
-        if not check_user:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, ErrorMessages.USER_INVALID)
-
-        if bool(check_user.banned) == state:
+        result = await session.execute(
+            update(User).where(User.id == user_id, User.banned != state).values(banned=state).returning(User.id)
+        )
+        if result.scalar() is None:
+            if not await UserDB.exists(session, user_id):
+                raise HTTPException(status.HTTP_404_NOT_FOUND, ErrorMessages.USER_INVALID)
             raise HTTPException(status.HTTP_400_BAD_REQUEST, ErrorMessages.ALREADY_BANNED_OR_UNBANNED)
-
-        await session.execute(update(User).where(User.id == user_id).values(banned=state))
+        await forget_user(session, user_id)
 
     @staticmethod
     async def change_role(role: RoleType, user_id: int, session: AsyncSession) -> None:
         """Change the specified user's Role."""
         await session.execute(update(User).where(User.id == user_id).values(role=role))
+        await forget_user(session, user_id)
 
     @staticmethod
-    async def get_all_users(session: AsyncSession) -> Sequence[User]:
-        """Get all Users."""
-        return await UserDB.all(session)
+    async def get_all_users(session: AsyncSession, expand: Optional[str] = None) -> Sequence[User]:
+        """Get all Users, with the relationships named in `expand`."""
+        return await UserDB.all(session, expand=UserManager.parse_expand(expand))
 
     @staticmethod
-    async def get_user_by_id(user_id: int, session: AsyncSession) -> Type[User]:
-        """Return one user by ID."""
-        user = await session.get(User, user_id)
-        # print(user)
+    async def get_user_by_id(user_id: int, session: AsyncSession, expand: Optional[str] = None) -> Type[User]:
+        """Return one user by ID, with the relationships named in `expand`.
+
+        Without `expand` the User is read from `user_cache`.
+        """
+        user = await UserDB.get(session, user_id=user_id, expand=UserManager.parse_expand(expand))
         if not user:
             raise HTTPException(status.HTTP_404_NOT_FOUND, ErrorMessages.USER_INVALID)
 
         return user
 
+    @staticmethod
+    def parse_expand(expand: Optional[str]) -> frozenset[str]:
+        """Return the User relationships to load, or raise a 400."""
+        try:
+            return parse_expand(expand, USER_EXPANSIONS)
+        except ValueError as err:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, str(err)) from err
+
     @staticmethod
     async def get_user_by_email(email: str, session: AsyncSession) -> User:
         """Return one user by Email."""
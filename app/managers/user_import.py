@@ -0,0 +1,148 @@
+"""Define the bulk User importer.
+
+Rows come from a CSV file with a header line, or from NDJSON with one JSON
+object per line. Each needs an email, password, first_name and last_name.
+Bad rows are reported with their line number and skipped, the rest of the
+file is still imported.
+"""
+
+import asyncio
+import csv
+import io
+import json
+from collections.abc import Iterator
+from typing import Any, Literal, Optional
+
+from email_validator import EmailNotValidError, validate_email
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.helpers import UserDB
+from managers.password import PasswordHasher, import_password_hasher
+from settings import get_settings
+
+ImportFormat = Literal["csv", "ndjson"]
+
+FIELDS = ("email", "password", "first_name", "last_name")
+# longest value the users table takes for each field
+MAX_LENGTHS = {"email": 120, "first_name": 30, "last_name": 50}
+
+
+class ImportErrorMessages:
+    """Define the per-row error messages of an import."""
+
+    BAD_JSON = "This line is not a JSON object"
+    MISSING_FIELDS = "Missing or empty fields: {fields}"
+    TOO_LONG = "{field} is longer than {length} characters"
+    EMAIL_INVALID = "This email address is not valid"
+    DUPLICATE_IN_FILE = "This email appears earlier in the file"
+    EMAIL_EXISTS = "A User with this email already exists"
+    TOO_MANY_ROWS = "Files can have at most {max_rows} rows, split this one up"
+
+
+def guess_format(filename: str) -> ImportFormat:
+    """Return the import format for a file name, or raise ValueError."""
+    if filename.endswith(".csv"):
+        return "csv"
+    if filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    raise ValueError("Cannot tell the format from the file name, pass csv or ndjson")
+
+
+def parse_rows(content: str, fmt: ImportFormat) -> Iterator[tuple[int, Any]]:
+    """Yield (line number, row) for every row of the file.
+
+    A row that cannot be parsed is yielded as None.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(content))
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for number, line in enumerate(content.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def check_row(row: Any) -> tuple[dict[str, str], str]:
+    """Return the cleaned row and an error message, empty if it is valid."""
+    if row is None:
+        return {}, ImportErrorMessages.BAD_JSON
+
+    clean = {field: str(row.get(field) or "").strip() for field in FIELDS}
+    missing = [field for field in FIELDS if not clean[field]]
+    if missing:
+        return clean, ImportErrorMessages.MISSING_FIELDS.format(fields=", ".join(missing))
+
+    try:
+        clean["email"] = validate_email(clean["email"], check_deliverability=False).email
+    except EmailNotValidError:
+        return clean, ImportErrorMessages.EMAIL_INVALID
+
+    for field, length in MAX_LENGTHS.items():
+        if len(clean[field]) > length:
+            return clean, ImportErrorMessages.TOO_LONG.format(field=field, length=length)
+    return clean, ""
+
+
+class UserImporter:
+    """Class to import Users in bulk."""
+
+    @staticmethod
+    async def import_users(
+        content: str,
+        fmt: ImportFormat,
+        session: AsyncSession,
+        max_rows: Optional[int] = None,
+        hasher: PasswordHasher = import_password_hasher,
+    ) -> dict[str, Any]:
+        """Import every valid row and return a summary with the errors per row.
+
+        Passwords are hashed on `hasher`, by default the import pool rather
+        than the one logins use, user_import_hash_chunk_size at a time, and
+        the Users are loaded with COPY. Emails that are already taken are
+        reported as errors instead of failing the whole import.
+        """
+        errors = []
+        valid: list[tuple[int, dict[str, str]]] = []
+        seen = set()
+        received = 0
+        for line, row in parse_rows(content, fmt):
+            received += 1
+            if max_rows is not None and received > max_rows:
+                raise HTTPException(
+                    status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, ImportErrorMessages.TOO_MANY_ROWS.format(max_rows=max_rows)
+                )
+            clean, error = check_row(row)
+            if not error and clean["email"] in seen:
+                error = ImportErrorMessages.DUPLICATE_IN_FILE
+            if error:
+                errors.append({"line": line, "email": clean.get("email") or None, "error": error})
+                continue
+            seen.add(clean["email"])
+            valid.append((line, clean))
+
+        chunk_size = get_settings().user_import_hash_chunk_size
+        hashes: list[str] = []
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            hashes.extend(await asyncio.gather(*(hasher.hash(row["password"]) for _, row in chunk)))
+        records = [
+            (row["email"], hashed, row["first_name"], row["last_name"])
+            for (_, row), hashed in zip(valid, hashes)
+        ]
+        created = await UserDB.import_users(session, records) if records else set()
+
+        errors.extend(
+            {"line": line, "email": row["email"], "error": ImportErrorMessages.EMAIL_EXISTS}
+            for line, row in valid
+            if row["email"] not in created
+        )
+        errors.sort(key=lambda error: error["line"])
+        return {"received": received, "created": len(created), "failed": len(errors), "errors": errors}
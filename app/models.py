@@ -2,10 +2,12 @@
 
 from sqlalchemy import (
     Boolean, Enum, String, TEXT, Date, Time, DateTime,
-    Float, Integer, ForeignKey
+    Float, Integer, ForeignKey, Index, JSON, UniqueConstraint, Computed
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import date, time as t, datetime
+from typing import Optional
 
 from database.db import Base
 from utils.enums import (
@@ -33,9 +35,12 @@ class User(Base):
     banned: Mapped[bool] = mapped_column(Boolean, default=False)
     verified: Mapped[bool] = mapped_column(Boolean, default=False)
 
-    events: Mapped[list["Event"]] = relationship()
-    tickets: Mapped[list["Ticket"]] = relationship()
-    payments: Mapped[list["Payment"]] = relationship()
+    # Relationships never lazy load, which would be one query per row, or an
+    # error under asyncio. Load them explicitly with selectinload/joinedload,
+    # see EXPANSIONS in database/helpers.py.
+    events: Mapped[list["Event"]] = relationship(back_populates="organizer", lazy="raise")
+    tickets: Mapped[list["Ticket"]] = relationship(back_populates="user", lazy="raise")
+    payments: Mapped[list["Payment"]] = relationship(back_populates="user", lazy="raise")
 
     def __repr__(self) -> str:
         """Define the model representation."""
@@ -43,10 +48,30 @@ class User(Base):
 
 
 
+# the words of an Event, the title ranked highest and the description lowest
+EVENT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(category, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+
 class Event(Base):
     """Define the Events model."""
 
     __tablename__ = "events"
+    __table_args__ = (
+        # keyset pagination and the listing filters, see EventDB.page
+        Index("ix_events_start_date_id", "start_date", "id"),
+        Index("ix_events_status_start_date_id", "status", "start_date", "id"),
+        Index("ix_events_category_start_date_id", "category", "start_date", "id"),
+        Index("ix_events_organizer_id_start_date_id", "organizer_id", "start_date", "id"),
+        # full-text search, see EventDB.search
+        Index("ix_events_search_vector", "search_vector", postgresql_using="gin"),
+        # bounding box prefilter of the radius search, see EventDB.nearby
+        Index("ix_events_latitude_longitude", "latitude", "longitude"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(120), unique=True, index=True)
@@ -61,7 +86,22 @@ class Event(Base):
     ticked_count: Mapped[int] = mapped_column(Integer)
 
     location: Mapped[str] = mapped_column(String(150))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
+    # in degrees, both set or both null; Events without them are not found
+    # by the radius search
+    latitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    longitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    # kept up to date by Postgres; the 'simple' config does no stemming, as
+    # events are not all in English. Never loaded unless asked for.
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(EVENT_SEARCH_VECTOR, persisted=True),
+        deferred=True,
+        deferred_raiseload=True,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
 
     status: Mapped[EventStatus] = mapped_column(
         Enum(EventStatus),
@@ -71,9 +111,9 @@ class Event(Base):
     )
 
     organizer_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    organizer: Mapped[User] = relationship("User", back_populates="events")
+    organizer: Mapped[User] = relationship("User", back_populates="events", lazy="raise")
 
-    tickets: Mapped[list["Ticket"]] = relationship()
+    tickets: Mapped[list["Ticket"]] = relationship(back_populates="event", lazy="raise")
 
 
     def __repr__(self) -> str:
@@ -85,6 +125,9 @@ class Ticket(Base):
     """Define the Tickets model."""
 
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_event_id_user_id", "event_id", "user_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     status: Mapped[TickedStatus] = mapped_column(
@@ -94,15 +137,15 @@ class Ticket(Base):
         index=True,
     )
 
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    user: Mapped[User] = relationship("User", back_populates="tickets")
+    user: Mapped[User] = relationship("User", back_populates="tickets", lazy="raise")
 
     event_id: Mapped[int] = mapped_column(ForeignKey("events.id"))
-    event: Mapped[Event] = relationship("Event", back_populates="tickets")
+    event: Mapped[Event] = relationship("Event", back_populates="tickets", lazy="raise")
 
-    payments: Mapped[list["Payment"]] = relationship()
+    payments: Mapped[list["Payment"]] = relationship(back_populates="ticket", lazy="raise")
 
 
     def __repr__(self) -> str:
@@ -114,10 +157,13 @@ class Payment(Base):
     """Define the Payments model."""
 
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_ticket_id", "ticket_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     amount: Mapped[float] = mapped_column(Float)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
     payment_method: Mapped[PaymentMethod] = mapped_column(
         Enum(PaymentMethod),
@@ -133,21 +179,40 @@ class Payment(Base):
     )
     card_number: Mapped[str] = mapped_column(String(16), nullable=True)
     exp_date: Mapped[str] = mapped_column(String(5), nullable=True)
+    # the gateway's reference to the card, for Payments settled later
+    card_token: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    user: Mapped[User] = relationship("User", back_populates="payments")
+    user: Mapped[User] = relationship("User", back_populates="payments", lazy="raise")
 
     ticket_id: Mapped[int] = mapped_column(ForeignKey("tickets.id"))
-    ticket: Mapped[Ticket] = relationship("Ticket", back_populates="payments")
+    ticket: Mapped[Ticket] = relationship("Ticket", back_populates="payments", lazy="raise")
 
     def __repr__(self) -> str:
         """Define the model representation."""
         return f'Payment ({self.id}, "{self.status}")'
 
 
+class IdempotencyKey(Base):
+    """Define the Idempotency Keys model.
 
+    Stores the response of a request sent with an `Idempotency-Key` header so
+    a retry of the same request returns it instead of running again.
+    """
 
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key"),
+    )
 
+    id: Mapped[int] = mapped_column(primary_key=True)
+    key: Mapped[str] = mapped_column(String(255))
+    request_hash: Mapped[str] = mapped_column(String(64))
+    response: Mapped[dict] = mapped_column(JSON, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
 
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
 
-
+    def __repr__(self) -> str:
+        """Define the model representation."""
+        return f'IdempotencyKey({self.id}, "{self.key}")'
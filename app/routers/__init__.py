@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from . import index, auth, user, event_routers
+from . import index, auth, user, event_routers, ticket_routers, payment_routers, metrics
 
 
 routers = APIRouter()
@@ -9,3 +9,6 @@ routers.include_router(auth.router)
 routers.include_router(user.router)
 
 routers.include_router(event_routers.router)
+routers.include_router(ticket_routers.router)
+routers.include_router(payment_routers.router)
+routers.include_router(metrics.router)
@@ -1,18 +1,31 @@
 """Routes for Events listing and control."""
 
-from collections.abc import Sequence
-from typing import Optional, Union
+from datetime import date
+from typing import Any, Optional, Union
 
-from fastapi import APIRouter, Depends, Request, status, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Query, Request, Response, status, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from database.db import get_database
+from database.db import get_database, get_read_database, get_session_factory
+from database.helpers import EventDB
 from managers.auth import can_edit_user, is_admin, oauth2_schema, is_organizer
 from managers.event_manager import EventManager
+from managers.export import MEDIA_TYPES, ExportFormat, stream_export
 from utils.enums import RoleType
 from models import User, Event
 from schemas.user import UserChangePasswordRequest, UserEditRequest, MyUserResponse, UserResponse
-from schemas.event_schemas import EventRequestSchema, EventResponseSchema, EventEditRequestSchema
+from schemas.event_schemas import (
+    EventEditRequestSchema,
+    EventNearbyPageSchema,
+    EventPageSchema,
+    EventPatchRequestSchema,
+    EventRequestSchema,
+    EventResponseSchema,
+    EventSearchPageSchema,
+)
+from settings import get_settings
+from utils.enums import EventStatus
 from watchfiles import awatch
 
 router = APIRouter(tags=["Events"], prefix="/events")
@@ -25,13 +38,129 @@ async def create_event(request: Request, event_data: EventRequestSchema, db: Asy
     return event
 
 
-@router.get("/list/", response_model=Union[EventResponseSchema, list[EventResponseSchema]], status_code=status.HTTP_200_OK)
-async def get_events(db: AsyncSession = Depends(get_database), event_id: Optional[int] = None) -> Union[Sequence[Event], Event]:
-    """Get the current event's data only."""
+@router.get("/list/", response_model=Union[EventResponseSchema, EventPageSchema], status_code=status.HTTP_200_OK)
+async def get_events(
+        request: Request,
+        db: AsyncSession = Depends(get_read_database),
+        event_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = Query(None, ge=1, le=get_settings().events_max_page_size),
+        event_status: Optional[EventStatus] = Query(None, alias="status"),
+        category: Optional[str] = None,
+        start_from: Optional[date] = None,
+        start_to: Optional[date] = None,
+        organizer_id: Optional[int] = None,
+        expand: Optional[str] = Query(None, examples=["organizer,tickets"]),
+        session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> Union[dict[str, Any], Event, Response]:
+    """Get one event by its ID, or a page of events.
+
+    Pages are ordered by (start_date, id). Pass the returned `next_cursor` as
+    `cursor` to fetch the next page; it is null on the last page.
+
+    `expand` is a comma separated list of `organizer` and `tickets` to
+    include with every event.
+
+    Responses without `expand` carry an ETag, and a single event a
+    Last-Modified too; send them back as If-None-Match or If-Modified-Since
+    to get a 304 when nothing changed.
+    """
+    if not expand:
+        return await EventManager.cached_read(
+            request,
+            key=(event_id, cursor, limit, event_status, category, start_from, start_to, organizer_id),
+            read=lambda session: EventManager.read_events(
+                session,
+                event_id,
+                limit=limit,
+                cursor=cursor,
+                event_status=event_status,
+                category=category,
+                start_from=start_from,
+                start_to=start_to,
+                organizer_id=organizer_id,
+            ),
+            session_factory=session_factory,
+        )
     if event_id is None:
-        return await EventManager.get_all_events(db)
-    return await EventManager.get_event_by_id(session=db, event_id=event_id)
-
+        return await EventManager.list_events(
+            db,
+            limit=limit,
+            cursor=cursor,
+            event_status=event_status,
+            category=category,
+            start_from=start_from,
+            start_to=start_to,
+            organizer_id=organizer_id,
+            expand=expand,
+        )
+    return await EventManager.get_event_by_id(session=db, event_id=event_id, expand=expand)
+
+
+@router.get("/search", response_model=EventSearchPageSchema)
+async def search_events(
+        q: str = Query(min_length=1, max_length=200, examples=['concert tashkent -jazz']),
+        limit: Optional[int] = Query(None, ge=1, le=get_settings().events_max_page_size),
+        offset: int = Query(0, ge=0, le=get_settings().events_search_max_offset),
+        db: AsyncSession = Depends(get_read_database),
+) -> ORJSONResponse:
+    """Search the title, category, location and description of the events.
+
+    `q` takes the syntax of web search engines: words, "quoted phrases",
+    `or` and `-word` to leave a word out. Results are ranked, best match
+    first, title matches above the rest. Pass the returned `next_offset` as
+    `offset` to fetch the next page; it is null on the last page.
+    """
+    page = await EventManager.search_events(db, q, limit=limit, offset=offset)
+    # the rows already match EventSearchPageSchema, skip validating them
+    return ORJSONResponse(page)
+
+
+@router.get("/nearby", response_model=EventNearbyPageSchema)
+async def nearby_events(
+        lat: float = Query(ge=-90, le=90, examples=[41.2995]),
+        lon: float = Query(ge=-180, le=180, examples=[69.2401]),
+        radius_km: Optional[float] = Query(None, gt=0, le=get_settings().events_nearby_max_radius_km),
+        limit: Optional[int] = Query(None, ge=1, le=get_settings().events_max_page_size),
+        offset: int = Query(0, ge=0, le=get_settings().events_search_max_offset),
+        db: AsyncSession = Depends(get_read_database),
+) -> ORJSONResponse:
+    """List the events within `radius_km` of a point, nearest first.
+
+    Each event comes with its `distance_km` from the point. Events without
+    a latitude and longitude are left out. Pass the returned `next_offset`
+    as `offset` to fetch the next page; it is null on the last page.
+    """
+    page = await EventManager.nearby_events(db, lat, lon, radius_km=radius_km, limit=limit, offset=offset)
+    # the rows already match EventNearbyPageSchema, skip validating them
+    return ORJSONResponse(page)
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(oauth2_schema), Depends(is_admin)],
+    response_class=StreamingResponse,
+)
+async def export_events(
+        file_format: ExportFormat = Query("ndjson", alias="format"),
+        event_status: Optional[EventStatus] = Query(None, alias="status"),
+        category: Optional[str] = None,
+        start_from: Optional[date] = None,
+        start_to: Optional[date] = None,
+        organizer_id: Optional[int] = None,
+        session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> StreamingResponse:
+    """Stream the Events as NDJSON or CSV, ordered by id. | Admins only.
+
+    Takes the same filters as the event listing. Rows are sent as they are
+    read, so any number of Events can be exported.
+    """
+    query = EventDB.export_query(*EventDB.filters(event_status, category, start_from, start_to, organizer_id))
+    return StreamingResponse(
+        stream_export(session_factory, query, file_format),
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="events.{file_format}"'},
+    )
 
 
 @router.put("/{event_id}", response_model=EventResponseSchema, dependencies=[Depends(oauth2_schema), Depends(is_organizer)])
@@ -44,6 +173,17 @@ async def update_event(request: Request, event_id: int, event_data: EventEditReq
     )
 
 
+@router.patch("/{event_id}", response_model=EventResponseSchema, dependencies=[Depends(oauth2_schema), Depends(is_organizer)])
+async def patch_event(request: Request, event_id: int, event_data: EventPatchRequestSchema, db: AsyncSession = Depends(get_database)) -> Event:
+    """Update only the fields that are sent. | The Event's organizer only."""
+    return await EventManager.update_event(
+        event_id=event_id,
+        event_data=event_data,
+        session=db,
+        organizer_id=request.state.user.id,
+    )
+
+
 
 
 
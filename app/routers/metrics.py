@@ -0,0 +1,62 @@
+"""Internal routes reporting runtime metrics | Admins only."""
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from database.cache import backend, namespaces, principal_cache
+from database.db import async_engine, replica_engine
+from database.pool import pool_status
+from managers.auth import is_admin, oauth2_schema
+from managers.password import import_password_hasher, password_hasher
+from managers.settlement import settlement_worker
+from schemas.metrics import (
+    CacheStatsResponse,
+    PasswordHasherStatsResponse,
+    PoolStatsResponse,
+    SettlementStatsResponse,
+    SharedCacheStatsResponse,
+)
+
+router = APIRouter(
+    tags=["Metrics"],
+    prefix="/metrics",
+    dependencies=[Depends(oauth2_schema), Depends(is_admin)],
+)
+
+
+@router.get("/auth-cache", response_model=CacheStatsResponse)
+async def get_auth_cache_stats() -> dict[str, Any]:
+    """Return the counters of the authenticated-user cache."""
+    return await principal_cache.stats()
+
+
+@router.get("/cache", response_model=SharedCacheStatsResponse)
+async def get_cache_stats() -> dict[str, Any]:
+    """Return the hit ratio, size and evictions of every namespace of the shared cache."""
+    return {
+        "backend": backend.name,
+        "namespaces": [{"namespace": cache.namespace, **await cache.stats()} for cache in namespaces],
+    }
+
+
+@router.get("/password-hasher", response_model=PasswordHasherStatsResponse)
+async def get_password_hasher_stats(imports: bool = False) -> dict[str, Any]:
+    """Return the queue depth and counters of the login, or bulk import, password hashing pool."""
+    return (import_password_hasher if imports else password_hasher).stats()
+
+
+@router.get("/db-pool", response_model=PoolStatsResponse)
+async def get_db_pool_stats(replica: bool = False) -> dict[str, Any]:
+    """Return the state of the primary, or read replica, connection pool."""
+    if replica:
+        if replica_engine is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "No read replica is configured")
+        return pool_status(replica_engine)
+    return pool_status(async_engine)
+
+
+@router.get("/settlement", response_model=SettlementStatsResponse)
+async def get_settlement_stats() -> dict[str, Any]:
+    """Return the counters and throughput of the settlement worker in this process."""
+    return settlement_worker.stats()
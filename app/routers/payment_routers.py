@@ -0,0 +1,53 @@
+"""Routes for paying for Tickets."""
+
+from collections.abc import Sequence
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, Header, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database.db import get_read_database, get_session_factory
+from managers.auth import oauth2_schema
+from managers.payment_manager import PaymentManager
+from models import Payment
+from schemas.payment_schemas import PaymentRequestSchema, PaymentResponseSchema
+
+router = APIRouter(tags=["Payments"], prefix="/tickets")
+
+
+@router.post(
+    "/{ticket_id}/payments",
+    dependencies=[Depends(oauth2_schema)],
+    response_model=PaymentResponseSchema,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_payment(
+        request: Request,
+        response: Response,
+        ticket_id: int,
+        payment_data: PaymentRequestSchema,
+        idempotency_key: Optional[str] = Header(None, max_length=255),
+        session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> dict[str, Any]:
+    """Pay for one of your Tickets.
+
+    Send an `Idempotency-Key` header to retry safely: a repeated request with
+    the same key and body returns the first result, with an
+    `Idempotent-Replayed: true` header, instead of charging again.
+    """
+    payment, replayed = await PaymentManager.create_payment(
+        ticket_id, request.state.user.id, payment_data, session_factory, idempotency_key
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return payment
+
+
+@router.get(
+    "/{ticket_id}/payments",
+    dependencies=[Depends(oauth2_schema)],
+    response_model=list[PaymentResponseSchema],
+)
+async def get_payments(request: Request, ticket_id: int, db: AsyncSession = Depends(get_read_database)) -> Sequence[Payment]:
+    """Get the current user's Payments for one of their Tickets."""
+    return await PaymentManager.get_payments(ticket_id, request.state.user.id, db)
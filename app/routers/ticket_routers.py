@@ -0,0 +1,59 @@
+"""Routes for buying and listing Tickets."""
+
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.db import get_database, get_read_database
+from managers.auth import oauth2_schema
+from managers.ticket_manager import TicketManager
+from models import Ticket
+from schemas.ticket_schemas import BulkTicketRequestSchema, BulkTicketResponseSchema, TicketResponseSchema
+
+router = APIRouter(tags=["Tickets"], prefix="/events")
+
+
+@router.post(
+    "/{event_id}/tickets",
+    dependencies=[Depends(oauth2_schema)],
+    response_model=TicketResponseSchema,
+    status_code=status.HTTP_201_CREATED,
+)
+async def buy_ticket(request: Request, event_id: int, db: AsyncSession = Depends(get_database)) -> Ticket:
+    """Buy one ticket for the Event.
+
+    Returns 409 once the Event is sold out.
+    """
+    return await TicketManager.buy_ticket(event_id, request.state.user.id, db)
+
+
+@router.post(
+    "/{event_id}/tickets/bulk",
+    dependencies=[Depends(oauth2_schema)],
+    response_model=BulkTicketResponseSchema,
+    status_code=status.HTTP_201_CREATED,
+)
+async def buy_tickets(
+        request: Request,
+        event_id: int,
+        ticket_data: BulkTicketRequestSchema,
+        db: AsyncSession = Depends(get_database),
+) -> dict[str, Any]:
+    """Buy several tickets for the Event at once, for group bookings.
+
+    Either every ticket is bought or none is; returns 409 if there are not
+    enough seats left.
+    """
+    return await TicketManager.buy_tickets(event_id, request.state.user.id, ticket_data.quantity, db)
+
+
+@router.get(
+    "/{event_id}/tickets",
+    dependencies=[Depends(oauth2_schema)],
+    response_model=list[TicketResponseSchema],
+)
+async def get_my_tickets(request: Request, event_id: int, db: AsyncSession = Depends(get_read_database)) -> Sequence[Ticket]:
+    """Get the current user's Tickets for the Event."""
+    return await TicketManager.get_user_tickets(event_id, request.state.user.id, db)
@@ -1,17 +1,22 @@
 """Routes for User listing and control."""
 
 from collections.abc import Sequence
-from typing import Optional, Union
+from typing import Any, Optional, Union
 
-from fastapi import APIRouter, Depends, Request, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from database.db import get_database
+from database.db import get_database, get_read_database, get_session_factory
+from database.helpers import UserDB
 from managers.auth import can_edit_user, is_admin, oauth2_schema
+from managers.export import MEDIA_TYPES, ExportFormat, stream_export
 from managers.user import UserManager
+from managers.user_import import ImportFormat, UserImporter, guess_format
 from utils.enums import RoleType
 from models import User
-from schemas.user import UserChangePasswordRequest, UserEditRequest, MyUserResponse, UserResponse
+from schemas.user import UserChangePasswordRequest, UserEditRequest, MyUserResponse, UserImportResponse, UserResponse
+from settings import get_settings
 
 router = APIRouter(tags=["Users"], prefix="/users")
 
@@ -20,16 +25,22 @@ router = APIRouter(tags=["Users"], prefix="/users")
             dependencies=[Depends(oauth2_schema), Depends(is_admin)],
             response_model=Union[UserResponse, list[UserResponse]],
             )
-async def get_users(user_id: Optional[int] = None, db: AsyncSession = Depends(get_database)) -> Union[Sequence[User], User]:
+async def get_users(
+        user_id: Optional[int] = None,
+        expand: Optional[str] = Query(None, examples=["events,tickets,payments"]),
+        db: AsyncSession = Depends(get_read_database),
+) -> Union[Sequence[User], User]:
     """Get all users or a specific user by their ID.
 
     user_id is optional, and if omitted then all Users are returned.
+    `expand` is a comma separated list of `events`, `tickets` and `payments`
+    to include with every user.
 
     This route is only allowed for Admins.
     """
     if user_id:
-        return await UserManager.get_user_by_id(user_id, db)
-    return await UserManager.get_all_users(db)
+        return await UserManager.get_user_by_id(user_id, db, expand)
+    return await UserManager.get_all_users(db, expand)
 
 
 @router.get(
@@ -38,10 +49,59 @@ async def get_users(user_id: Optional[int] = None, db: AsyncSession = Depends(ge
     response_model=MyUserResponse,
     name="get_my_user_data",
 )
-async def get_my_user(request: Request, db: AsyncSession = Depends(get_database)) -> User:
-    """Get the current user's data only."""
+async def get_my_user(
+        request: Request,
+        expand: Optional[str] = Query(None, examples=["tickets,payments"]),
+        db: AsyncSession = Depends(get_read_database),
+) -> User:
+    """Get the current user's data only, with the relationships in `expand`."""
     my_user: int = request.state.user.id
-    return await UserManager.get_user_by_id(my_user, db)
+    return await UserManager.get_user_by_id(my_user, db, expand)
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(oauth2_schema), Depends(is_admin)],
+    response_class=StreamingResponse,
+)
+async def export_users(
+        file_format: ExportFormat = Query("ndjson", alias="format"),
+        session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> StreamingResponse:
+    """Stream every User as NDJSON or CSV, without passwords. | Admins only.
+
+    Rows are sent as they are read, so any number of Users can be exported.
+    """
+    return StreamingResponse(
+        stream_export(session_factory, UserDB.export_query(), file_format),
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="users.{file_format}"'},
+    )
+
+
+@router.post(
+    "/import",
+    dependencies=[Depends(oauth2_schema), Depends(is_admin)],
+    response_model=UserImportResponse,
+)
+async def import_users(
+        file: UploadFile,
+        file_format: Optional[ImportFormat] = Query(None, alias="format"),
+        db: AsyncSession = Depends(get_database),
+) -> dict[str, Any]:
+    """Create Users in bulk from a CSV or NDJSON file. | Admins only.
+
+    Every row needs an email, password, first_name and last_name; CSV files
+    need a header line. The format is taken from the file extension unless
+    `format` is given. Invalid rows and emails already in use are reported
+    per line and skipped, every other row is imported.
+    """
+    try:
+        fmt = file_format or guess_format(file.filename or "")
+        content = (await file.read()).decode("utf-8-sig")
+    except (ValueError, UnicodeDecodeError) as err:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(err)) from err
+    return await UserImporter.import_users(content, fmt, db, max_rows=get_settings().user_import_max_rows)
 
 
 @router.post(
@@ -95,10 +155,9 @@ async def unban_user(request: Request, user_id: int, db: AsyncSession = Depends(
     status_code=status.HTTP_200_OK,
     response_model=MyUserResponse,
 )
-async def edit_user(user_id: int, user_data: UserEditRequest, db: AsyncSession = Depends(get_database)) -> Union[User, None]:
+async def edit_user(user_id: int, user_data: UserEditRequest, db: AsyncSession = Depends(get_database)) -> User:
     """Update the specified User's data. | Available for the specific requesting User, or an Admin."""
-    await UserManager.update_user(user_id, user_data, db)
-    return await db.get(User, user_id)
+    return await UserManager.update_user(user_id, user_data, db)
 
 
 @router.delete("/{user_id}", dependencies=[Depends(oauth2_schema), Depends(is_admin)], status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,34 @@
+"""Define the base Schema for responses built from models."""
+
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, SerializerFunctionWrapHandler, model_serializer, model_validator
+from sqlalchemy import inspect
+
+
+class ExpandableSchema(BaseModel):
+    """Response Schema whose relationship fields are filled only when loaded.
+
+    Relationships are `lazy="raise"`, so reading one that was not loaded with
+    `?expand=` would fail. Those fields are left unset instead, and unset
+    fields are left out of the response.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @model_validator(mode="before")
+    @classmethod
+    def skip_unloaded_relationships(cls, data: Any) -> Any:
+        """Read only the loaded relationships of a model instance."""
+        state = inspect(data, raiseerr=False)
+        if state is None or not hasattr(state, "unloaded"):
+            return data
+
+        skip = state.unloaded.intersection(state.mapper.relationships.keys())
+        return {name: getattr(data, name) for name in cls.model_fields if name not in skip and hasattr(data, name)}
+
+    # no return annotation, so the OpenAPI schema is still the model's own
+    @model_serializer(mode="wrap")
+    def drop_unset(self, handler: SerializerFunctionWrapHandler):  # noqa: ANN201
+        """Leave the relationships that were not loaded out of the output."""
+        return {name: value for name, value in handler(self).items() if name in self.model_fields_set}
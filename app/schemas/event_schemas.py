@@ -1,5 +1,8 @@
-from  pydantic import BaseModel, Field
-from .examples import ExampleEvent
+from  pydantic import BaseModel, Field, model_validator
+from typing import Optional
+from .base import ExpandableSchema
+from .examples import ExampleEvent, ExampleUser
+from .ticket_schemas import TicketResponseSchema
 from datetime import datetime, time as t
 from utils.enums import EventStatus
 
@@ -15,27 +18,116 @@ class BaseEvent(BaseModel):
     ticked_price: int = Field(examples=[ExampleEvent.ticked_price])
     ticked_count: int = Field(examples=[ExampleEvent.ticked_count])
     location: str = Field(examples=[ExampleEvent.location])
+    latitude: Optional[float] = Field(None, ge=-90, le=90, examples=[ExampleEvent.latitude])
+    longitude: Optional[float] = Field(None, ge=-180, le=180, examples=[ExampleEvent.longitude])
+
+    @model_validator(mode="after")
+    def check_coordinates(self) -> "BaseEvent":
+        """The latitude and longitude are given together or not at all."""
+        check_coordinates(self.latitude, self.longitude)
+        return self
+
+
+def check_coordinates(latitude: Optional[float], longitude: Optional[float]) -> None:
+    """Raise ValueError unless both coordinates or neither are set."""
+    if (latitude is None) != (longitude is None):
+        raise ValueError("latitude and longitude must be set together")
 
 
 class EventRequestSchema(BaseEvent):
     pass
 
 
-class EventResponseSchema(BaseEvent):
+class OrganizerSchema(BaseModel):
+    """The public details of an Event's organizer."""
+
+    id: int = Field(examples=[ExampleEvent.organizer_id])
+    first_name: str = Field(examples=[ExampleUser.first_name])
+    last_name: str = Field(examples=[ExampleUser.last_name])
+    email: str = Field(examples=[ExampleUser.email])
+
+
+class EventResponseSchema(BaseEvent, ExpandableSchema):
     id: int = Field(examples=[ExampleEvent.id])
     organizer_id: int = Field(examples=[ExampleEvent.organizer_id])
 
     created_at: datetime = Field(examples=[ExampleEvent.created_at])
+    updated_at: datetime = Field(examples=[ExampleEvent.updated_at])
     status: EventStatus = Field(examples=[ExampleEvent.status])
 
+    # only present when asked for with ?expand=
+    organizer: Optional[OrganizerSchema] = None
+    tickets: Optional[list[TicketResponseSchema]] = None
+
 
 
 class EventEditRequestSchema(BaseEvent):
     status: EventStatus = Field(examples=[ExampleEvent.status])
 
 
+class EventPatchRequestSchema(BaseModel):
+    """Request Schema for a partial Event update, only sent fields change."""
+
+    title: Optional[str] = Field(None, examples=[ExampleEvent.title])
+    description: Optional[str] = Field(None, examples=[ExampleEvent.description])
+    category: Optional[str] = Field(None, examples=[ExampleEvent.category])
+    start_date: Optional[datetime] = Field(None, examples=[ExampleEvent.start_date])
+    end_date: Optional[datetime] = Field(None, examples=[ExampleEvent.end_date])
+    time: Optional[t] = Field(None, examples=[ExampleEvent.time])
+    ticked_price: Optional[int] = Field(None, examples=[ExampleEvent.ticked_price])
+    ticked_count: Optional[int] = Field(None, examples=[ExampleEvent.ticked_count])
+    location: Optional[str] = Field(None, examples=[ExampleEvent.location])
+    latitude: Optional[float] = Field(None, ge=-90, le=90, examples=[ExampleEvent.latitude])
+    longitude: Optional[float] = Field(None, ge=-180, le=180, examples=[ExampleEvent.longitude])
+    status: Optional[EventStatus] = Field(None, examples=[ExampleEvent.status])
+
+    @model_validator(mode="after")
+    def check_not_null(self) -> "EventPatchRequestSchema":
+        """Fields can be left out, but none of them can be set to null.
+
+        The coordinates are the exception: setting both to null removes them.
+        """
+        nulls = sorted(
+            name
+            for name in self.model_fields_set - {"latitude", "longitude"}
+            if getattr(self, name) is None
+        )
+        if nulls:
+            raise ValueError(f"{', '.join(nulls)} cannot be null")
+        if ("latitude" in self.model_fields_set) != ("longitude" in self.model_fields_set):
+            raise ValueError("latitude and longitude must be set together")
+        check_coordinates(self.latitude, self.longitude)
+        return self
+
+
+class EventPageSchema(BaseModel):
+    """One page of Events plus the cursor to fetch the next one."""
+
+    items: list[EventResponseSchema]
+    next_cursor: Optional[str] = Field(default=None, examples=["MjAyNC0wMS0wMXwx"])
+
+
+class EventSearchResultSchema(EventResponseSchema):
+    """An Event found by a search, with how well it matched."""
+
+    rank: float = Field(examples=[0.6])
+
+
+class EventSearchPageSchema(BaseModel):
+    """One page of search results plus the offset of the next one."""
+
+    items: list[EventSearchResultSchema]
+    next_offset: Optional[int] = Field(default=None, examples=[20])
+
 
+class EventNearbyResultSchema(EventResponseSchema):
+    """An Event found by a radius search, with its distance from the centre."""
 
+    distance_km: float = Field(examples=[2.4])
 
 
+class EventNearbyPageSchema(BaseModel):
+    """One page of Events near a point plus the offset of the next one."""
 
+    items: list[EventNearbyResultSchema]
+    next_offset: Optional[int] = Field(default=None, examples=[20])
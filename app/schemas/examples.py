@@ -1,7 +1,7 @@
 """Example data for Schemas."""
 
 from datetime import datetime
-from utils.enums import EventStatus
+from utils.enums import EventStatus, PaymentMethod, PaymentStatus, TickedStatus
 
 class ExampleUser:
     """Define a dummy user for Schema examples."""
@@ -33,18 +33,33 @@ class ExampleEvent:
     ticked_count = 5000
 
     location = "San Francisco, CA"
+    latitude = 37.7749
+    longitude = -122.4194
     created_at = datetime.now()
+    updated_at = datetime.now()
     status = EventStatus.not_started
 
 
+class ExampleTicket:
+    """Define a dummy ticket for Schema examples."""
 
+    id = 1
+    event_id = 1
+    user_id = 25
+    status = TickedStatus.not_available
+    created_at = datetime.now()
 
 
+class ExamplePayment:
+    """Define a dummy payment for Schema examples."""
 
-
-
-
-
-
-
-
+    id = 1
+    ticket_id = 1
+    user_id = 25
+    amount = 10
+    payment_method = PaymentMethod.card
+    status = PaymentStatus.approved
+    card_number = "4242424242424242"
+    masked_card_number = "************4242"
+    exp_date = "12/30"
+    created_at = datetime.now()
@@ -0,0 +1,75 @@
+"""Define Response schemas for the internal metrics routes."""
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class CacheStatsResponse(BaseModel):
+    """Size and hit/miss counters of one cache namespace.
+
+    `max_size` and `evictions` are those of the whole backend, `max_size`
+    is null for Redis, which is bounded by memory instead.
+    """
+
+    size: int
+    max_size: Optional[int]
+    ttl: float
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+
+
+class CacheNamespaceStatsResponse(CacheStatsResponse):
+    """The counters of a cache namespace, with its name."""
+
+    namespace: str
+
+
+class SharedCacheStatsResponse(BaseModel):
+    """The backend of the shared cache and the counters of every namespace."""
+
+    backend: str
+    namespaces: list[CacheNamespaceStatsResponse]
+
+
+class PasswordHasherStatsResponse(BaseModel):
+    """Pool size, queue depth and job counters of the password hasher."""
+
+    executor: str
+    max_workers: int
+    in_flight: int
+    queued: int
+    peak_queued: int
+    completed: int
+    avg_wait_ms: float
+
+
+class PoolStatsResponse(BaseModel):
+    """State and checkout counters of the database connection pool."""
+
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    idle: int
+    overflow: int
+    acquisitions: int
+    timeouts: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class SettlementStatsResponse(BaseModel):
+    """Counters and throughput of the Payment settlement worker."""
+
+    running: bool
+    batch_size: int
+    concurrency: int
+    batches: int
+    settled: int
+    errors: int
+    by_status: dict[str, int]
+    avg_batch_ms: float
+    last_batch_ms: float
+    payments_per_second: float
@@ -0,0 +1,42 @@
+"""Define Schemas used by the Payment routes."""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from schemas.examples import ExamplePayment
+from utils.enums import PaymentMethod, PaymentStatus
+
+
+class PaymentRequestSchema(BaseModel):
+    """Request Schema for paying for a Ticket."""
+
+    payment_method: PaymentMethod = Field(examples=[ExamplePayment.payment_method])
+    card_number: Optional[str] = Field(None, pattern=r"^\d{16}$", examples=[ExamplePayment.card_number])
+    exp_date: Optional[str] = Field(None, pattern=r"^\d{2}/\d{2}$", examples=[ExamplePayment.exp_date])
+
+    @model_validator(mode="after")
+    def check_card_details(self) -> "PaymentRequestSchema":
+        """Card payments need both the card number and the expiry date."""
+        if self.payment_method == PaymentMethod.card and not (self.card_number and self.exp_date):
+            raise ValueError("card_number and exp_date are required for card payments")
+        return self
+
+
+class PaymentResponseSchema(BaseModel):
+    """Response Schema for a Payment.
+
+    Only the last four digits of the card number are ever stored.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(examples=[ExamplePayment.id])
+    ticket_id: int = Field(examples=[ExamplePayment.ticket_id])
+    user_id: int = Field(examples=[ExamplePayment.user_id])
+    amount: float = Field(examples=[ExamplePayment.amount])
+    payment_method: PaymentMethod = Field(examples=[ExamplePayment.payment_method])
+    status: PaymentStatus = Field(examples=[ExamplePayment.status])
+    card_number: Optional[str] = Field(examples=[ExamplePayment.masked_card_number])
+    created_at: datetime = Field(examples=[ExamplePayment.created_at])
@@ -0,0 +1,41 @@
+"""Define Schemas used by the Ticket routes."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from schemas.examples import ExampleTicket
+from settings import get_settings
+from utils.enums import TickedStatus
+
+
+class TicketResponseSchema(BaseModel):
+    """Response Schema for a Ticket."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(examples=[ExampleTicket.id])
+    event_id: int = Field(examples=[ExampleTicket.event_id])
+    user_id: int = Field(examples=[ExampleTicket.user_id])
+    status: TickedStatus = Field(examples=[ExampleTicket.status])
+    created_at: datetime = Field(examples=[ExampleTicket.created_at])
+
+
+class BulkTicketRequestSchema(BaseModel):
+    """Request Schema for buying several Tickets at once."""
+
+    quantity: int = Field(ge=1, le=get_settings().tickets_max_bulk_quantity, examples=[4])
+
+
+class TicketStatusSchema(BaseModel):
+    """The id and status of a newly bought Ticket."""
+
+    id: int = Field(examples=[ExampleTicket.id])
+    status: TickedStatus = Field(examples=[ExampleTicket.status])
+
+
+class BulkTicketResponseSchema(BaseModel):
+    """Response Schema for a bulk Ticket purchase."""
+
+    event_id: int = Field(examples=[ExampleTicket.event_id])
+    tickets: list[TicketStatusSchema]
@@ -1,9 +1,15 @@
 """Define Schemas used by the User routes."""
 
 
+from typing import Optional
+
 from utils.enums import RoleType
 from pydantic import BaseModel, ConfigDict, Field
+from schemas.base import ExpandableSchema
+from schemas.event_schemas import EventResponseSchema
 from schemas.examples import ExampleUser
+from schemas.payment_schemas import PaymentResponseSchema
+from schemas.ticket_schemas import TicketResponseSchema
 
 
 class UserBase(BaseModel):
@@ -52,7 +58,15 @@ class UserChangePasswordRequest(BaseModel):
 
 """Define Response schemas specific to the Users."""
 
-class UserResponse(UserBase):
+class UserRelationships(ExpandableSchema):
+    """The relationships of a User, only present when asked for with ?expand=."""
+
+    events: Optional[list[EventResponseSchema]] = None
+    tickets: Optional[list[TicketResponseSchema]] = None
+    payments: Optional[list[PaymentResponseSchema]] = None
+
+
+class UserResponse(UserBase, UserRelationships):
     """Response Schema for a User."""
 
     id: int = Field(ExampleUser.id)
@@ -63,8 +77,25 @@ class UserResponse(UserBase):
     verified: bool = Field(examples=[ExampleUser.verified])
 
 
-class MyUserResponse(UserBase):
+class MyUserResponse(UserBase, UserRelationships):
     """Response for non-admin getting their own User data."""
 
     first_name: str = Field(examples=[ExampleUser.first_name])
-    last_name: str = Field(examples=[ExampleUser.last_name])
\ No newline at end of file
+    last_name: str = Field(examples=[ExampleUser.last_name])
+
+
+class UserImportError(BaseModel):
+    """A row of a bulk import that was not imported."""
+
+    line: int = Field(examples=[3])
+    email: Optional[str] = Field(examples=[ExampleUser.email])
+    error: str = Field(examples=["A User with this email already exists"])
+
+
+class UserImportResponse(BaseModel):
+    """Summary of a bulk User import."""
+
+    received: int = Field(examples=[1000])
+    created: int = Field(examples=[999])
+    failed: int = Field(examples=[1])
+    errors: list[UserImportError]
@@ -1,5 +1,7 @@
 from functools import lru_cache
+from typing import Literal, Optional
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +11,85 @@ class Settings(BaseSettings):
     secret_key: str = "change me in .env"
     access_token_expire_minutes: int = 120
 
+    # Cache of rows and rendered responses. "memory" is per worker and holds
+    # at most cache_max_size entries, "redis" is shared by every worker and
+    # needs the redis package. Changes are invalidated in the shared cache
+    # right away, with "memory" other workers see them once entries expire.
+    cache_backend: Literal["memory", "redis"] = "memory"
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_max_size: int = 10000
+    # TTL of cached User and Event rows, 0 disables them
+    cache_ttl_seconds: float = 60
+
+    # Cache of the authenticated user's id/role/banned/verified. Set the TTL
+    # to 0 to disable. A ban or role change must reach every worker at once,
+    # and "memory" only drops entries in the worker that made the change, so
+    # with more than one worker this cache needs the "redis" backend.
+    auth_cache_ttl_seconds: float = 30
+
+    # Server processes. uvicorn --workers and gunicorn read the same
+    # WEB_CONCURRENCY variable, set it rather than the command line option.
+    web_concurrency: int = 1
+
+    # Password hashing runs on a worker pool so it doesn't block the event loop
+    password_executor: Literal["thread", "process"] = "thread"
+    password_workers: int = 4
+    # Scheme of new password hashes. Hashes of another scheme, or with fewer
+    # bcrypt rounds, are replaced on login. "argon2" is argon2id and needs
+    # the argon2-cffi package. "plaintext" doesn't hash at all: it is for the
+    # test suite and load test fixtures, and is refused unless testing is set.
+    password_scheme: Literal["bcrypt", "argon2", "plaintext"] = "bcrypt"
+    password_bcrypt_rounds: int = 12
+
+    # Set by the test suite, and on servers that only serve load tests
+    testing: bool = False
+
+    # Bulk user import. An upload is imported within its request, so it is
+    # capped at what hashes in well under a request timeout, and its
+    # passwords are hashed on a pool of its own, user_import_hash_workers
+    # wide, so logins don't wait behind it. Import larger files with
+    # python import_users.py, which has no cap.
+    user_import_max_rows: int = 200
+    user_import_hash_workers: int = 2
+    # passwords hashed at a time, so a large file doesn't queue every row at once
+    user_import_hash_chunk_size: int = 1000
+
+    # Streamed exports, rows fetched from the server-side cursor at a time
+    export_chunk_size: int = 1000
+
+    # Public event reads: rendered responses are cached and dropped when an
+    # Event changes, clients are told to revalidate after max-age. Set the
+    # TTL to 0 to disable the cache.
+    events_cache_ttl_seconds: float = 60
+    events_cache_max_age_seconds: int = 0
+
+    # Pagination
+    events_page_size: int = 20
+    events_max_page_size: int = 100
+    # deep search and nearby pages are slow to rank and skip, and nobody
+    # reads them
+    events_search_max_offset: int = 1000
+    # radius of the nearby search, larger boxes hit too much of the index
+    events_nearby_radius_km: float = 20
+    events_nearby_max_radius_km: float = 500
+
+    # Tickets
+    tickets_max_bulk_quantity: int = 50
+
+    # Payments
+    payment_gateway_latency_ms: int = 0
+    idempotency_key_ttl_hours: int = 24
+    # how often expired idempotency keys are deleted, 0 disables the job
+    idempotency_cleanup_interval_seconds: float = 3600
+    # "inline" charges the card in the request, "worker" leaves the payment
+    # pending for the settlement worker. Turn off the autostart when the
+    # worker runs as its own process (python settlement_worker.py).
+    payment_settlement: Literal["inline", "worker"] = "inline"
+    settlement_autostart: bool = True
+    settlement_batch_size: int = 100
+    settlement_concurrency: int = 2
+    settlement_poll_interval_seconds: float = 1
+
     # Database variables (Overwrite in .env file)
     db_user: str = "<USER>"
     db_password: str = "<PASSWORD>"
@@ -16,12 +97,38 @@ class Settings(BaseSettings):
     db_port: str = "5432"
     db_name: str = "<DATABASE>"
 
+    # Connection pool of the async engine
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    # asyncpg prepared statement cache per connection, None keeps the default
+    db_statement_cache_size: Optional[int] = None
+
+    # Per-request SQL timing: a Server-Timing header and a log line with the
+    # query count and database time of every request. Statements slower than
+    # db_slow_query_ms are logged with the types of their parameters, 0 logs
+    # none.
+    request_timing: bool = True
+    db_slow_query_ms: float = 200
+
+    # Optional read replica DSN (postgresql+asyncpg://...) for read-only routes.
+    # When it can't be reached, reads go to the primary and the replica is
+    # retried after `db_replica_retry_seconds`.
+    db_replica_url: Optional[str] = None
+    db_replica_connect_timeout: float = 2
+    db_replica_retry_seconds: float = 30
+
     # Test database variables
     test_db_user: str = "<USER-TEST>"
     test_db_password: str = "<PASSWORD-TEST>"
     test_db_address: str = "localhost"
     test_db_port: str = "5432"
     test_db_name: str = "<DATABASE-TEST>"
+    # Run the tests on an embedded Postgres (needs the pgserver package).
+    # None uses it only when no server answers on db_address:db_port.
+    test_db_embedded: Optional[bool] = None
 
     # Metadata variables
     title: str = "API Template"
@@ -33,6 +140,23 @@ class Settings(BaseSettings):
     email: str = "ibrohim.dev.uz@gmail.com"
     year: str = "2001"
 
+    @model_validator(mode="after")
+    def check_auth_cache_backend(self) -> "Settings":
+        """Refuse a per-worker auth cache when there is more than one worker."""
+        if self.web_concurrency > 1 and self.cache_backend == "memory" and self.auth_cache_ttl_seconds > 0:
+            raise ValueError(
+                'with more than one worker the auth cache needs cache_backend "redis", '
+                "or auth_cache_ttl_seconds 0"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def check_password_scheme(self) -> "Settings":
+        """Refuse to start with the plaintext password scheme outside of tests."""
+        if self.password_scheme == "plaintext" and not self.testing:
+            raise ValueError('password_scheme "plaintext" is only allowed when testing is set')
+        return self
+
     # model_config = SettingsConfigDict(env_file=".env")
     class Config:
         env_file = ".env"
@@ -0,0 +1,49 @@
+"""CLI command running the Payment settlement worker as its own process."""
+
+import asyncio
+
+import typer
+from rich import print  # pylint: disable=W0622
+
+from managers.settlement import settlement_worker
+
+app = typer.Typer(no_args_is_help=False, rich_markup_mode="rich")
+
+
+async def run(once: bool) -> None:  # noqa: FBT001
+    """Settle pending Payments, once or until interrupted."""
+    if once:
+        await settlement_worker.drain()
+        return
+
+    settlement_worker.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await settlement_worker.stop()
+
+
+@app.command()
+def settle(
+        batch_size: int = typer.Option(None, help="Payments claimed per batch."),
+        concurrency: int = typer.Option(None, help="Batches settled at the same time."),
+        once: bool = typer.Option(False, help="Settle the current backlog and exit."),  # noqa: FBT001, FBT003
+) -> None:
+    """Settle pending Payments.
+
+    Set `settlement_autostart` to false in the API when running this.
+    """
+    if batch_size is not None:
+        settlement_worker.batch_size = batch_size
+    if concurrency is not None:
+        settlement_worker.concurrency = concurrency
+
+    try:
+        asyncio.run(run(once))
+    except KeyboardInterrupt:
+        pass
+    print(settlement_worker.stats())
+
+
+if __name__ == "__main__":
+    app()
@@ -1,24 +1,36 @@
-"""CLI command for testing and test setup."""
+"""CLI commands for testing, test setup and load test data."""
 
 import asyncio
+from typing import Any, Optional
+
 import typer
 from asyncpg.exceptions import InvalidCatalogNameError, InvalidPasswordError
 from rich import print  # pylint: disable=W0622
 from sqlalchemy.ext.asyncio import create_async_engine
 from settings import get_settings
 from database.db import Base
+from database.seed import SeedCounts, Seeder
+from managers.password import pwd_context
 
 app = typer.Typer(no_args_is_help=True, rich_markup_mode="rich")
 
-DATABASE_URL = (
-    "postgresql+asyncpg://"
-    f"{get_settings().db_user}:{get_settings().db_password}@"
-    f"{get_settings().db_address}:{get_settings().db_port}/"
-    f"{get_settings().test_db_name}"
-)
+
+def database_url(name: str) -> str:
+    """Return the URL of a database on the configured server."""
+    return (
+        "postgresql+asyncpg://"
+        f"{get_settings().db_user}:{get_settings().db_password}@"
+        f"{get_settings().db_address}:{get_settings().db_port}/"
+        f"{name}"
+    )
+
+
+DATABASE_URL = database_url(get_settings().test_db_name)
 
 async_engine = create_async_engine(DATABASE_URL, echo=False)
 
+CONNECTION_ERRORS = (InvalidCatalogNameError, ConnectionRefusedError, InvalidPasswordError)
+
 
 async def prepare_database() -> None:
     """Drop and recreate the database."""
@@ -27,22 +39,78 @@ async def prepare_database() -> None:
         await conn.run_sync(Base.metadata.create_all)
 
 
+@app.command()
 def setup() -> None:
-    print("hey")
     """Populate the test databases."""
     try:
         print("Migrating the test database ... ", end="")
         asyncio.run(prepare_database())
         print("Done!")
-    except (
-            InvalidCatalogNameError,
-            ConnectionRefusedError,
-            InvalidPasswordError,
-    ) as exc:
+    except CONNECTION_ERRORS as exc:
         print(f"\n[red]  -> Error: {exc}")
         print("Failed to migrate the test database.")
         raise typer.Exit(1) from exc
 
 
+async def seed_database(url: str, seeder_options: dict[str, Any], counts: SeedCounts, reset: bool) -> None:
+    """Fill the database at `url`, see `seed`."""
+    engine = create_async_engine(url, pool_size=seeder_options["workers"] + 1)
+    try:
+        if reset:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.run_sync(Base.metadata.create_all)
+
+        seeder = Seeder(engine, counts, **seeder_options)
+        report = await seeder.run(
+            lambda table, rows, seconds: print(f"  {table:<9} {rows:>10,} rows in {seconds:6.1f}s")
+        )
+        total = sum(report.seconds.values())
+        print(f"[green]{sum(report.rows.values()):,} rows in {total:.1f}s")
+    finally:
+        await engine.dispose()
+
+
+@app.command()
+def seed(  # noqa: PLR0913
+    users: int = typer.Option(10_000, help="Users to create, besides the organizers."),
+    organizers: int = typer.Option(100, help="Organizers to create."),
+    events: int = typer.Option(10_000, help="Events to create."),
+    tickets: int = typer.Option(1_000_000, help="Tickets to create."),
+    paid: float = typer.Option(0.7, min=0, max=1, help="Share of the tickets that have a payment."),
+    skew: float = typer.Option(1.1, min=0, help="Zipf exponent of ticket sales per event, 0 is uniform."),
+    workers: int = typer.Option(4, min=1, help="Connections that COPY at the same time."),
+    batch_size: int = typer.Option(50_000, min=1, help="Rows per COPY."),
+    random_seed: int = typer.Option(42, "--seed", help="Seed of the random generators, for repeatable data."),
+    password: str = typer.Option("seed-password", help="Password of every created user."),
+    database: Optional[str] = typer.Option(None, help="Database to fill, the app's database by default."),
+    reset: bool = typer.Option(False, help="Drop and recreate every table first."),
+) -> None:
+    """Fill a database with fake users, events, tickets and payments for load tests.
+
+    The rows are added to what is already there, unless --reset is given.
+    Passwords are hashed with the configured PASSWORD_SCHEME, once for every
+    user: set it to "plaintext", with TESTING=true, on a server that only
+    serves load tests.
+    """
+    name = database or get_settings().db_name
+    print(f"Seeding the database [bold]{name}[/bold] ...")
+    counts = SeedCounts(
+        users=users, organizers=organizers, events=events, tickets=tickets, paid=paid, skew=skew
+    )
+    options = {
+        "password_hash": pwd_context.hash(password),
+        "workers": workers,
+        "batch_size": batch_size,
+        "seed": random_seed,
+    }
+    try:
+        asyncio.run(seed_database(database_url(name), options, counts, reset))
+    except CONNECTION_ERRORS as exc:
+        print(f"\n[red]  -> Error: {exc}")
+        print("Failed to seed the database.")
+        raise typer.Exit(1) from exc
+
+
 if __name__ == "__main__":
-    setup()
+    app()
@@ -1,8 +1,17 @@
 """Some helper functions for testing."""
 
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any
+
 import jwt
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
 from settings import get_settings
 
+SAVEPOINT_STATEMENTS = ("SAVEPOINT ", "RELEASE SAVEPOINT ", "ROLLBACK TO SAVEPOINT ")
+
 
 def get_token(sub: int, exp: float, typ: str) -> str:
     """Return a JWT token."""
@@ -14,4 +23,37 @@ def get_token(sub: int, exp: float, typ: str) -> str:
         },
         get_settings().secret_key,
         algorithm="HS256",
-    )
\ No newline at end of file
+    )
+
+
+@contextmanager
+def count_queries() -> Generator[list[str], Any, None]:
+    """Collect the SQL statements run on any engine inside the block.
+
+    SAVEPOINT statements are left out: the tests make them where the app
+    would begin and commit a transaction, which are not counted either.
+    """
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ANN001, PLR0913
+        if not statement.startswith(SAVEPOINT_STATEMENTS):
+            statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+@contextmanager
+def assert_max_queries(expected: int) -> Generator[list[str], Any, None]:
+    """Fail if more than `expected` SQL statements run inside the block.
+
+    Use it around a request that returns many rows to catch N+1 queries.
+    """
+    with count_queries() as statements:
+        yield statements
+    assert len(statements) <= expected, (
+        f"{len(statements)} queries were run, expected at most {expected}:\n" + "\n".join(statements)
+    )
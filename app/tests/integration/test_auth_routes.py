@@ -10,9 +10,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from managers.auth import AuthManager
 from managers.user import ErrorMessages as UserErrorMessages
+from managers.password import build_context
 from managers.user import pwd_context
 from utils.enums import RoleType
 from models import User
+from tests.helpers import assert_max_queries
 
 logging.basicConfig(
     format="%(levelname)s [%(asctime)s] %(name)s - %(message)s",
@@ -89,6 +91,21 @@ class TestAuthRoutes:
         assert user_from_db.role == RoleType.user
 
 
+    @pytest.mark.asyncio()
+    async def test_register_single_statement(self, client: AsyncClient) -> None:
+        """Ensure registering only runs the INSERT, without reading it back."""
+        post_body = {
+            "email": "testuser@testuser.com",
+            "first_name": "Test",
+            "last_name": "User",
+            "password": "test12345!",
+        }
+
+        with assert_max_queries(1):
+            response = await client.post(self.register_path, json=post_body)
+
+        assert response.status_code == status.HTTP_201_CREATED
+
     @pytest.mark.asyncio()
     async def test_register_duplicate_user(
         self, client: AsyncClient, test_db: AsyncSession, mocker
@@ -296,6 +313,36 @@ class TestAuthRoutes:
 
 
 
+    @pytest.mark.asyncio()
+    async def test_login_upgrades_outdated_hash(self, client, test_db) -> None:
+        """Ensure a hash of another scheme is replaced on login."""
+        old_hash = build_context("bcrypt", bcrypt_rounds=4).hash("test12345!")
+        test_db.add(User(**{**self.test_user, "password": old_hash}))
+        await test_db.flush()
+
+        response = await client.post(
+            self.login_path,
+            json={"email": self.test_user["email"], "password": "test12345!"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        user_from_db = await test_db.get(User, 1, populate_existing=True)
+        assert user_from_db.password != old_hash
+        assert not pwd_context.needs_update(user_from_db.password)
+        assert pwd_context.verify("test12345!", user_from_db.password)
+
+    @pytest.mark.asyncio()
+    async def test_login_keeps_current_hash(self, client, test_db) -> None:
+        """Ensure a hash of the configured scheme is left alone."""
+        test_db.add(User(**self.test_user))
+        await test_db.commit()
+
+        with assert_max_queries(1):
+            await client.post(
+                self.login_path,
+                json={"email": self.test_user["email"], "password": "test12345!"},
+            )
+
     @pytest.mark.asyncio()
     async def test_cant_login_with_banned_user(self, client, test_db) -> None:
         """Ensure the user cant login with banned user."""
@@ -0,0 +1,672 @@
+"""Define tests for the 'Event' routes of the application."""
+
+import csv
+import io
+import json
+from datetime import date, time
+from typing import Any
+
+import pytest
+from fastapi import status
+from fastapi.exceptions import ResponseValidationError
+from httpx import AsyncClient
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.db import get_read_database
+from main import app
+from managers.auth import AuthManager
+from managers.user import pwd_context
+from models import Event, Ticket, User
+from schemas.event_schemas import EventResponseSchema
+from tests.helpers import assert_max_queries
+from utils.enums import EventStatus, RoleType
+
+
+@pytest.mark.asyncio()
+@pytest.mark.integration()
+class TestEventRoutes:
+    """Test the Event routes of the application."""
+
+    def get_test_event(self, number: int, **kwargs: Any) -> dict[str, Any]:
+        """Return the data for one test event."""
+        event = {
+            "title": f"Test event {number}",
+            "description": "Test event description",
+            "category": "Concerts",
+            "start_date": date(2024, 1, 1 + number % 28),
+            "end_date": date(2024, 2, 1),
+            "time": time(18, 0),
+            "ticked_price": 10,
+            "ticked_count": 100,
+            "location": "Tashkent",
+            "organizer_id": 1,
+        }
+        event.update(kwargs)
+        return event
+
+    async def create_events(
+        self, test_db: AsyncSession, count: int, *extra: dict[str, Any], tickets_per_event: int = 0
+    ) -> None:
+        """Create an organizer, `count` events and any `extra` events.
+
+        The organizer holds `tickets_per_event` tickets for each of them.
+        """
+        test_db.add(
+            User(
+                email="organizer@example.com",
+                first_name="Test",
+                last_name="Organizer",
+                password=pwd_context.hash("test12345!"),
+                verified=True,
+                role=RoleType.organizer,
+            )
+        )
+        await test_db.flush()
+        for number in range(count):
+            test_db.add(Event(**self.get_test_event(number)))
+        for event in extra:
+            test_db.add(Event(**event))
+        await test_db.flush()
+        for event_id in range(1, count + len(extra) + 1):
+            test_db.add_all(Ticket(user_id=1, event_id=event_id) for _ in range(tickets_per_event))
+        await test_db.commit()
+
+    # ------------------------------------------------------------------------ #
+    #                          test event list route                           #
+    # ------------------------------------------------------------------------ #
+    async def test_list_events_first_page(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the listing is limited and returns a cursor."""
+        await self.create_events(test_db, 5)
+
+        response = await client.get("/events/list/?limit=2")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["items"]) == 2  # noqa: PLR2004
+        assert response.json()["next_cursor"] is not None
+
+    async def test_list_events_walk_all_pages(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure following the cursors returns every event once, in order."""
+        await self.create_events(test_db, 7)
+
+        seen = []
+        cursor = None
+        while True:
+            url = "/events/list/?limit=3"
+            if cursor:
+                url += f"&cursor={cursor}"
+            response = await client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            seen.extend((item["start_date"], item["id"]) for item in response.json()["items"])
+            cursor = response.json()["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(seen) == 7  # noqa: PLR2004
+        assert seen == sorted(seen)
+
+    async def test_list_events_last_page_has_no_cursor(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the cursor is null when all events fit on one page."""
+        await self.create_events(test_db, 2)
+
+        response = await client.get("/events/list/?limit=5")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["items"]) == 2  # noqa: PLR2004
+        assert response.json()["next_cursor"] is None
+
+    async def test_list_events_limit_over_max(self, client: AsyncClient) -> None:
+        """Ensure the page size cannot go over the configured maximum."""
+        response = await client.get("/events/list/?limit=100000")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_list_events_bad_cursor(self, client: AsyncClient) -> None:
+        """Ensure a malformed cursor is rejected."""
+        response = await client.get("/events/list/?cursor=not-a-cursor")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {"detail": "Invalid cursor"}
+
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            ("status=cancelled", 1),
+            ("category=Sport", 1),
+            ("organizer_id=2", 0),
+            ("start_from=2024-01-03&start_to=2024-01-04", 2),
+        ],
+    )
+    async def test_list_events_filters(
+        self, client: AsyncClient, test_db: AsyncSession, query: str, expected: int
+    ) -> None:
+        """Ensure the listing filters are applied."""
+        await self.create_events(
+            test_db, 4, self.get_test_event(10, status=EventStatus.cancelled, category="Sport")
+        )
+
+        response = await client.get(f"/events/list/?{query}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["items"]) == expected
+
+    async def test_get_single_event(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a single event is returned by its ID."""
+        await self.create_events(test_db, 2)
+
+        response = await client.get("/events/list/?event_id=2")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == 2  # noqa: PLR2004
+
+    async def test_get_missing_event(self, client: AsyncClient) -> None:
+        """Ensure a missing event returns 404."""
+        response = await client.get("/events/list/?event_id=99")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    # ------------------------------------------------------------------------ #
+    #                        test expanding relationships                      #
+    # ------------------------------------------------------------------------ #
+    async def test_list_events_not_expanded(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure relationships are left out unless asked for."""
+        await self.create_events(test_db, 1)
+
+        response = await client.get("/events/list/")
+
+        assert "organizer" not in response.json()["items"][0]
+        assert "tickets" not in response.json()["items"][0]
+
+    async def test_list_events_rows_match_schema(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the unvalidated rows of a plain listing match the schema output."""
+        await self.create_events(test_db, 3)
+
+        plain = await client.get("/events/list/?limit=2")
+        expanded = await client.get("/events/list/?limit=2&expand=organizer")
+
+        assert plain.headers["content-type"] == "application/json"
+        expected = expanded.json()
+        for item in expected["items"]:
+            del item["organizer"]
+        assert plain.json() == expected
+        assert list(plain.json()["items"][0]) == list(EventResponseSchema.model_fields)[:-2]
+
+    async def test_list_events_fractional_price(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a plain listing rejects a fractional price like the schema, instead of rounding it."""
+        await self.create_events(test_db, 1, self.get_test_event(2, ticked_price=12.5))
+
+        with pytest.raises(ValidationError):
+            await client.get("/events/list/")
+        with pytest.raises(ResponseValidationError):
+            await client.get("/events/list/?expand=organizer")
+
+    async def test_list_events_single_query(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a plain listing is one query."""
+        await self.create_events(test_db, 5)
+
+        with assert_max_queries(1):
+            response = await client.get("/events/list/")
+
+        assert len(response.json()["items"]) == 5  # noqa: PLR2004
+
+    async def test_list_events_expanded(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the organizer and tickets are included when expanded."""
+        await self.create_events(test_db, 2, tickets_per_event=2)
+
+        response = await client.get("/events/list/?expand=organizer,tickets")
+
+        assert response.status_code == status.HTTP_200_OK
+        item = response.json()["items"][0]
+        assert item["organizer"]["email"] == "organizer@example.com"
+        assert len(item["tickets"]) == 2  # noqa: PLR2004
+
+    async def test_list_events_expanded_query_count(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure expanding does not run one query per event."""
+        await self.create_events(test_db, 20, tickets_per_event=2)
+
+        # the events joined with their organizers, then all their tickets
+        with assert_max_queries(2):
+            response = await client.get("/events/list/?limit=20&expand=organizer,tickets")
+
+        assert len(response.json()["items"]) == 20  # noqa: PLR2004
+        assert all(len(item["tickets"]) == 2 for item in response.json()["items"])  # noqa: PLR2004
+
+    async def test_get_single_event_expanded(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a single event can be expanded."""
+        await self.create_events(test_db, 1)
+
+        response = await client.get("/events/list/?event_id=1&expand=organizer")
+
+        assert response.json()["organizer"]["id"] == 1
+        assert "tickets" not in response.json()
+
+    async def test_list_events_bad_expand(self, client: AsyncClient) -> None:
+        """Ensure an unknown relationship is rejected."""
+        response = await client.get("/events/list/?expand=organizer,secrets")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "secrets" in response.json()["detail"]
+
+    # ------------------------------------------------------------------------ #
+    #                          test event update routes                        #
+    # ------------------------------------------------------------------------ #
+    def organizer_headers(self, user_id: int = 1) -> dict[str, str]:
+        """Return the auth header of the organizer created by create_events."""
+        return {"Authorization": f"Bearer {AuthManager.encode_token(User(id=user_id))}"}
+
+    async def test_patch_event(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a patch only changes the fields that are sent."""
+        await self.create_events(test_db, 1)
+
+        response = await client.patch(
+            "/events/1", json={"title": "New title", "ticked_count": 5}, headers=self.organizer_headers()
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["title"] == "New title"
+        assert response.json()["ticked_count"] == 5  # noqa: PLR2004
+        assert response.json()["location"] == "Tashkent"
+
+    async def test_patch_event_single_statement(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the update is one statement after authentication."""
+        await self.create_events(test_db, 1)
+
+        with assert_max_queries(2):
+            response = await client.patch("/events/1", json={"location": "Samarkand"}, headers=self.organizer_headers())
+
+        assert response.json()["location"] == "Samarkand"
+
+    async def test_patch_event_nothing_sent(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure an empty patch returns the event unchanged."""
+        await self.create_events(test_db, 1)
+
+        response = await client.patch("/events/1", json={}, headers=self.organizer_headers())
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["title"] == "Test event 0"
+
+    async def test_patch_event_null_field(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a field cannot be patched to null."""
+        await self.create_events(test_db, 1)
+
+        response = await client.patch("/events/1", json={"title": None}, headers=self.organizer_headers())
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_patch_missing_event(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure patching a missing event returns 404."""
+        await self.create_events(test_db, 1)
+
+        response = await client.patch("/events/99", json={"title": "New title"}, headers=self.organizer_headers())
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_patch_other_organizers_event(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure an organizer cannot change someone else's event."""
+        # added first, so this user owns the events and the organizer is id 2
+        test_db.add(
+            User(
+                email="other@example.com",
+                first_name="Other",
+                last_name="Organizer",
+                password=pwd_context.hash("test12345!"),
+                verified=True,
+                role=RoleType.organizer,
+            )
+        )
+        await self.create_events(test_db, 1)
+
+        response = await client.patch("/events/1", json={"title": "Mine now"}, headers=self.organizer_headers(2))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    async def test_put_event(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a full update replaces every field."""
+        await self.create_events(test_db, 1)
+        event = self.get_test_event(3, title="Replaced", status="counting")
+        event.pop("organizer_id")
+
+        response = await client.put(
+            "/events/1",
+            json={**event, "start_date": "2024-01-04", "end_date": "2024-02-01", "time": "18:00:00"},
+            headers=self.organizer_headers(),
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["title"] == "Replaced"
+        assert response.json()["status"] == "counting"
+
+    # ------------------------------------------------------------------------ #
+    #                            test event search                             #
+    # ------------------------------------------------------------------------ #
+    async def create_search_events(self, test_db: AsyncSession) -> None:
+        """Create events with words to search for."""
+        await self.create_events(
+            test_db,
+            0,
+            self.get_test_event(1, title="Jazz night", description="Live music", location="Tashkent"),
+            self.get_test_event(2, title="Rock concert", description="Loud jazz and rock", location="Samarkand"),
+            self.get_test_event(3, title="Chess open", category="Sport", description="A tournament"),
+        )
+
+    async def test_search_events_ranked(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a title match is ranked above a description match."""
+        await self.create_search_events(test_db)
+
+        response = await client.get("/events/search?q=jazz")
+
+        assert response.status_code == status.HTTP_200_OK
+        items = response.json()["items"]
+        assert [item["title"] for item in items] == ["Jazz night", "Rock concert"]
+        assert items[0]["rank"] > items[1]["rank"]
+        assert response.json()["next_offset"] is None
+
+    @pytest.mark.parametrize(
+        ("query", "titles"),
+        [
+            ("sport", ["Chess open"]),
+            ("jazz -rock", ["Jazz night"]),
+            ('"live music"', ["Jazz night"]),
+            ("samarkand or chess", ["Rock concert", "Chess open"]),
+            ("opera", []),
+        ],
+    )
+    async def test_search_events_syntax(
+        self, client: AsyncClient, test_db: AsyncSession, query: str, titles: list[str]
+    ) -> None:
+        """Ensure the web search syntax is understood."""
+        await self.create_search_events(test_db)
+
+        response = await client.get("/events/search", params={"q": query})
+
+        assert sorted(item["title"] for item in response.json()["items"]) == sorted(titles)
+
+    async def test_search_events_pages(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure following next_offset returns every match once."""
+        await self.create_events(test_db, 5)
+
+        first = await client.get("/events/search?q=test&limit=3")
+        second = await client.get(f"/events/search?q=test&limit=3&offset={first.json()['next_offset']}")
+
+        assert first.json()["next_offset"] == 3  # noqa: PLR2004
+        assert second.json()["next_offset"] is None
+        ids = [item["id"] for item in first.json()["items"] + second.json()["items"]]
+        assert sorted(ids) == [1, 2, 3, 4, 5]
+
+    async def test_search_events_needs_query(self, client: AsyncClient) -> None:
+        """Ensure an empty query is rejected."""
+        response = await client.get("/events/search?q=")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    # ------------------------------------------------------------------------ #
+    #                          test events near a point                        #
+    # ------------------------------------------------------------------------ #
+    TASHKENT = {"lat": 41.2995, "lon": 69.2401}
+
+    async def create_nearby_events(self, test_db: AsyncSession) -> None:
+        """Create events around Tashkent and one without coordinates."""
+        await self.create_events(
+            test_db,
+            0,
+            self.get_test_event(1, title="Samarkand", latitude=39.6542, longitude=66.9597),
+            self.get_test_event(2, title="Chirchiq", latitude=41.4689, longitude=69.5822),
+            self.get_test_event(3, title="Tashkent", latitude=41.3111, longitude=69.2797),
+            self.get_test_event(4, title="Nowhere"),
+        )
+
+    @pytest.mark.parametrize(
+        ("radius_km", "titles"),
+        [
+            (None, ["Tashkent"]),
+            (50, ["Tashkent", "Chirchiq"]),
+            (300, ["Tashkent", "Chirchiq", "Samarkand"]),
+        ],
+    )
+    async def test_nearby_events(
+        self, client: AsyncClient, test_db: AsyncSession, radius_km: int, titles: list[str]
+    ) -> None:
+        """Ensure only the events within the radius are found, nearest first."""
+        await self.create_nearby_events(test_db)
+        params = {**self.TASHKENT, "radius_km": radius_km} if radius_km else self.TASHKENT
+
+        response = await client.get("/events/nearby", params=params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["title"] for item in response.json()["items"]] == titles
+
+    async def test_nearby_events_distance(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the distance of each event is computed."""
+        await self.create_nearby_events(test_db)
+
+        response = await client.get("/events/nearby", params={**self.TASHKENT, "radius_km": 300})
+
+        distances = [item["distance_km"] for item in response.json()["items"]]
+        assert distances == sorted(distances)
+        assert 3 < distances[0] < 4  # noqa: PLR2004
+        assert 265 < distances[2] < 275  # noqa: PLR2004
+
+    async def test_nearby_events_pages(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure following next_offset returns every event once."""
+        await self.create_nearby_events(test_db)
+        params = {**self.TASHKENT, "radius_km": 300, "limit": 2}
+
+        first = await client.get("/events/nearby", params=params)
+        second = await client.get("/events/nearby", params={**params, "offset": first.json()["next_offset"]})
+
+        assert first.json()["next_offset"] == 2  # noqa: PLR2004
+        assert second.json()["next_offset"] is None
+        assert [item["title"] for item in second.json()["items"]] == ["Samarkand"]
+
+    async def test_nearby_events_bad_radius(self, client: AsyncClient) -> None:
+        """Ensure a radius over the limit is rejected."""
+        response = await client.get("/events/nearby", params={**self.TASHKENT, "radius_km": 100_000})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_patch_event_coordinates(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure coordinates are patched together and can be removed."""
+        await self.create_nearby_events(test_db)
+
+        one = await client.patch("/events/3", json={"latitude": 1.0}, headers=self.organizer_headers())
+        removed = await client.patch(
+            "/events/3", json={"latitude": None, "longitude": None}, headers=self.organizer_headers()
+        )
+
+        assert one.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert removed.status_code == status.HTTP_200_OK
+        assert removed.json()["latitude"] is None
+
+    async def test_put_event_clears_coordinates(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a full update without coordinates removes them, a patch keeps them."""
+        await self.create_nearby_events(test_db)
+        event = self.get_test_event(3, title="Moved", status="counting")
+        event.pop("organizer_id")
+        event = {**event, "start_date": "2024-01-04", "end_date": "2024-02-01", "time": "18:00:00"}
+
+        patched = await client.patch("/events/3", json={"title": "Renamed"}, headers=self.organizer_headers())
+        replaced = await client.put("/events/3", json=event, headers=self.organizer_headers())
+
+        assert patched.json()["latitude"] == 41.3111  # noqa: PLR2004
+        assert replaced.status_code == status.HTTP_200_OK
+        assert replaced.json()["latitude"] is None
+        assert replaced.json()["longitude"] is None
+
+    # ------------------------------------------------------------------------ #
+    #                        test conditional event reads                      #
+    # ------------------------------------------------------------------------ #
+    async def test_list_events_validators(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a plain listing has an ETag and Cache-Control, but no Last-Modified."""
+        await self.create_events(test_db, 2)
+
+        response = await client.get("/events/list/")
+
+        assert response.headers["etag"].startswith('"')
+        assert "last-modified" not in response.headers
+        assert response.headers["cache-control"] == "public, max-age=0"
+
+    async def test_list_events_if_none_match(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a poll with a current ETag gets an empty 304."""
+        await self.create_events(test_db, 2)
+        etag = (await client.get("/events/list/")).headers["etag"]
+
+        response = await client.get("/events/list/", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    async def test_list_events_if_modified_since(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a listing ignores If-Modified-Since, its newest row can go back in time."""
+        await self.create_events(test_db, 2)
+        await client.get("/events/list/")
+
+        response = await client.get("/events/list/", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+
+        assert response.status_code == status.HTTP_200_OK
+
+    async def test_get_single_event_if_modified_since(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a poll of one event with its current Last-Modified gets a 304."""
+        await self.create_events(test_db, 1)
+        last_modified = (await client.get("/events/list/?event_id=1")).headers["last-modified"]
+
+        response = await client.get("/events/list/?event_id=1", headers={"If-Modified-Since": last_modified})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    async def test_get_single_event_if_none_match(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a single event read is conditional too."""
+        await self.create_events(test_db, 1)
+        first = await client.get("/events/list/?event_id=1")
+
+        response = await client.get("/events/list/?event_id=1", headers={"If-None-Match": first.headers["etag"]})
+
+        assert first.json()["id"] == 1
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    async def test_cached_reads_come_from_primary(self, client: AsyncClient, test_db: AsyncSession, mocker) -> None:
+        """Ensure a cache miss is read on the primary, not on a replica that may lag behind."""
+        await self.create_events(test_db, 2)
+
+        async def replica() -> Any:
+            # any query on it fails
+            yield mocker.Mock(spec=AsyncSession)
+
+        mocker.patch.dict(app.dependency_overrides, {get_read_database: replica})
+        listing = await client.get("/events/list/")
+        single = await client.get("/events/list/?event_id=1")
+
+        assert listing.status_code == status.HTTP_200_OK
+        assert len(listing.json()["items"]) == 2  # noqa: PLR2004
+        assert single.json()["id"] == 1
+
+    async def test_repeat_poll_is_cached(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a repeated poll is answered without a query."""
+        await self.create_events(test_db, 3)
+        first = await client.get("/events/list/")
+
+        with assert_max_queries(0):
+            second = await client.get("/events/list/")
+
+        assert second.content == first.content
+
+    async def test_patch_event_changes_etag(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure an update empties the cache and changes the validators."""
+        await self.create_events(test_db, 1)
+        first = await client.get("/events/list/")
+
+        await client.patch("/events/1", json={"title": "New title"}, headers=self.organizer_headers())
+        response = await client.get("/events/list/", headers={"If-None-Match": first.headers["etag"]})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != first.headers["etag"]
+        assert response.json()["items"][0]["title"] == "New title"
+        assert response.json()["items"][0]["updated_at"] > first.json()["items"][0]["updated_at"]
+
+    async def test_create_event_empties_cache(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a new event shows up in a cached listing."""
+        await self.create_events(test_db, 1)
+        await client.get("/events/list/")
+        event = self.get_test_event(5)
+        event.pop("organizer_id")
+
+        await client.post(
+            "/events/",
+            json={**event, "start_date": "2024-01-06", "end_date": "2024-02-01", "time": "18:00:00"},
+            headers=self.organizer_headers(),
+        )
+        response = await client.get("/events/list/")
+
+        assert len(response.json()["items"]) == 2  # noqa: PLR2004
+
+    async def test_buying_ticket_empties_cache(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the cached seat count changes when a ticket is bought."""
+        await self.create_events(test_db, 1)
+        await client.get("/events/list/")
+
+        await client.post("/events/1/tickets", headers=self.organizer_headers())
+        response = await client.get("/events/list/")
+
+        assert response.json()["items"][0]["ticked_count"] == 99  # noqa: PLR2004
+
+    # ------------------------------------------------------------------------ #
+    #                            test event export                             #
+    # ------------------------------------------------------------------------ #
+    def add_admin(self, test_db: AsyncSession) -> None:
+        """Add an admin, before create_events so it gets id 1."""
+        test_db.add(
+            User(
+                email="admin@example.com",
+                first_name="Test",
+                last_name="Admin",
+                password=pwd_context.hash("test12345!"),
+                verified=True,
+                role=RoleType.admin,
+            )
+        )
+
+    async def test_export_events_ndjson(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure every event is exported as one JSON line, in id order."""
+        self.add_admin(test_db)
+        await self.create_events(test_db, 3)
+
+        response = await client.get("/events/export", headers=self.organizer_headers())
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["id"] for line in lines] == [1, 2, 3]
+        assert lines[0]["start_date"] == "2024-01-01"
+        assert lines[0]["status"] == "not_started"
+
+    async def test_export_events_csv_filtered(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the CSV export has a header and applies the filters."""
+        self.add_admin(test_db)
+        await self.create_events(test_db, 2, self.get_test_event(10, category="Sport"))
+
+        response = await client.get("/events/export?format=csv&category=Sport", headers=self.organizer_headers())
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [(row["id"], row["category"]) for row in rows] == [("3", "Sport")]
+
+    async def test_export_events_chunked(
+        self, client: AsyncClient, test_db: AsyncSession, mocker
+    ) -> None:
+        """Ensure rows from every chunk of the cursor are sent."""
+        mocker.patch("managers.export.get_settings").return_value.export_chunk_size = 2
+        self.add_admin(test_db)
+        await self.create_events(test_db, 5)
+
+        response = await client.get("/events/export", headers=self.organizer_headers())
+
+        assert len(response.text.splitlines()) == 5  # noqa: PLR2004
+
+    async def test_organizer_cant_export_events(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure only admins can export events."""
+        await self.create_events(test_db, 1)
+
+        response = await client.get("/events/export", headers=self.organizer_headers())
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
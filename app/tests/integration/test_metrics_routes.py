@@ -0,0 +1,119 @@
+"""Define tests for the internal 'Metrics' routes of the application."""
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from managers.auth import AuthManager
+from managers.user import pwd_context
+from models import User
+from settings import get_settings
+from utils.enums import RoleType
+
+
+@pytest.mark.asyncio()
+@pytest.mark.integration()
+class TestMetricsRoutes:
+    """Test the Metrics routes of the application."""
+
+    async def get_token(self, test_db: AsyncSession, role: RoleType) -> str:
+        """Create a User with the given role and return their token."""
+        user = User(
+            email="metrics@example.com",
+            first_name="Test",
+            last_name="User",
+            password=pwd_context.hash("test12345!"),
+            verified=True,
+            role=role,
+        )
+        test_db.add(user)
+        await test_db.commit()
+        return AuthManager.encode_token(user)
+
+    async def test_admin_can_get_auth_cache_stats(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the auth cache counters are reported to an admin."""
+        token = await self.get_token(test_db, RoleType.admin)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        await client.get("/metrics/auth-cache", headers=headers)
+        response = await client.get("/metrics/auth-cache", headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["size"] == 1
+        assert response.json()["hits"] == 1
+        assert response.json()["misses"] == 1
+
+    async def test_admin_can_get_password_hasher_stats(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the password hashing pool counters are reported."""
+        token = await self.get_token(test_db, RoleType.admin)
+
+        response = await client.get("/metrics/password-hasher", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["queued"] == 0
+        assert response.json()["in_flight"] == 0
+
+    async def test_admin_can_get_import_password_hasher_stats(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the bulk import pool is reported on its own."""
+        token = await self.get_token(test_db, RoleType.admin)
+
+        response = await client.get(
+            "/metrics/password-hasher?imports=true", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["max_workers"] == get_settings().user_import_hash_workers
+
+    async def test_admin_can_get_db_pool_stats(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the connection pool state is reported."""
+        token = await self.get_token(test_db, RoleType.admin)
+
+        response = await client.get("/metrics/db-pool", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {"checked_out", "idle", "overflow", "avg_wait_ms"} <= response.json().keys()
+
+    async def test_db_pool_stats_no_replica(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure asking for the replica pool without a replica is a 404."""
+        token = await self.get_token(test_db, RoleType.admin)
+
+        response = await client.get("/metrics/db-pool?replica=true", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_admin_can_get_cache_stats(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure every namespace of the shared cache is reported."""
+        token = await self.get_token(test_db, RoleType.admin)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        await client.get("/metrics/cache", headers=headers)
+        response = await client.get("/metrics/cache", headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["backend"] == "memory"
+        stats = {namespace.pop("namespace"): namespace for namespace in response.json()["namespaces"]}
+        assert stats.keys() == {"principal", "user", "event", "events"}
+        assert stats["principal"]["hits"] == 1
+        # the Principal is loaded from the database, not from the User rows
+        assert stats["principal"]["size"] == 1
+        assert stats["user"]["size"] == 0
+        assert {"max_size", "evictions", "hit_ratio"} <= stats["event"].keys()
+
+    async def test_user_cant_get_auth_cache_stats(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a normal user can't see the metrics."""
+        token = await self.get_token(test_db, RoleType.user)
+
+        response = await client.get("/metrics/auth-cache", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    async def test_admin_can_get_settlement_stats(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the settlement worker counters are reported."""
+        token = await self.get_token(test_db, RoleType.admin)
+
+        response = await client.get("/metrics/settlement", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["running"] is False
+        assert response.json()["settled"] == 0
@@ -0,0 +1,115 @@
+"""Define tests for the 'Payment' routes of the application."""
+
+from datetime import date, time
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from managers.auth import AuthManager
+from managers.payment_manager import PaymentErrorMessages
+from managers.user import pwd_context
+from models import Event, Ticket, User
+from utils.enums import RoleType
+
+CARD = {"payment_method": "card", "card_number": "4242424242424242", "exp_date": "12/99"}
+
+
+@pytest.mark.asyncio()
+@pytest.mark.integration()
+class TestPaymentRoutes:
+    """Test the Payment routes of the application."""
+
+    async def setup_ticket(self, test_db: AsyncSession) -> dict[str, str]:
+        """Create a user holding one ticket, and return their auth header."""
+        user = User(
+            email="buyer@example.com",
+            first_name="Test",
+            last_name="Buyer",
+            password=pwd_context.hash("test12345!"),
+            verified=True,
+            role=RoleType.user,
+        )
+        test_db.add(user)
+        await test_db.flush()
+        test_db.add(
+            Event(
+                title="Test event",
+                description="Test event description",
+                category="Concerts",
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 1, 2),
+                time=time(18, 0),
+                ticked_price=10,
+                ticked_count=10,
+                location="Tashkent",
+                organizer_id=user.id,
+            )
+        )
+        await test_db.flush()
+        test_db.add(Ticket(user_id=user.id, event_id=1))
+        await test_db.commit()
+        return {"Authorization": f"Bearer {AuthManager.encode_token(user)}"}
+
+    async def test_create_payment(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a user can pay for their ticket."""
+        headers = await self.setup_ticket(test_db)
+
+        response = await client.post("/tickets/1/payments", json=CARD, headers=headers)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["status"] == "approved"
+        assert response.json()["card_number"] == "************4242"
+        assert "Idempotent-Replayed" not in response.headers
+
+    async def test_create_payment_replayed(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a retried request with the same key is not charged twice."""
+        headers = await self.setup_ticket(test_db)
+        headers["Idempotency-Key"] = "3f1c5a9e"
+
+        first = await client.post("/tickets/1/payments", json=CARD, headers=headers)
+        second = await client.post("/tickets/1/payments", json=CARD, headers=headers)
+
+        assert second.status_code == status.HTTP_201_CREATED
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert second.json() == first.json()
+        payments = await client.get("/tickets/1/payments", headers=headers)
+        assert len(payments.json()) == 1
+
+    async def test_create_payment_key_reused(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a key sent again with a different body is a 422."""
+        headers = await self.setup_ticket(test_db)
+        headers["Idempotency-Key"] = "3f1c5a9e"
+        await client.post("/tickets/1/payments", json=CARD, headers=headers)
+
+        response = await client.post("/tickets/1/payments", json={"payment_method": "cash"}, headers=headers)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json() == {"detail": PaymentErrorMessages.KEY_REUSED}
+
+    async def test_create_payment_twice_without_key(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a paid ticket cannot be paid again."""
+        headers = await self.setup_ticket(test_db)
+        await client.post("/tickets/1/payments", json=CARD, headers=headers)
+
+        response = await client.post("/tickets/1/payments", json=CARD, headers=headers)
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.json() == {"detail": PaymentErrorMessages.ALREADY_PAID}
+
+    async def test_create_payment_card_details_required(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a card payment without card details is rejected."""
+        headers = await self.setup_ticket(test_db)
+
+        response = await client.post("/tickets/1/payments", json={"payment_method": "card"}, headers=headers)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_create_payment_no_auth(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure paying needs authentication."""
+        await self.setup_ticket(test_db)
+
+        response = await client.post("/tickets/1/payments", json=CARD)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,124 @@
+"""Define tests for the 'Ticket' routes of the application."""
+
+from datetime import date, time
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from managers.auth import AuthManager
+from managers.ticket_manager import TicketErrorMessages
+from managers.user import pwd_context
+from models import Event, User
+from utils.enums import RoleType
+
+
+@pytest.mark.asyncio()
+@pytest.mark.integration()
+class TestTicketRoutes:
+    """Test the Ticket routes of the application."""
+
+    async def setup_event(self, test_db: AsyncSession, ticked_count: int) -> str:
+        """Create a user and an event, and return the user's token."""
+        user = User(
+            email="buyer@example.com",
+            first_name="Test",
+            last_name="Buyer",
+            password=pwd_context.hash("test12345!"),
+            verified=True,
+            role=RoleType.user,
+        )
+        test_db.add(user)
+        await test_db.flush()
+        test_db.add(
+            Event(
+                title="Test event",
+                description="Test event description",
+                category="Concerts",
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 1, 2),
+                time=time(18, 0),
+                ticked_price=10,
+                ticked_count=ticked_count,
+                location="Tashkent",
+                organizer_id=user.id,
+            )
+        )
+        await test_db.commit()
+        return AuthManager.encode_token(user)
+
+    async def test_buy_ticket(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a user can buy a ticket."""
+        token = await self.setup_event(test_db, 1)
+
+        response = await client.post("/events/1/tickets", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["event_id"] == 1
+        assert response.json()["user_id"] == 1
+
+    async def test_buy_ticket_sold_out(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure buying from a sold out event is a 409."""
+        token = await self.setup_event(test_db, 1)
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.post("/events/1/tickets", headers=headers)
+
+        response = await client.post("/events/1/tickets", headers=headers)
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.json() == {"detail": TicketErrorMessages.SOLD_OUT}
+
+    async def test_buy_ticket_no_auth(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure buying a ticket needs authentication."""
+        await self.setup_event(test_db, 1)
+
+        response = await client.post("/events/1/tickets")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    async def test_buy_tickets_bulk(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a user can buy several tickets in one call."""
+        token = await self.setup_event(test_db, 5)
+
+        response = await client.post(
+            "/events/1/tickets/bulk", json={"quantity": 4}, headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["event_id"] == 1
+        assert len(response.json()["tickets"]) == 4  # noqa: PLR2004
+        assert set(response.json()["tickets"][0]) == {"id", "status"}
+
+    async def test_buy_tickets_bulk_too_many(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a bulk purchase over the seats left is a 409."""
+        token = await self.setup_event(test_db, 3)
+
+        response = await client.post(
+            "/events/1/tickets/bulk", json={"quantity": 4}, headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.json() == {"detail": TicketErrorMessages.NOT_ENOUGH_SEATS}
+
+    async def test_buy_tickets_bulk_over_limit(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure the quantity is capped."""
+        token = await self.setup_event(test_db, 1000)
+
+        response = await client.post(
+            "/events/1/tickets/bulk", json={"quantity": 1000}, headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_get_my_tickets(self, client: AsyncClient, test_db: AsyncSession) -> None:
+        """Ensure a user can list the tickets they bought."""
+        token = await self.setup_event(test_db, 5)
+        headers = {"Authorization": f"Bearer {token}"}
+        for _ in range(3):
+            await client.post("/events/1/tickets", headers=headers)
+
+        response = await client.get("/events/1/tickets", headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 3  # noqa: PLR2004
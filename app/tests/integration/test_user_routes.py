@@ -1,17 +1,20 @@
 """Define tests for the 'User' routes of the application."""
 
+import json
+from datetime import date, time
 from typing import Any
 
 import pytest
 from faker import Faker
 from fastapi import status
-from httpx import AsyncClient
+from httpx import AsyncClient, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from managers.auth import AuthManager
 from managers.user import ErrorMessages, pwd_context
 from utils.enums import RoleType
-from models import User
+from models import Event, Ticket, User
+from tests.helpers import assert_max_queries
 
 
 @pytest.mark.asyncio()
@@ -59,6 +62,28 @@ class TestUserRoutes:
         assert response.status_code == status.HTTP_200_OK
         assert len(response.json()) == 3  # noqa: PLR2004
 
+    async def test_get_my_profile_is_cached(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure a repeated profile read runs no query, and an edit is seen at once."""
+        test_user = User(**self.get_test_user())
+        test_db.add(test_user)
+        await test_db.commit()
+        headers = {"Authorization": f"Bearer {AuthManager.encode_token(test_user)}"}
+        await client.get("/users/me", headers=headers)
+
+        with assert_max_queries(0):
+            cached = await client.get("/users/me", headers=headers)
+        await client.put(
+            "/users/1",
+            json={"email": test_user.email, "password": "test12345!", "first_name": "Renamed", "last_name": "User"},
+            headers=headers,
+        )
+        edited = await client.get("/users/me", headers=headers)
+
+        assert cached.status_code == status.HTTP_200_OK
+        assert edited.json()["first_name"] == "Renamed"
+
     async def test_get_my_profile_no_auth(
         self, client: AsyncClient, test_db: AsyncSession
     ) -> None:
@@ -118,6 +143,75 @@ class TestUserRoutes:
         assert response.status_code == status.HTTP_200_OK
         assert response.json()["id"] == 3  # noqa: PLR2004
 
+    async def test_admin_can_get_users_expanded(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure expanding every user's tickets does not run a query per user."""
+        admin_user = User(**self.get_test_user(admin=True))
+        test_db.add(admin_user)
+        test_db.add_all(User(**self.get_test_user()) for _ in range(5))
+        await test_db.flush()
+        test_db.add(
+            Event(
+                title="Test event",
+                description="Test event description",
+                category="Concerts",
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 1, 2),
+                time=time(18, 0),
+                ticked_price=10,
+                ticked_count=10,
+                location="Tashkent",
+                organizer_id=admin_user.id,
+            )
+        )
+        await test_db.flush()
+        test_db.add_all(Ticket(user_id=user_id, event_id=1) for user_id in range(2, 7))
+        await test_db.commit()
+        token = AuthManager.encode_token(admin_user)
+
+        # authentication, then the users, then all their tickets
+        with assert_max_queries(3):
+            response = await client.get(
+                "/users/?expand=tickets", headers={"Authorization": f"Bearer {token}"}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(len(user["tickets"]) for user in response.json()) == [0, 1, 1, 1, 1, 1]
+        assert "payments" not in response.json()[0]
+
+    async def test_get_my_profile_expanded(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure the current user can expand their own relationships."""
+        test_user = User(**self.get_test_user())
+        test_db.add(test_user)
+        await test_db.commit()
+        token = AuthManager.encode_token(test_user)
+
+        response = await client.get(
+            "/users/me?expand=tickets,payments", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["tickets"] == []
+        assert response.json()["payments"] == []
+
+    async def test_get_users_bad_expand(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure an unknown relationship is rejected."""
+        test_user = User(**self.get_test_user())
+        test_db.add(test_user)
+        await test_db.commit()
+        token = AuthManager.encode_token(test_user)
+
+        response = await client.get(
+            "/users/me?expand=password", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     async def test_user_cant_get_all_users(
         self, client: AsyncClient, test_db: AsyncSession
     ) -> None:
@@ -239,6 +333,42 @@ class TestUserRoutes:
         assert banned_user.status_code == status.HTTP_200_OK
         assert banned_user.json()["banned"] is True
 
+    async def test_ban_user_single_statement(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure a ban is one statement after authentication."""
+        test_db.add(User(**self.get_test_user()))
+        test_db.add(User(**self.get_test_user(admin=True)))
+        token = AuthManager.encode_token(User(id=2))
+
+        await test_db.commit()
+
+        with assert_max_queries(2):
+            response = await client.post(
+                "/users/1/ban",
+                headers={"Authorization": f"Bearer {token}"},
+            )
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    async def test_admin_cant_ban_banned_user(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure banning an already banned user is rejected."""
+        test_db.add(User(**self.get_test_user(), banned=True))
+        test_db.add(User(**self.get_test_user(admin=True)))
+        token = AuthManager.encode_token(User(id=2))
+
+        await test_db.commit()
+
+        response = await client.post(
+            "/users/1/ban",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == ErrorMessages.ALREADY_BANNED_OR_UNBANNED
+
     async def test_admin_cant_ban_self(
         self, client: AsyncClient, test_db: AsyncSession
     ) -> None:
@@ -563,6 +693,30 @@ class TestUserRoutes:
             "last_name": "new_surname",
         }
 
+    async def test_change_details_single_statement(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure the edit is one statement after authentication."""
+        test_db.add(User(**self.get_test_user()))
+        token = AuthManager.encode_token(User(id=1))
+
+        await test_db.commit()
+
+        with assert_max_queries(2):
+            response = await client.put(
+                "/users/1",
+                json={
+                    "email": "new@example.com",
+                    "password": "new_password",
+                    "first_name": "new_name",
+                    "last_name": "new_surname",
+                },
+                headers={"Authorization": f"Bearer {token}"},
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["email"] == "new@example.com"
+
     async def test_user_cant_change_others_details(
         self, client: AsyncClient, test_db: AsyncSession
     ) -> None:
@@ -607,4 +761,109 @@ class TestUserRoutes:
             headers={"Authorization": f"Bearer {token}"},
         )
 
-        assert response.status_code == status.HTTP_200_OK
\ No newline at end of file
+        assert response.status_code == status.HTTP_200_OK
+
+    # ------------------------------------------------------------------------ #
+    #                         test bulk user import route                      #
+    # ------------------------------------------------------------------------ #
+    async def upload(self, client: AsyncClient, token: str, filename: str, content: str) -> Response:
+        """Upload a file to the import route.
+
+        The request is built outside the client, whose default JSON
+        Content-Type would replace the multipart one.
+        """
+        request = Request(
+            "POST",
+            client.base_url.join("/users/import"),
+            files={"file": (filename, content)},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        return await client.send(request)
+
+    async def test_admin_can_import_users(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure an admin can import users from an NDJSON file."""
+        test_db.add(User(**self.get_test_user(admin=True)))
+        await test_db.commit()
+        token = AuthManager.encode_token(User(id=1))
+        content = "\n".join(
+            json.dumps({"email": f"user{number}@example.com", "password": "test12345!", "first_name": "A", "last_name": "B"})
+            for number in range(3)
+        )
+
+        response = await self.upload(client, token, "users.ndjson", content)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"received": 3, "created": 3, "failed": 0, "errors": []}
+
+    async def test_import_users_unknown_format(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure a file whose format cannot be told is rejected."""
+        test_db.add(User(**self.get_test_user(admin=True)))
+        await test_db.commit()
+        token = AuthManager.encode_token(User(id=1))
+
+        response = await self.upload(client, token, "users.txt", "anything")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_user_cant_import_users(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure only admins can import users."""
+        test_db.add(User(**self.get_test_user()))
+        await test_db.commit()
+        token = AuthManager.encode_token(User(id=1))
+
+        response = await self.upload(client, token, "users.csv", "email,password,first_name,last_name\n")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    # ------------------------------------------------------------------------ #
+    #                            test user export route                        #
+    # ------------------------------------------------------------------------ #
+    async def test_admin_can_export_users_ndjson(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure every user is exported, without the password."""
+        test_db.add(User(**self.get_test_user(admin=True)))
+        test_db.add(User(**self.get_test_user()))
+        await test_db.commit()
+        token = AuthManager.encode_token(User(id=1))
+
+        response = await client.get("/users/export", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [(line["id"], line["role"]) for line in lines] == [(1, "admin"), (2, "user")]
+        assert "password" not in lines[0]
+
+    async def test_admin_can_export_users_csv(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure the CSV export starts with a header line."""
+        test_db.add(User(**self.get_test_user(admin=True)))
+        await test_db.commit()
+        token = AuthManager.encode_token(User(id=1))
+
+        response = await client.get("/users/export?format=csv", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == status.HTTP_200_OK
+        header, row = response.text.splitlines()
+        assert header == "id,email,first_name,last_name,role,banned,verified"
+        assert row.endswith(",admin,False,True")
+
+    async def test_user_cant_export_users(
+        self, client: AsyncClient, test_db: AsyncSession
+    ) -> None:
+        """Ensure only admins can export users."""
+        test_db.add(User(**self.get_test_user()))
+        await test_db.commit()
+        token = AuthManager.encode_token(User(id=1))
+
+        response = await client.get("/users/export", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -5,9 +5,9 @@ from datetime import datetime, timezone
 import pytest
 from fastapi import BackgroundTasks, HTTPException, status
 
-from managers.auth import CustomHTTPBearer, ResponseMessages
+from database.helpers import UserDB
+from managers.auth import CustomHTTPBearer, Principal, ResponseMessages, principal_cache
 from managers.user import UserManager
-from models import User
 from tests.helpers import get_token
 
 
@@ -34,9 +34,42 @@ class TestCustomHTTPBearer:
         bearer = CustomHTTPBearer()
         result = await bearer(request=mock_req, db=test_db)
 
-        assert isinstance(result, User)
-        assert result.email == self.test_user["email"]
+        assert isinstance(result, Principal)
         assert result.id == 1
+        assert mock_req.state.user == result
+
+    async def test_custom_bearer_class_uses_cache(self, test_db, mocker) -> None:
+        """Ensure a second request for the same user skips the database."""
+        token, _ = await UserManager.register(self.test_user, test_db)
+        mock_req = mocker.patch(self.mock_request_path)
+        mock_req.headers = {"Authorization": f"Bearer {token}"}
+        mock_get = mocker.spy(UserDB, "get")
+
+        bearer = CustomHTTPBearer()
+        await bearer(request=mock_req, db=test_db)
+        result = await bearer(request=mock_req, db=test_db)
+
+        assert result.id == 1
+        assert mock_get.call_count == 1
+        assert principal_cache.hits == 1
+
+    async def test_custom_bearer_class_ban_clears_cache(
+        self, test_db, mocker
+    ) -> None:
+        """Ensure banning a cached user takes effect straight away."""
+        token, _ = await UserManager.register(self.test_user, test_db)
+        mock_req = mocker.patch(self.mock_request_path)
+        mock_req.headers = {"Authorization": f"Bearer {token}"}
+
+        bearer = CustomHTTPBearer()
+        await bearer(request=mock_req, db=test_db)
+        await UserManager.set_ban_status(1, True, 666, test_db)
+
+        with pytest.raises(HTTPException) as exc:
+            await bearer(request=mock_req, db=test_db)
+
+        assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+        assert exc.value.detail == ResponseMessages.INVALID_TOKEN
 
     async def test_custom_bearer_class_invalid_token(
         self, test_db, mocker
@@ -0,0 +1,402 @@
+"""Test the cache layer."""
+
+import asyncio
+import fnmatch
+import time
+from collections.abc import AsyncIterator
+from datetime import date, time as t
+from typing import Any, Optional
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import cache
+from database.helpers import EventDB, UserDB
+from managers.event_manager import forget_events
+from managers.user import UserManager
+from models import Event, User
+from schemas.user import UserChangePasswordRequest
+from settings import Settings
+from tests.helpers import assert_max_queries
+from utils.cache import Cache, CacheBackend, MemoryBackend, RedisBackend, TTLCache, invalidate
+
+
+@pytest.mark.unit()
+class TestTTLCache:
+    """Test the TTLCache class."""
+
+    def test_get_missing_key(self) -> None:
+        """Ensure a missing key returns None and counts as a miss."""
+        cache = TTLCache(max_size=2, ttl=60)
+
+        assert cache.get("missing") is None
+        assert cache.misses == 1
+
+    def test_set_and_get(self) -> None:
+        """Ensure a stored value is returned and counts as a hit."""
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert cache.hits == 1
+
+    def test_expired_entry(self, mocker) -> None:
+        """Ensure an entry is not returned after its TTL."""
+        mock_time = mocker.patch("utils.cache.time.monotonic", return_value=100.0)
+        cache = TTLCache(max_size=2, ttl=10)
+        cache.set("key", "value")
+
+        mock_time.return_value = 111.0
+
+        assert cache.get("key") is None
+        assert cache.stats()["size"] == 0
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Ensure the least recently used entry is evicted when full."""
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3  # noqa: PLR2004
+        assert cache.evictions == 1
+
+    def test_delete(self) -> None:
+        """Ensure a deleted key is gone."""
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("key", "value")
+        cache.delete("key")
+        cache.delete("never-set")
+
+        assert cache.get("key") is None
+
+    def test_disabled_cache(self) -> None:
+        """Ensure a TTL of 0 stores nothing."""
+        cache = TTLCache(max_size=2, ttl=0)
+        cache.set("key", "value")
+
+        assert cache.get("key") is None
+
+    def test_stats(self) -> None:
+        """Ensure the stats report the hit ratio."""
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("key", "value")
+        cache.get("key")
+        cache.get("missing")
+
+        stats = cache.stats()
+
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5  # noqa: PLR2004
+
+    def test_entry_ttl(self, mocker) -> None:
+        """Ensure an entry's own TTL wins over the cache's."""
+        mock_time = mocker.patch("utils.cache.time.monotonic", return_value=100.0)
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("short", 1, ttl=5)
+        cache.set("long", 2)
+
+        mock_time.return_value = 106.0
+
+        assert cache.get("short") is None
+        assert cache.get("long") == 2  # noqa: PLR2004
+
+    def test_invalidate_tag(self) -> None:
+        """Ensure invalidating a tag removes only the entries that have it."""
+        cache = TTLCache(max_size=4, ttl=60)
+        cache.set("a", 1, tags=["red"])
+        cache.set("b", 2, tags=["red", "blue"])
+        cache.set("c", 3, tags=["blue"])
+
+        assert cache.invalidate("red") == 2  # noqa: PLR2004
+        assert cache.get("a") is None
+        assert cache.get("b") is None
+        assert cache.get("c") == 3  # noqa: PLR2004
+        assert cache.invalidate("red") == 0
+
+    def test_evicted_entry_leaves_tag_index(self) -> None:
+        """Ensure evicted entries are not kept in the tag index."""
+        cache = TTLCache(max_size=1, ttl=60)
+        cache.set("a", 1, tags=["red"])
+        cache.set("b", 2)
+
+        assert cache.invalidate("red") == 0
+
+
+class FakeRedis:
+    """Just enough of `redis.asyncio.Redis` for `RedisBackend`, in memory."""
+
+    def __init__(self) -> None:
+        """Create an empty fake."""
+        self.data: dict[str, Any] = {}
+        self.expires: dict[str, float] = {}
+
+    def _alive(self, key: str) -> bool:
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self.data.pop(key, None)
+            del self.expires[key]
+        return key in self.data
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.data[key] if self._alive(key) else None
+
+    async def set(self, key: str, value: bytes, px: int) -> None:
+        self.data[key] = value
+        self.expires[key] = time.monotonic() + px / 1000
+
+    async def delete(self, *keys: Any) -> int:
+        keys = [key.decode() if isinstance(key, bytes) else key for key in keys]
+        removed = sum(1 for key in keys if self._alive(key))
+        for key in keys:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    async def sadd(self, key: str, member: str) -> None:
+        if not self._alive(key):
+            self.data[key] = set()
+        self.data[key].add(member.encode())
+
+    async def smembers(self, key: str) -> "set[bytes]":
+        return set(self.data[key]) if self._alive(key) else set()
+
+    async def expire(self, key: str, seconds: int, nx: bool = False, gt: bool = False) -> bool:
+        if not self._alive(key):
+            return False
+        current = self.expires.get(key)
+        new = time.monotonic() + seconds
+        if (nx and current is not None) or (gt and (current is None or new <= current)):
+            return False
+        self.expires[key] = new
+        return True
+
+    async def scan_iter(self, match: str) -> AsyncIterator[bytes]:
+        for key in list(self.data):
+            if self._alive(key) and fnmatch.fnmatchcase(key, match):
+                yield key.encode()
+
+    async def info(self, section: str) -> dict[str, Any]:
+        return {"evicted_keys": 0}
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request) -> CacheBackend:
+    """Return each backend, Redis on a fake client."""
+    if request.param == "memory":
+        return MemoryBackend(max_size=100)
+    return RedisBackend(FakeRedis())
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestCacheBackends:
+    """Test that every backend keeps the CacheBackend contract."""
+
+    async def test_set_get_delete(self, backend: CacheBackend) -> None:
+        """Ensure values round-trip and can be deleted."""
+        await backend.set("key", {"id": 1, "name": "value"}, ttl=60)
+
+        assert await backend.get("key") == {"id": 1, "name": "value"}
+        await backend.delete("key")
+        assert await backend.get("key") is None
+
+    async def test_ttl(self, backend: CacheBackend, mocker) -> None:
+        """Ensure an entry is gone after its TTL."""
+        mock_time = mocker.patch("time.monotonic", return_value=100.0)
+        await backend.set("key", "value", ttl=10)
+
+        mock_time.return_value = 111.0
+
+        assert await backend.get("key") is None
+
+    async def test_invalidate(self, backend: CacheBackend) -> None:
+        """Ensure invalidating a tag removes the entries that have it."""
+        await backend.set("a", 1, ttl=60, tags=["user:1"])
+        await backend.set("b", 2, ttl=60, tags=["user:1", "events"])
+        await backend.set("c", 3, ttl=60, tags=["events"])
+
+        await backend.invalidate(["user:1"])
+
+        assert await backend.get("a") is None
+        assert await backend.get("b") is None
+        assert await backend.get("c") == 3  # noqa: PLR2004
+
+    async def test_clear_and_stats(self, backend: CacheBackend) -> None:
+        """Ensure the size is counted per prefix and clear removes everything."""
+        await backend.set("user:1", 1, ttl=60, tags=["user:1"])
+        await backend.set("user:2", 2, ttl=60)
+        await backend.set("event:1", 3, ttl=60)
+
+        assert (await backend.stats("user:"))["size"] == 2  # noqa: PLR2004
+        await backend.clear()
+        assert (await backend.stats(""))["size"] == 0
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestCache:
+    """Test the Cache namespaces."""
+
+    async def test_namespaces_share_tags(self) -> None:
+        """Ensure a tag invalidates entries in every namespace."""
+        backend = MemoryBackend(max_size=10)
+        users = Cache(backend, "user", ttl=60)
+        principals = Cache(backend, "principal", ttl=60)
+        await users.set(1, "row", tags=["user:1"])
+        await principals.set(1, "principal", tags=["user:1"])
+
+        await invalidate(backend, "user:1")
+
+        assert await users.get(1) is None
+        assert await principals.get(1) is None
+
+    async def test_memory_auth_cache_refused_with_workers(self) -> None:
+        """Ensure several workers can't share bans through per-worker memory caches."""
+        with pytest.raises(ValidationError, match="auth cache needs"):
+            Settings(web_concurrency=4, cache_backend="memory", auth_cache_ttl_seconds=30)
+
+        assert Settings(web_concurrency=4, cache_backend="redis", auth_cache_ttl_seconds=30)
+        assert Settings(web_concurrency=4, cache_backend="memory", auth_cache_ttl_seconds=0)
+        assert Settings(web_concurrency=1, cache_backend="memory", auth_cache_ttl_seconds=30)
+
+    async def test_get_or_load(self) -> None:
+        """Ensure `load` runs only on a miss, and counts the hits."""
+        cache = Cache(MemoryBackend(max_size=10), "user", ttl=60)
+        calls = []
+
+        async def load() -> str:
+            calls.append(1)
+            return "row"
+
+        assert await cache.get_or_load(1, load) == "row"
+        assert await cache.get_or_load(1, load) == "row"
+        assert len(calls) == 1
+        assert (await cache.stats())["hit_ratio"] == 0.5  # noqa: PLR2004
+
+    async def test_get_or_load_none_is_not_cached(self) -> None:
+        """Ensure a missing row is looked up again."""
+        cache = Cache(MemoryBackend(max_size=10), "user", ttl=60)
+
+        async def load() -> None:
+            return None
+
+        await cache.get_or_load(1, load)
+
+        assert (await cache.stats())["size"] == 0
+
+    async def test_get_or_load_invalidated_during_load(self) -> None:
+        """Ensure a value that may be out of date is not cached."""
+        backend = MemoryBackend(max_size=10)
+        cache = Cache(backend, "user", ttl=60)
+
+        async def load() -> str:
+            await invalidate(backend, "user:1")
+            return "old row"
+
+        assert await cache.get_or_load(1, load, lambda _: ["user:1"]) == "old row"
+        assert await cache.get(1) is None
+
+    async def test_zero_ttl_disables(self) -> None:
+        """Ensure a namespace with a TTL of 0 stores nothing."""
+        cache = Cache(MemoryBackend(max_size=10), "user", ttl=0)
+        await cache.set(1, "row")
+
+        assert await cache.get(1) is None
+
+    async def test_evictions_are_reported(self) -> None:
+        """Ensure the LRU evictions of the backend are in the stats."""
+        cache = Cache(MemoryBackend(max_size=1), "user", ttl=60)
+        await cache.set(1, "a")
+        await cache.set(2, "b")
+
+        stats = await cache.stats()
+
+        assert stats["evictions"] == 1
+        assert stats["size"] == 1
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestRowCache:
+    """Test the cached reads of EventDB.get and UserDB.get."""
+
+    async def add_event(self, test_db: AsyncSession) -> None:
+        """Add a User and an Event of theirs."""
+        test_db.add(User(email="organizer@example.com", password="hash", first_name="A", last_name="B"))
+        await test_db.flush()
+        test_db.add(
+            Event(
+                title="Cached",
+                description="An event",
+                category="Concerts",
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 1, 2),
+                time=t(18, 0),
+                ticked_price=10,
+                ticked_count=100,
+                location="Tashkent",
+                organizer_id=1,
+            )
+        )
+        await test_db.flush()
+
+    async def test_event_is_cached(self, test_db: AsyncSession) -> None:
+        """Ensure a second read of an Event runs no query."""
+        await self.add_event(test_db)
+        await EventDB.get(test_db, 1)
+
+        with assert_max_queries(0):
+            event = await EventDB.get(test_db, 1)
+
+        assert event.title == "Cached"
+        assert inspect(event).detached
+
+    async def test_event_change_is_seen(self, test_db: AsyncSession) -> None:
+        """Ensure forget_events drops the cached row."""
+        await self.add_event(test_db)
+        await EventDB.get(test_db, 1)
+
+        await EventDB.update(test_db, 1, 1, {"title": "Changed"})
+        await forget_events(test_db, 1)
+
+        assert (await EventDB.get(test_db, 1)).title == "Changed"
+
+    async def test_event_cache_can_be_skipped(self, test_db: AsyncSession) -> None:
+        """Ensure use_cache=False always reads the row."""
+        await self.add_event(test_db)
+        await EventDB.get(test_db, 1)
+
+        with assert_max_queries(1):
+            await EventDB.get(test_db, 1, use_cache=False)
+
+    async def test_user_cache_holds_no_password(self, test_db: AsyncSession) -> None:
+        """Ensure the password hash is never cached, and is read with use_cache=False."""
+        test_db.add(User(email="user@example.com", password="old hash", first_name="A", last_name="B"))
+        await test_db.flush()
+        await UserDB.get(test_db, email="user@example.com")
+
+        await UserManager.change_password(1, UserChangePasswordRequest(password="n3w p@ssword"), test_db)
+        cached = await UserDB.get(test_db, email="user@example.com")
+        user = await UserDB.get(test_db, email="user@example.com", use_cache=False)
+
+        assert "password" in inspect(cached).unloaded
+        assert user.password != "old hash"
+
+    async def test_rollback_drops_rows_cached_in_it(self, test_db: AsyncSession) -> None:
+        """Ensure a row cached from a change that is rolled back is not served after."""
+        await self.add_event(test_db)
+        savepoint = await test_db.begin_nested()
+        await EventDB.update(test_db, 1, 1, {"title": "Rolled back"})
+        await forget_events(test_db, 1)
+        assert (await EventDB.get(test_db, 1)).title == "Rolled back"
+
+        await savepoint.rollback()
+        await asyncio.gather(*cache._pending)
+
+        assert (await EventDB.get(test_db, 1)).title == "Cached"
@@ -0,0 +1,70 @@
+"""Test the connection pool instrumentation."""
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.pool import InstrumentedQueuePool, pool_status
+from tests.conftest import DATABASE_URL
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestInstrumentedQueuePool:
+    """Test the InstrumentedQueuePool class and pool_status."""
+
+    async def test_checkout_is_recorded(self) -> None:
+        """Ensure every checkout is counted."""
+        engine = create_async_engine(DATABASE_URL, poolclass=InstrumentedQueuePool, pool_size=2)
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        status = pool_status(engine)
+        await engine.dispose()
+
+        assert status["acquisitions"] == 3  # noqa: PLR2004
+        assert status["timeouts"] == 0
+        assert status["pool_size"] == 2  # noqa: PLR2004
+        assert status["checked_out"] == 0
+        assert status["idle"] == 1
+
+    async def test_checked_out_and_overflow(self) -> None:
+        """Ensure connections in use and overflow connections are reported."""
+        engine = create_async_engine(
+            DATABASE_URL, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1
+        )
+        async with engine.connect() as first, engine.connect() as second:
+            await first.execute(text("SELECT 1"))
+            await second.execute(text("SELECT 1"))
+            status = pool_status(engine)
+
+        await engine.dispose()
+
+        assert status["checked_out"] == 2  # noqa: PLR2004
+        assert status["overflow"] == 1
+
+    async def test_timeout_is_recorded(self) -> None:
+        """Ensure a checkout that times out is counted."""
+        engine = create_async_engine(
+            DATABASE_URL, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1
+        )
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with pytest.raises(exc.TimeoutError):
+                await engine.connect().start()
+
+        status = pool_status(engine)
+        await engine.dispose()
+
+        assert status["timeouts"] == 1
+        assert status["max_wait_ms"] >= 100  # noqa: PLR2004
+
+    async def test_stats_survive_dispose(self) -> None:
+        """Ensure the counters are kept when the pool is recreated."""
+        engine = create_async_engine(DATABASE_URL, poolclass=InstrumentedQueuePool)
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        await engine.dispose()
+
+        assert pool_status(engine)["acquisitions"] == 1
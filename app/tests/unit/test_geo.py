@@ -0,0 +1,59 @@
+"""Test the distance and bounding box helpers."""
+
+import math
+
+import pytest
+
+from utils.geo import EARTH_RADIUS_KM, bounding_box, haversine_km
+
+
+@pytest.mark.unit()
+class TestGeo:
+    """Test the functions in utils/geo.py."""
+
+    def test_haversine(self) -> None:
+        """Ensure a known distance is computed."""
+        # Tashkent to Samarkand
+        assert haversine_km(41.2995, 69.2401, 39.6542, 66.9597) == pytest.approx(266, abs=2)
+        assert haversine_km(10, 20, 10, 20) == 0
+
+    def destination(self, lat: float, lon: float, bearing: float, distance_km: float) -> tuple[float, float]:
+        """Return the point `distance_km` away from a point in the direction `bearing`."""
+        phi, lam, theta = math.radians(lat), math.radians(lon), math.radians(bearing)
+        delta = distance_km / EARTH_RADIUS_KM
+        phi2 = math.asin(math.sin(phi) * math.cos(delta) + math.cos(phi) * math.sin(delta) * math.cos(theta))
+        lam2 = lam + math.atan2(
+            math.sin(theta) * math.sin(delta) * math.cos(phi), math.cos(delta) - math.sin(phi) * math.sin(phi2)
+        )
+        return math.degrees(phi2), (math.degrees(lam2) + 540) % 360 - 180
+
+    @pytest.mark.parametrize(
+        ("lat", "lon", "radius_km"),
+        [(41.3, 69.2, 20), (0, 0, 500), (70, 10, 300), (-33.9, 151.2, 50), (-17.7, 179.9, 50)],
+    )
+    def test_box_holds_circle(self, lat: float, lon: float, radius_km: float) -> None:
+        """Ensure every point of the circle is in the box."""
+        box = bounding_box(lat, lon, radius_km)
+
+        for bearing in range(0, 360, 5):
+            point_lat, point_lon = self.destination(lat, lon, bearing, radius_km * 0.999)
+            assert box.min_lat <= point_lat <= box.max_lat
+            if box.wraps:
+                assert point_lon >= box.min_lon or point_lon <= box.max_lon
+            else:
+                assert box.min_lon <= point_lon <= box.max_lon
+
+    def test_box_wraps_antimeridian(self) -> None:
+        """Ensure a box across the antimeridian is split."""
+        box = bounding_box(-17.7, 179.9, 50)
+
+        assert box.wraps
+        assert box.min_lon > 179
+        assert box.max_lon < -179
+
+    def test_box_reaching_pole(self) -> None:
+        """Ensure a circle around a pole spans every longitude."""
+        box = bounding_box(89.9, 0, 50)
+
+        assert box.max_lat == 90  # noqa: PLR2004
+        assert (box.min_lon, box.max_lon) == (-180, 180)
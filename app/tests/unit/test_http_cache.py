@@ -0,0 +1,62 @@
+"""Test the HTTP validator helpers."""
+
+from datetime import datetime, timezone
+
+import pytest
+from starlette.requests import Request
+
+from utils.http_cache import http_date, not_modified, version_etag
+
+UPDATED = datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)
+
+
+def request_with(**headers: str) -> Request:
+    """Return a GET request with these headers."""
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+        }
+    )
+
+
+@pytest.mark.unit()
+class TestHttpCache:
+    """Test the ETag and conditional request helpers."""
+
+    def test_etag_depends_on_versions(self) -> None:
+        """Ensure a changed row or cursor gives a different ETag."""
+        etag = version_etag([(1, UPDATED), (2, UPDATED)])
+
+        assert version_etag([(1, UPDATED), (2, UPDATED)]) == etag
+        assert version_etag([(1, UPDATED), (2, UPDATED.replace(second=16))]) != etag
+        assert version_etag([(1, UPDATED), (2, UPDATED)], "cursor") != etag
+
+    def test_if_none_match(self) -> None:
+        """Ensure a matching, weak or wildcard If-None-Match is not modified."""
+        etag = version_etag([(1, UPDATED)])
+
+        assert not_modified(request_with(if_none_match=etag), etag, UPDATED)
+        assert not_modified(request_with(if_none_match=f'"other", W/{etag}'), etag, UPDATED)
+        assert not_modified(request_with(if_none_match="*"), etag, UPDATED)
+        assert not not_modified(request_with(if_none_match='"other"'), etag, UPDATED)
+
+    def test_if_modified_since(self) -> None:
+        """Ensure Last-Modified is compared to the second."""
+        assert not_modified(request_with(if_modified_since=http_date(UPDATED)), '"x"', UPDATED)
+        assert not not_modified(
+            request_with(if_modified_since=http_date(UPDATED.replace(second=14))), '"x"', UPDATED
+        )
+        assert not not_modified(request_with(if_modified_since="not a date"), '"x"', UPDATED)
+
+    def test_if_none_match_wins(self) -> None:
+        """Ensure If-Modified-Since is ignored when If-None-Match is sent."""
+        request = request_with(if_none_match='"other"', if_modified_since=http_date(UPDATED))
+
+        assert not not_modified(request, '"x"', UPDATED)
+
+    def test_no_headers(self) -> None:
+        """Ensure a plain request is always answered in full."""
+        assert not not_modified(request_with(), '"x"', UPDATED)
@@ -0,0 +1,82 @@
+"""Test the Alembic migrations against an empty database."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from tests.conftest import SERVER_URL, TEST_DB_NAME
+
+APP_DIR = Path(__file__).parents[2]
+MIGRATIONS_DB_NAME = f"{TEST_DB_NAME}_migrations"
+
+# the app's alembic/ directory shadows the alembic package, so the commands
+# run in a process that imports the package before the app is on sys.path
+RUNNER = """
+import asyncio
+import sys
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy.ext.asyncio import create_async_engine
+
+app_dir, url = sys.argv[1:]
+sys.path.insert(0, app_dir)
+import database.db
+database.db.DATABASE_URL = url
+import models
+config = Config()
+config.set_main_option("script_location", app_dir + "/alembic")
+
+async def schema_diff():
+    engine = create_async_engine(url)
+    async with engine.connect() as conn:
+        diff = await conn.run_sync(
+            lambda sync_conn: compare_metadata(MigrationContext.configure(sync_conn), models.Base.metadata)
+        )
+    await engine.dispose()
+    return diff
+
+command.upgrade(config, "head")
+diff = asyncio.run(schema_diff())
+command.downgrade(config, "base")
+command.upgrade(config, "head")
+print(diff)
+"""
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestMigrations:
+    """Test the migration chain."""
+
+    async def recreate_database(self) -> None:
+        """Drop and create the database the migrations run on."""
+        admin = create_async_engine(
+            SERVER_URL.set(database="postgres"), isolation_level="AUTOCOMMIT", poolclass=NullPool
+        )
+        async with admin.connect() as conn:
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{MIGRATIONS_DB_NAME}"'))
+            await conn.execute(text(f'CREATE DATABASE "{MIGRATIONS_DB_NAME}"'))
+        await admin.dispose()
+
+    async def test_upgrade_from_empty_database(self, tmp_path: Path) -> None:
+        """Ensure the chain builds the schema of the models, and can be undone and run again."""
+        await self.recreate_database()
+        url = SERVER_URL.set(database=MIGRATIONS_DB_NAME).render_as_string(hide_password=False)
+
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", RUNNER, str(APP_DIR), url],
+            cwd=tmp_path,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-1] == "[]"
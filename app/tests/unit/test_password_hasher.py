@@ -0,0 +1,128 @@
+"""Test the PasswordHasher class."""
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from managers.password import PasswordHasher, build_context, pwd_context, use_profile
+from settings import Settings, get_settings
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestPasswordHasher:
+    """Test the PasswordHasher class."""
+
+    async def test_hash_and_verify(self) -> None:
+        """Ensure a hashed password verifies against the original."""
+        hasher = PasswordHasher("thread", max_workers=2)
+
+        hashed = await hasher.hash("test12345!")
+
+        assert hashed != "test12345!"
+        assert pwd_context.verify("test12345!", hashed)
+        assert await hasher.verify("test12345!", hashed)
+        assert not await hasher.verify("wrongpassword", hashed)
+        hasher.shutdown()
+
+    async def test_process_pool(self) -> None:
+        """Ensure the process pool gives the same results."""
+        hasher = PasswordHasher("process", max_workers=1)
+
+        hashed = await hasher.hash("test12345!")
+
+        assert await hasher.verify("test12345!", hashed)
+        hasher.shutdown()
+
+    async def test_process_pool_follows_profile(self) -> None:
+        """Ensure a process pool started before use_profile hashes with the new profile."""
+        hasher = PasswordHasher("process", max_workers=1)
+        await hasher.hash("test12345!")
+
+        use_profile("bcrypt", bcrypt_rounds=4)
+        try:
+            hashed = await hasher.hash("test12345!")
+        finally:
+            use_profile("plaintext", bcrypt_rounds=4)
+            hasher.shutdown()
+
+        assert hashed.startswith("$2b$04$")
+
+    async def test_concurrency_is_capped(self) -> None:
+        """Ensure jobs over the worker count wait in the queue."""
+        hasher = PasswordHasher("thread", max_workers=1)
+
+        await asyncio.gather(*(hasher.hash("test12345!") for _ in range(3)))
+
+        stats = hasher.stats()
+        assert stats["completed"] == 3  # noqa: PLR2004
+        assert stats["peak_queued"] == 2  # noqa: PLR2004
+        assert stats["in_flight"] == 0
+        assert stats["queued"] == 0
+        hasher.shutdown()
+
+    async def test_bad_executor_type(self) -> None:
+        """Ensure an unknown executor type is rejected."""
+        with pytest.raises(ValueError, match="Unknown password executor"):
+            PasswordHasher("fibers", max_workers=1)
+
+    async def test_verify_and_update(self) -> None:
+        """Ensure an outdated hash is replaced and a current one is not."""
+        hasher = PasswordHasher("thread", max_workers=1)
+        old_hash = build_context("bcrypt", bcrypt_rounds=4).hash("test12345!")
+
+        valid, new_hash = await hasher.verify_and_update("test12345!", old_hash)
+        wrong = await hasher.verify_and_update("wrongpassword", old_hash)
+        current = await hasher.verify_and_update("test12345!", new_hash)
+
+        assert valid
+        assert pwd_context.identify(new_hash) == pwd_context.default_scheme()
+        assert wrong == (False, None)
+        assert current == (True, None)
+        hasher.shutdown()
+
+
+@pytest.mark.unit()
+class TestBuildContext:
+    """Test the hashing profiles of build_context."""
+
+    def test_bcrypt_rounds(self) -> None:
+        """Ensure the rounds are used, and hashes with fewer are outdated."""
+        cheap = build_context("bcrypt", bcrypt_rounds=4).hash("test12345!")
+        context = build_context("bcrypt", bcrypt_rounds=5)
+
+        assert cheap.startswith("$2b$04$")
+        assert context.hash("test12345!").startswith("$2b$05$")
+        assert context.needs_update(cheap)
+
+    def test_plaintext_is_marked(self) -> None:
+        """Ensure the plaintext scheme only verifies where it is configured."""
+        stored = build_context("plaintext", bcrypt_rounds=4).hash("test12345!")
+
+        assert stored == "$plaintext$test12345!"
+        assert build_context("plaintext", bcrypt_rounds=4).verify("test12345!", stored)
+        assert build_context("bcrypt", bcrypt_rounds=4).identify(stored) is None
+
+    def test_plaintext_only_when_testing(self, mocker) -> None:
+        """Ensure the plaintext scheme is refused at startup and in use_profile outside of tests."""
+        with pytest.raises(ValidationError, match="only allowed when testing"):
+            Settings(password_scheme="plaintext", testing=False)
+
+        mocker.patch.object(get_settings(), "testing", False)
+        with pytest.raises(ValueError, match="only allowed when testing"):
+            use_profile("plaintext", bcrypt_rounds=4)
+
+    def test_bcrypt_hash_outdated_under_plaintext(self) -> None:
+        """Ensure hashes of another scheme still verify and are replaced."""
+        bcrypt_hash = build_context("bcrypt", bcrypt_rounds=4).hash("test12345!")
+        context = build_context("plaintext", bcrypt_rounds=4)
+
+        assert context.verify("test12345!", bcrypt_hash)
+        assert context.needs_update(bcrypt_hash)
+
+    def test_argon2id(self) -> None:
+        """Ensure argon2 hashes are argon2id."""
+        pytest.importorskip("argon2")
+
+        assert build_context("argon2", bcrypt_rounds=4).hash("test12345!").startswith("$argon2id$")
@@ -0,0 +1,86 @@
+"""Test the stub card processor used as the Payment gateway."""
+
+from datetime import datetime
+
+import pytest
+
+from managers.payment_gateway import StubCardProcessor, card_expired, luhn_valid
+from utils.enums import PaymentMethod, PaymentStatus
+
+
+@pytest.mark.unit()
+class TestCardChecks:
+    """Test the card number and expiry checks."""
+
+    @pytest.mark.parametrize(
+        ("card_number", "expected"),
+        [
+            ("4242424242424242", True),
+            ("4000000000000002", True),
+            ("4242424242424241", False),
+        ],
+    )
+    def test_luhn_valid(self, card_number: str, expected: bool) -> None:  # noqa: FBT001
+        """Ensure the Luhn checksum is computed correctly."""
+        assert luhn_valid(card_number) is expected
+
+    @pytest.mark.parametrize(
+        ("exp_date", "expected"),
+        [
+            ("05/26", True),
+            ("06/26", False),
+            ("01/30", False),
+        ],
+    )
+    def test_card_expired(self, exp_date: str, expected: bool) -> None:  # noqa: FBT001
+        """Ensure a card is valid until the end of its expiry month."""
+        assert card_expired(exp_date, today=datetime(2026, 6, 15)) is expected
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestStubCardProcessor:
+    """Test the outcomes of the stub card processor."""
+
+    @pytest.mark.parametrize(
+        ("method", "card_number", "exp_date", "expected"),
+        [
+            (PaymentMethod.cash, None, None, PaymentStatus.approved),
+            (PaymentMethod.card, "4242424242424242", "12/99", PaymentStatus.approved),
+            (PaymentMethod.card, "4000000000000002", "12/99", PaymentStatus.declined),
+            (PaymentMethod.card, "4000000000009995", "12/99", PaymentStatus.out_of_balance),
+            (PaymentMethod.card, "************9995", "12/99", PaymentStatus.out_of_balance),
+            (PaymentMethod.card, "4242424242424242", "01/20", PaymentStatus.declined),
+            (PaymentMethod.card, None, None, PaymentStatus.declined),
+        ],
+    )
+    async def test_charge(
+        self, method: PaymentMethod, card_number: str, exp_date: str, expected: PaymentStatus
+    ) -> None:
+        """Ensure each test card gives its documented outcome."""
+        status = await StubCardProcessor().charge(10, method, card_number, exp_date)
+
+        assert status == expected
+
+    @pytest.mark.parametrize(
+        ("card_number", "expected"),
+        [
+            ("4242424242424242", PaymentStatus.approved),
+            ("4000000000000002", PaymentStatus.declined),
+            ("4000000000009995", PaymentStatus.out_of_balance),
+        ],
+    )
+    async def test_charge_token(self, card_number: str, expected: PaymentStatus) -> None:
+        """Ensure a tokenized card gives the same outcome, without its full number in the token."""
+        processor = StubCardProcessor()
+        token = await processor.tokenize(card_number, "12/99")
+
+        assert card_number not in token
+        assert await processor.charge_token(10, PaymentMethod.card, token) == expected
+
+    async def test_charge_token_cash_and_missing_token(self) -> None:
+        """Ensure cash needs no token and a card without one is declined."""
+        processor = StubCardProcessor()
+
+        assert await processor.charge_token(10, PaymentMethod.cash, None) == PaymentStatus.approved
+        assert await processor.charge_token(10, PaymentMethod.card, None) == PaymentStatus.declined
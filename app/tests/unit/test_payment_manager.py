@@ -0,0 +1,253 @@
+"""Test the PaymentManager class."""
+
+import hashlib
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+
+from managers.payment_manager import PaymentErrorMessages, PaymentManager, mask_card_number, request_hash
+from managers.payment_gateway import payment_gateway
+from managers.user import pwd_context
+from models import Event, IdempotencyKey, Payment, Ticket, User
+from schemas.payment_schemas import PaymentRequestSchema
+from settings import get_settings
+from utils.enums import PaymentMethod, PaymentStatus, RoleType
+
+CARD = PaymentRequestSchema(payment_method=PaymentMethod.card, card_number="4242424242424242", exp_date="12/99")
+DECLINED_CARD = PaymentRequestSchema(
+    payment_method=PaymentMethod.card, card_number="4000000000000002", exp_date="12/99"
+)
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestPaymentManager:
+    """Test the PaymentManager class."""
+
+    async def create_ticket(self, test_db) -> None:
+        """Create a user (id 1), an event (id 1) and a ticket (id 1)."""
+        test_db.add(
+            User(
+                email="buyer@example.com",
+                first_name="Test",
+                last_name="Buyer",
+                password=pwd_context.hash("test12345!"),
+                verified=True,
+                role=RoleType.organizer,
+            )
+        )
+        await test_db.flush()
+        test_db.add(
+            Event(
+                title="Test event",
+                description="Test event description",
+                category="Concerts",
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 1, 2),
+                time=time(18, 0),
+                ticked_price=15,
+                ticked_count=10,
+                location="Tashkent",
+                organizer_id=1,
+            )
+        )
+        await test_db.flush()
+        test_db.add(Ticket(user_id=1, event_id=1))
+        await test_db.flush()
+
+    async def count_payments(self, test_db) -> int:
+        """Return the number of Payments in the database."""
+        return await test_db.scalar(select(func.count()).select_from(Payment))
+
+    async def test_create_payment(self, test_db, session_factory) -> None:
+        """Ensure a payment is charged at the ticket price and approved."""
+        await self.create_ticket(test_db)
+
+        payment, replayed = await PaymentManager.create_payment(1, 1, CARD, session_factory)
+
+        assert replayed is False
+        assert payment["status"] == PaymentStatus.approved.value
+        assert payment["amount"] == 15  # noqa: PLR2004
+        assert payment["card_number"] == "************4242"
+
+    async def test_create_payment_stores_masked_card(self, test_db, session_factory) -> None:
+        """Ensure the full card number is never written to the database."""
+        await self.create_ticket(test_db)
+
+        await PaymentManager.create_payment(1, 1, CARD, session_factory)
+
+        assert await test_db.scalar(select(Payment.card_number)) == mask_card_number(CARD.card_number)
+
+    async def test_create_payment_declined(self, test_db, session_factory) -> None:
+        """Ensure a declined card leaves the ticket open for another try."""
+        await self.create_ticket(test_db)
+
+        payment, _ = await PaymentManager.create_payment(1, 1, DECLINED_CARD, session_factory)
+        retry, _ = await PaymentManager.create_payment(1, 1, CARD, session_factory)
+
+        assert payment["status"] == PaymentStatus.declined.value
+        assert retry["status"] == PaymentStatus.approved.value
+
+    async def test_create_payment_invalid_card(self, test_db, session_factory) -> None:
+        """Ensure a card failing the Luhn check is declined without a charge."""
+        await self.create_ticket(test_db)
+        card = PaymentRequestSchema(
+            payment_method=PaymentMethod.card, card_number="4242424242424241", exp_date="12/99"
+        )
+
+        payment, _ = await PaymentManager.create_payment(1, 1, card, session_factory)
+
+        assert payment["status"] == PaymentStatus.declined.value
+
+    async def test_create_payment_worker_settlement(self, test_db, session_factory, mocker) -> None:
+        """Ensure the payment is left pending when a worker settles it."""
+        mocker.patch.object(get_settings(), "payment_settlement", "worker")
+        await self.create_ticket(test_db)
+
+        charge = mocker.spy(payment_gateway, "charge")
+
+        payment, _ = await PaymentManager.create_payment(1, 1, CARD, session_factory)
+
+        assert payment["status"] == PaymentStatus.pending.value
+        assert await test_db.scalar(select(Payment.card_token)) == "stub:12/99:4242"
+        charge.assert_not_called()
+
+    async def test_create_payment_charges_full_card(self, test_db, session_factory, mocker) -> None:
+        """Ensure the inline charge gets the card number of the request, not the masked one."""
+        await self.create_ticket(test_db)
+        charge = mocker.spy(payment_gateway, "charge")
+
+        await PaymentManager.create_payment(1, 1, CARD, session_factory)
+
+        charge.assert_called_once_with(15, PaymentMethod.card, CARD.card_number, CARD.exp_date)
+        assert await test_db.scalar(select(Payment.card_token)) is None
+
+    async def test_retry_after_failed_save_is_not_charged(self, test_db, session_factory, mocker) -> None:
+        """Ensure a retry after the charge result failed to save doesn't charge again."""
+        await self.create_ticket(test_db)
+        charge = mocker.spy(payment_gateway, "charge")
+        mocker.patch("managers.payment_manager.PaymentDB.set_statuses", side_effect=OSError)
+
+        with pytest.raises(OSError):
+            await PaymentManager.create_payment(1, 1, CARD, session_factory, "key-1")
+        payment, replayed = await PaymentManager.create_payment(1, 1, CARD, session_factory, "key-1")
+
+        charge.assert_called_once()
+        assert replayed is True
+        assert payment["status"] == PaymentStatus.pending.value
+        assert await self.count_payments(test_db) == 1
+
+    async def test_create_payment_charge_error(self, test_db, session_factory, mocker) -> None:
+        """Ensure a charge that raises marks the Payment failed, and a retry isn't charged."""
+        await self.create_ticket(test_db)
+        charge = mocker.patch.object(payment_gateway, "charge", side_effect=OSError)
+
+        payment, _ = await PaymentManager.create_payment(1, 1, CARD, session_factory, "key-1")
+        retry, replayed = await PaymentManager.create_payment(1, 1, CARD, session_factory, "key-1")
+
+        assert payment["status"] == PaymentStatus.failed.value
+        assert await test_db.scalar(select(Payment.status)) == PaymentStatus.failed
+        assert (retry, replayed) == (payment, True)
+        charge.assert_called_once()
+
+    async def test_pending_payment_replayed_as_settled(self, test_db, session_factory, mocker) -> None:
+        """Ensure a retry for a pending Payment returns how it was settled since."""
+        mocker.patch.object(get_settings(), "payment_settlement", "worker")
+        await self.create_ticket(test_db)
+        first, _ = await PaymentManager.create_payment(1, 1, CARD, session_factory, "key-1")
+        payment = await test_db.scalar(select(Payment))
+        payment.status = PaymentStatus.approved
+        await test_db.flush()
+
+        second, replayed = await PaymentManager.create_payment(1, 1, CARD, session_factory, "key-1")
+
+        assert first["status"] == PaymentStatus.pending.value
+        assert replayed is True
+        assert second == {**first, "status": PaymentStatus.approved.value}
+
+    async def test_create_payment_already_paid(self, test_db, session_factory) -> None:
+        """Ensure an approved ticket cannot be paid again."""
+        await self.create_ticket(test_db)
+        await PaymentManager.create_payment(1, 1, CARD, session_factory)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await PaymentManager.create_payment(1, 1, CARD, session_factory)
+
+        assert exc_info.value.status_code == status.HTTP_409_CONFLICT
+        assert exc_info.value.detail == PaymentErrorMessages.ALREADY_PAID
+
+    async def test_create_payment_other_users_ticket(self, test_db, session_factory) -> None:
+        """Ensure a user cannot pay for a ticket they do not hold."""
+        await self.create_ticket(test_db)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await PaymentManager.create_payment(1, 2, CARD, session_factory)
+
+        assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+        assert exc_info.value.detail == PaymentErrorMessages.TICKET_INVALID
+
+    async def test_idempotency_key_replays_response(self, test_db, session_factory) -> None:
+        """Ensure a retry with the same key returns the first payment."""
+        await self.create_ticket(test_db)
+
+        first, first_replayed = await PaymentManager.create_payment(1, 1, CARD, session_factory, "key-1")
+        second, second_replayed = await PaymentManager.create_payment(1, 1, CARD, session_factory, "key-1")
+
+        assert (first_replayed, second_replayed) == (False, True)
+        assert second == first
+        assert await self.count_payments(test_db) == 1
+
+    async def test_idempotency_key_reused_for_other_request(self, test_db, session_factory) -> None:
+        """Ensure a key sent with a different body is rejected."""
+        await self.create_ticket(test_db)
+        await PaymentManager.create_payment(1, 1, DECLINED_CARD, session_factory, "key-1")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await PaymentManager.create_payment(1, 1, CARD, session_factory, "key-1")
+
+        assert exc_info.value.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert exc_info.value.detail == PaymentErrorMessages.KEY_REUSED
+
+    async def test_idempotency_key_hash_is_keyed(self, test_db, session_factory, mocker) -> None:
+        """Ensure the stored fingerprint of a card request can't be computed without the secret key."""
+        await self.create_ticket(test_db)
+        await PaymentManager.create_payment(1, 1, CARD, session_factory, "key-1")
+        stored = await test_db.scalar(select(IdempotencyKey.request_hash))
+
+        body = f"1:{CARD.model_dump_json()}".encode()
+        assert stored != hashlib.sha256(body).hexdigest()
+        assert stored == request_hash(1, CARD)
+        mocker.patch.object(get_settings(), "secret_key", "another secret")
+        assert stored != request_hash(1, CARD)
+
+    async def test_expired_idempotency_key_is_reclaimed(self, test_db, session_factory) -> None:
+        """Ensure a key can be used again once it has expired."""
+        await self.create_ticket(test_db)
+        await PaymentManager.create_payment(1, 1, DECLINED_CARD, session_factory, "key-1")
+        key = await test_db.scalar(select(IdempotencyKey))
+        key.expires_at = datetime.now() - timedelta(seconds=1)
+        await test_db.flush()
+
+        payment, replayed = await PaymentManager.create_payment(1, 1, CARD, session_factory, "key-1")
+
+        assert replayed is False
+        assert payment["status"] == PaymentStatus.approved.value
+
+    async def test_purge_expired_keys(self, test_db) -> None:
+        """Ensure only expired keys are purged."""
+        await self.create_ticket(test_db)
+        now = datetime.now()
+        test_db.add_all(
+            [
+                IdempotencyKey(key="old", request_hash="x", expires_at=now - timedelta(hours=1), user_id=1),
+                IdempotencyKey(key="new", request_hash="x", expires_at=now + timedelta(hours=1), user_id=1),
+            ]
+        )
+        await test_db.flush()
+
+        deleted = await PaymentManager.purge_expired_keys(test_db)
+
+        assert deleted == 1
+        assert await test_db.scalar(select(IdempotencyKey.key)) == "new"
@@ -0,0 +1,108 @@
+"""Test the per-request SQL instrumentation and the timing middleware."""
+
+import logging
+import re
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from database.instrumentation import QueryStats, current_queries, instrument, parameter_shapes
+from tests.conftest import DATABASE_URL
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestInstrumentation:
+    """Test the cursor execute hooks."""
+
+    async def test_parameter_shapes(self) -> None:
+        """Ensure parameters are shown as types, and many rows by their count."""
+        assert parameter_shapes(("secret", 1, None)) == ["str", "int", "NoneType"]
+        assert parameter_shapes({"email": "a@example.com", "id": 3}) == {"email": "str", "id": "int"}
+        assert parameter_shapes([("a", 1), ("b", 2)]) == "2 x ['str', 'int']"
+
+    async def test_query_stats(self) -> None:
+        """Ensure the count, total and slowest statement are kept."""
+        stats = QueryStats()
+        stats.record("SELECT 1", 0.002)
+        stats.record("SELECT 2", 0.005)
+        stats.record("SELECT 3", 0.001)
+
+        assert stats.count == 3  # noqa: PLR2004
+        assert stats.total == pytest.approx(0.008)
+        assert stats.slowest_statement == "SELECT 2"
+
+    async def test_statements_are_recorded(self) -> None:
+        """Ensure statements run while a QueryStats is set are added to it, unless ignored."""
+        engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+        instrument(engine, slow_query_ms=0, ignore=("SELECT 'ignored'",))
+        stats = QueryStats()
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                token = current_queries.set(stats)
+                await conn.execute(text("SELECT 2"))
+                await conn.execute(text("SELECT pg_sleep(0.1)"))
+                await conn.execute(text("SELECT 'ignored'"))
+                current_queries.reset(token)
+                await conn.execute(text("SELECT 3"))
+        finally:
+            await engine.dispose()
+
+        assert stats.count == 2  # noqa: PLR2004
+        assert stats.slowest_statement == "SELECT pg_sleep(0.1)"
+        assert stats.slowest >= 0.1  # noqa: PLR2004
+
+    async def test_slow_query_logged_without_values(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Ensure a slow statement is logged with the types of its parameters only."""
+        engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+        instrument(engine, slow_query_ms=100)
+        try:
+            async with engine.connect() as conn:
+                with caplog.at_level(logging.WARNING, logger="database.instrumentation"):
+                    await conn.execute(text("SELECT CAST(:secret AS text)"), {"secret": "hunter2"})
+                    await conn.execute(text("SELECT pg_sleep(0.3), CAST(:secret AS text)"), {"secret": "hunter2"})
+        finally:
+            await engine.dispose()
+
+        # the other statement is far below the threshold, but a busy machine could still log it
+        slow = [record for record in caplog.records if "pg_sleep" in record.message]
+        assert len(slow) == 1
+        assert "['str']" in slow[0].message
+        assert "hunter2" not in caplog.text
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestRequestTimingMiddleware:
+    """Test the Server-Timing header and the request log."""
+
+    async def test_server_timing_header(self, client) -> None:
+        """Ensure the header holds the queries the route ran."""
+        response = await client.get("/users/me")
+
+        assert response.status_code == 403  # noqa: PLR2004
+        timing = response.headers["Server-Timing"]
+        assert re.fullmatch(r'db;dur=[\d.]+;desc="0 queries", db-slowest;dur=[\d.]+, total;dur=[\d.]+', timing)
+
+    async def test_queries_are_counted(self, client) -> None:
+        """Ensure a route's statements show in the header."""
+        response = await client.get("/events/list/?limit=5")
+
+        assert response.status_code == 200  # noqa: PLR2004
+        queries = int(re.search(r'desc="(\d+) queries"', response.headers["Server-Timing"]).group(1))
+        assert queries >= 1
+
+    async def test_request_logged(self, client, caplog: pytest.LogCaptureFixture) -> None:
+        """Ensure every request is logged with its figures as fields."""
+        with caplog.at_level(logging.INFO, logger="utils.request_timing"):
+            await client.get("/events/list/?limit=5")
+
+        record = caplog.records[-1]
+        assert record.method == "GET"
+        assert record.path == "/events/list/"
+        assert record.status_code == 200  # noqa: PLR2004
+        assert record.db_queries >= 1
+        assert record.db_slowest_statement.startswith("SELECT")
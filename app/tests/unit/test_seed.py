@@ -0,0 +1,85 @@
+"""Test the Seeder that fills a database for load tests."""
+
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from database.seed import SeedCounts, Seeder, batched
+from models import Payment, Ticket, User
+from tests.conftest import DATABASE_URL
+from utils.enums import RoleType
+
+COUNTS = SeedCounts(users=20, organizers=3, events=10, tickets=200, paid=0.5)
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+@pytest.mark.commits()
+class TestSeeder:
+    """Test the Seeder class."""
+
+    @pytest_asyncio.fixture()
+    async def engine(self) -> AsyncGenerator[AsyncEngine, Any]:
+        """Give the seeder connections of its own, as it has when it runs alone."""
+        engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+        yield engine
+        await engine.dispose()
+
+    async def count(self, engine: AsyncEngine, query) -> int:
+        """Run a COUNT query."""
+        async with engine.connect() as conn:
+            return await conn.scalar(query)
+
+    async def test_seed_empty_database(self, engine: AsyncEngine) -> None:
+        """Ensure every table gets its rows, and a few events sell most tickets."""
+        seeder = Seeder(engine, COUNTS, password_hash="hash", workers=2, batch_size=30)
+        report = await seeder.run()
+
+        assert report.rows["users"] == COUNTS.users + COUNTS.organizers
+        assert report.rows["events"] == COUNTS.events
+        assert report.rows["tickets"] == COUNTS.tickets
+        assert report.rows["payments"] == await self.count(engine, select(func.count(Payment.id)))
+        assert await self.count(engine, select(func.count(Ticket.id))) == COUNTS.tickets
+        assert (
+            await self.count(engine, select(func.count(User.id)).where(User.role == RoleType.organizer))
+            == COUNTS.organizers
+        )
+        per_event = select(func.count(Ticket.id).label("sold")).group_by(Ticket.event_id).subquery()
+        assert await self.count(engine, select(func.max(per_event.c.sold))) > 2 * COUNTS.tickets / COUNTS.events
+
+    async def test_constraints_come_back(self, engine: AsyncEngine) -> None:
+        """Ensure the foreign keys and indexes dropped for the load are there again."""
+        query = text(
+            "SELECT (SELECT count(*) FROM pg_indexes WHERE tablename = :table) "
+            "+ (SELECT count(*) FROM pg_constraint WHERE conrelid = CAST(:table AS regclass))"
+        )
+
+        async def constraints() -> list[int]:
+            async with engine.connect() as conn:
+                return [await conn.scalar(query, {"table": table}) for table in ("users", "events", "tickets")]
+
+        before = await constraints()
+        await Seeder(engine, COUNTS, password_hash="hash", workers=2, batch_size=30).run()
+
+        assert await constraints() == before
+
+    async def test_seed_adds_to_existing_rows(self, engine: AsyncEngine) -> None:
+        """Ensure a second run appends rows and the sequences continue after them."""
+        await Seeder(engine, COUNTS, password_hash="hash", seed=1).run()
+        await Seeder(engine, COUNTS, password_hash="hash", seed=2).run()
+
+        assert await self.count(engine, select(func.count(Ticket.id))) == 2 * COUNTS.tickets
+        async with engine.begin() as conn:
+            next_id = await conn.scalar(text("SELECT nextval(pg_get_serial_sequence('tickets', 'id'))"))
+        assert next_id == 2 * COUNTS.tickets + 1
+
+    async def test_batched(self) -> None:
+        """Ensure rows are split in batches of the given size."""
+        batches = list(batched(((number,) for number in range(7)), 3))
+
+        assert [len(batch) for batch in batches] == [3, 3, 1]
@@ -0,0 +1,174 @@
+"""Test the Payment settlement worker."""
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncGenerator
+from datetime import date, time
+from typing import Any, Optional
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from managers.payment_gateway import StubCardProcessor
+from managers.settlement import SettlementWorker
+from managers.user import pwd_context
+from models import Event, Payment, Ticket, User
+from tests.conftest import DATABASE_URL
+from utils.enums import PaymentMethod, PaymentStatus, RoleType
+
+
+class CountingGateway:
+    """A gateway that counts its charges and fails for one card."""
+
+    def __init__(self, fail_suffix: str) -> None:
+        """Fail the cards ending in `fail_suffix`."""
+        self.fail_suffix = fail_suffix
+        self.charges: Counter[Optional[str]] = Counter()
+
+    async def charge_token(self, amount: float, method: PaymentMethod, card_token: Optional[str]) -> PaymentStatus:
+        """Count the charge, then raise for the failing card."""
+        self.charges[card_token] += 1
+        if card_token and card_token.endswith(self.fail_suffix):
+            raise ConnectionError("gateway unreachable")
+        return PaymentStatus.approved
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+@pytest.mark.commits()
+class TestSettlementWorker:
+    """Test the SettlementWorker class."""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def sessions(self) -> AsyncGenerator[async_sessionmaker[AsyncSession], Any]:
+        """Give the worker connections of its own, as it has when it runs alone."""
+        engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+        self.session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        yield self.session_factory
+        await engine.dispose()
+
+    def get_worker(self, batch_size: int = 10, concurrency: int = 1, gateway=None) -> SettlementWorker:
+        """Return a worker on the test database."""
+        return SettlementWorker(
+            session_factory=self.session_factory,
+            gateway=gateway or StubCardProcessor(),
+            batch_size=batch_size,
+            concurrency=concurrency,
+            poll_interval=0.01,
+        )
+
+    async def create_pending(self, test_db, card_numbers: list[str]) -> None:
+        """Create one pending card Payment per card number."""
+        test_db.add(
+            User(
+                email="buyer@example.com",
+                first_name="Test",
+                last_name="Buyer",
+                password=pwd_context.hash("test12345!"),
+                verified=True,
+                role=RoleType.organizer,
+            )
+        )
+        await test_db.flush()
+        test_db.add(
+            Event(
+                title="Test event",
+                description="Test event description",
+                category="Concerts",
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 1, 2),
+                time=time(18, 0),
+                ticked_price=10,
+                ticked_count=100,
+                location="Tashkent",
+                organizer_id=1,
+            )
+        )
+        await test_db.flush()
+        for number, card_number in enumerate(card_numbers, start=1):
+            test_db.add(Ticket(user_id=1, event_id=1))
+            await test_db.flush()
+            test_db.add(
+                Payment(
+                    amount=10,
+                    payment_method=PaymentMethod.card,
+                    status=PaymentStatus.pending,
+                    card_number=card_number,
+                    exp_date="12/99",
+                    card_token=f"stub:12/99:{card_number[-4:]}",
+                    user_id=1,
+                    ticket_id=number,
+                )
+            )
+        await test_db.commit()
+
+    async def get_statuses(self) -> list[PaymentStatus]:
+        """Return the status of every Payment, by id."""
+        async with self.session_factory() as session:
+            return list((await session.scalars(select(Payment.status).order_by(Payment.id))).all())
+
+    async def test_settle_batch(self, test_db) -> None:
+        """Ensure a batch is charged and the statuses are written back."""
+        await self.create_pending(test_db, ["************4242", "************0002", "************9995"])
+        worker = self.get_worker()
+
+        settled = await worker.settle_batch()
+
+        assert settled == 3  # noqa: PLR2004
+        assert await self.get_statuses() == [
+            PaymentStatus.approved,
+            PaymentStatus.declined,
+            PaymentStatus.out_of_balance,
+        ]
+        assert worker.stats()["by_status"] == {"approved": 1, "declined": 1, "out_of_balance": 1}
+
+    async def test_settle_batch_respects_batch_size(self, test_db) -> None:
+        """Ensure a batch claims at most `batch_size` Payments."""
+        await self.create_pending(test_db, ["************4242"] * 5)
+
+        settled = await self.get_worker(batch_size=2).settle_batch()
+
+        assert settled == 2  # noqa: PLR2004
+        assert (await self.get_statuses()).count(PaymentStatus.pending) == 3  # noqa: PLR2004
+
+    async def test_drain_with_concurrent_workers(self, test_db) -> None:
+        """Ensure concurrent batches settle every Payment exactly once."""
+        await self.create_pending(test_db, ["************4242"] * 25)
+        worker = self.get_worker(batch_size=4, concurrency=3)
+
+        settled = await worker.drain()
+
+        assert settled == 25  # noqa: PLR2004
+        assert await self.get_statuses() == [PaymentStatus.approved] * 25
+        assert worker.stats()["settled"] == 25  # noqa: PLR2004
+
+    async def test_gateway_error_fails_only_its_payment(self, test_db) -> None:
+        """Ensure a charge that raises fails its Payment and the others are charged once."""
+        await self.create_pending(test_db, ["************4242", "************1111", "************4242"])
+        gateway = CountingGateway(fail_suffix="1111")
+        worker = self.get_worker(gateway=gateway)
+
+        assert await worker.drain() == 3  # noqa: PLR2004
+
+        assert await self.get_statuses() == [PaymentStatus.approved, PaymentStatus.failed, PaymentStatus.approved]
+        assert gateway.charges == Counter({"stub:12/99:4242": 2, "stub:12/99:1111": 1})
+        assert worker.errors == 1
+        assert await worker.settle_batch() == 0
+
+    async def test_start_and_stop(self, test_db) -> None:
+        """Ensure the background loops settle Payments until stopped."""
+        await self.create_pending(test_db, ["************4242"] * 3)
+        worker = self.get_worker()
+
+        worker.start()
+        for _ in range(100):
+            if worker.settled == 3:  # noqa: PLR2004
+                break
+            await asyncio.sleep(0.01)
+        await worker.stop()
+
+        assert worker.running is False
+        assert await self.get_statuses() == [PaymentStatus.approved] * 3
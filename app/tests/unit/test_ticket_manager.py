@@ -0,0 +1,121 @@
+"""Test the TicketManager class."""
+
+from datetime import date, datetime, time
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy import select
+
+from managers.ticket_manager import TicketErrorMessages, TicketManager
+from managers.user import pwd_context
+from models import Event, Ticket, User
+from utils.enums import EventStatus, RoleType, TickedStatus
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestTicketManager:
+    """Test the TicketManager class."""
+
+    async def create_event(self, test_db, ticked_count: int, event_status=EventStatus.not_started) -> None:
+        """Create a user (id 1) and an event (id 1) with `ticked_count` seats."""
+        test_db.add(
+            User(
+                email="buyer@example.com",
+                first_name="Test",
+                last_name="Buyer",
+                password=pwd_context.hash("test12345!"),
+                verified=True,
+                role=RoleType.organizer,
+            )
+        )
+        await test_db.flush()
+        test_db.add(
+            Event(
+                title="Test event",
+                description="Test event description",
+                category="Concerts",
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 1, 2),
+                time=time(18, 0),
+                ticked_price=10,
+                ticked_count=ticked_count,
+                location="Tashkent",
+                organizer_id=1,
+                status=event_status,
+            )
+        )
+        await test_db.flush()
+
+    async def test_buy_ticket(self, test_db) -> None:
+        """Ensure buying a ticket creates it and takes a seat."""
+        await self.create_event(test_db, 2)
+
+        ticket = await TicketManager.buy_ticket(1, 1, test_db)
+
+        assert isinstance(ticket, Ticket)
+        assert ticket.event_id == 1
+        assert ticket.user_id == 1
+        event = await test_db.get(Event, 1)
+        await test_db.refresh(event)
+        assert event.ticked_count == 1
+
+    async def test_cant_oversell(self, test_db) -> None:
+        """Ensure only `ticked_count` tickets can be bought."""
+        await self.create_event(test_db, 2)
+        await TicketManager.buy_ticket(1, 1, test_db)
+        await TicketManager.buy_ticket(1, 1, test_db)
+
+        with pytest.raises(HTTPException, match=TicketErrorMessages.SOLD_OUT) as exc:
+            await TicketManager.buy_ticket(1, 1, test_db)
+
+        assert exc.value.status_code == status.HTTP_409_CONFLICT
+        assert len(await TicketManager.get_user_tickets(1, 1, test_db)) == 2  # noqa: PLR2004
+
+    async def test_event_not_on_sale(self, test_db) -> None:
+        """Ensure tickets can't be bought for a finished event."""
+        await self.create_event(test_db, 2, EventStatus.finished)
+
+        with pytest.raises(HTTPException, match=TicketErrorMessages.NOT_ON_SALE):
+            await TicketManager.buy_ticket(1, 1, test_db)
+
+    async def test_event_not_found(self, test_db) -> None:
+        """Ensure buying for a missing event is a 404."""
+        with pytest.raises(HTTPException, match=TicketErrorMessages.EVENT_INVALID) as exc:
+            await TicketManager.buy_ticket(1, 1, test_db)
+
+        assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_buy_tickets(self, test_db) -> None:
+        """Ensure several tickets are bought at once."""
+        await self.create_event(test_db, 5)
+
+        result = await TicketManager.buy_tickets(1, 1, 3, test_db)
+
+        assert result["event_id"] == 1
+        assert [ticket["id"] for ticket in result["tickets"]] == [1, 2, 3]
+        event = await test_db.get(Event, 1)
+        await test_db.refresh(event)
+        assert event.ticked_count == 2  # noqa: PLR2004
+
+    async def test_bought_tickets_status_and_time(self, test_db) -> None:
+        """Ensure one or many bought tickets are not_available and stamped with the app's clock."""
+        await self.create_event(test_db, 5)
+        before = datetime.now()
+
+        await TicketManager.buy_ticket(1, 1, test_db)
+        await TicketManager.buy_tickets(1, 1, 2, test_db)
+
+        tickets = (await test_db.execute(select(Ticket).execution_options(populate_existing=True))).scalars().all()
+        assert [ticket.status for ticket in tickets] == [TickedStatus.not_available] * 3
+        assert all(before <= ticket.created_at <= datetime.now() for ticket in tickets)
+
+    async def test_buy_tickets_not_enough_seats(self, test_db) -> None:
+        """Ensure nothing is bought when there are too few seats."""
+        await self.create_event(test_db, 2)
+
+        with pytest.raises(HTTPException, match=TicketErrorMessages.NOT_ENOUGH_SEATS) as exc:
+            await TicketManager.buy_tickets(1, 1, 3, test_db)
+
+        assert exc.value.status_code == status.HTTP_409_CONFLICT
+        assert await TicketManager.get_user_tickets(1, 1, test_db) == []
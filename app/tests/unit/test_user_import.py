@@ -0,0 +1,137 @@
+"""Test the bulk User importer."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy import select
+
+from managers.password import import_password_hasher, password_hasher
+from managers.user import pwd_context
+from managers.user_import import ImportErrorMessages, UserImporter, check_row, guess_format, parse_rows
+from models import User
+from settings import get_settings
+
+CSV = """email,password,first_name,last_name
+one@example.com,test12345!,One,User
+not-an-email,test12345!,Bad,Email
+two@example.com,test12345!,Two,User
+one@example.com,test12345!,Again,User
+taken@example.com,test12345!,Taken,User
+three@example.com,,No,Password
+"""
+
+
+@pytest.mark.unit()
+class TestParsing:
+    """Test reading and checking the rows of an import file."""
+
+    def test_parse_csv(self) -> None:
+        """Ensure CSV rows are read with their line numbers."""
+        rows = list(parse_rows(CSV, "csv"))
+
+        assert len(rows) == 6  # noqa: PLR2004
+        assert rows[0] == (2, {"email": "one@example.com", "password": "test12345!", "first_name": "One", "last_name": "User"})
+
+    def test_parse_ndjson(self) -> None:
+        """Ensure NDJSON lines are read and broken lines are flagged."""
+        content = json.dumps({"email": "one@example.com"}) + "\n\n{broken\n[1, 2]\n"
+
+        rows = list(parse_rows(content, "ndjson"))
+
+        assert rows == [(1, {"email": "one@example.com"}), (3, None), (4, None)]
+
+    @pytest.mark.parametrize(
+        ("row", "error"),
+        [
+            (None, ImportErrorMessages.BAD_JSON),
+            ({"email": "a@example.com"}, ImportErrorMessages.MISSING_FIELDS.format(fields="password, first_name, last_name")),
+            ({"email": "nope", "password": "x", "first_name": "A", "last_name": "B"}, ImportErrorMessages.EMAIL_INVALID),
+            (
+                {"email": "a@example.com", "password": "x", "first_name": "A" * 31, "last_name": "B"},
+                ImportErrorMessages.TOO_LONG.format(field="first_name", length=30),
+            ),
+            ({"email": " a@example.com ", "password": "x", "first_name": "A", "last_name": "B"}, ""),
+        ],
+    )
+    def test_check_row(self, row, error: str) -> None:
+        """Ensure each kind of bad row gets its error."""
+        assert check_row(row)[1] == error
+
+    def test_guess_format(self) -> None:
+        """Ensure the format is taken from the file extension."""
+        assert guess_format("users.csv") == "csv"
+        assert guess_format("users.jsonl") == "ndjson"
+        with pytest.raises(ValueError):  # noqa: PT011
+            guess_format("users.xlsx")
+
+
+@pytest.mark.unit()
+@pytest.mark.asyncio()
+class TestUserImporter:
+    """Test importing Users into the database."""
+
+    async def test_import_users(self, test_db) -> None:
+        """Ensure valid rows are created and every bad row is reported."""
+        test_db.add(
+            User(
+                email="taken@example.com",
+                first_name="Taken",
+                last_name="User",
+                password=pwd_context.hash("test12345!"),
+                verified=True,
+            )
+        )
+        await test_db.flush()
+
+        summary = await UserImporter.import_users(CSV, "csv", test_db)
+
+        assert summary["received"] == 6  # noqa: PLR2004
+        assert summary["created"] == 2  # noqa: PLR2004
+        assert [(error["line"], error["error"]) for error in summary["errors"]] == [
+            (3, ImportErrorMessages.EMAIL_INVALID),
+            (5, ImportErrorMessages.DUPLICATE_IN_FILE),
+            (6, ImportErrorMessages.EMAIL_EXISTS),
+            (7, ImportErrorMessages.MISSING_FIELDS.format(fields="password")),
+        ]
+
+    async def test_imported_users_can_log_in(self, test_db) -> None:
+        """Ensure imported users are verified and have a hashed password."""
+        await UserImporter.import_users(CSV, "csv", test_db)
+
+        user = (await test_db.scalars(select(User).where(User.email == "one@example.com"))).one()
+
+        assert user.verified is True
+        assert user.banned is False
+        assert pwd_context.verify("test12345!", user.password)
+
+    async def test_passwords_hashed_in_chunks_on_import_pool(self, test_db, mocker) -> None:
+        """Ensure the passwords are hashed on the import pool, a chunk at a time, not on the login pool."""
+        mocker.patch.object(get_settings(), "user_import_hash_chunk_size", 1)
+        login_hash = mocker.spy(password_hasher, "hash")
+        running = peak = 0
+
+        async def hash_one(password: str) -> str:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return pwd_context.hash(password)
+
+        import_hash = mocker.patch.object(import_password_hasher, "hash", side_effect=hash_one)
+
+        summary = await UserImporter.import_users(CSV, "csv", test_db)
+
+        assert summary["created"] == 3  # noqa: PLR2004
+        assert import_hash.call_count == 3  # noqa: PLR2004
+        assert login_hash.call_count == 0
+        assert peak == 1
+
+    async def test_import_too_many_rows(self, test_db) -> None:
+        """Ensure a file over the row limit is rejected."""
+        with pytest.raises(HTTPException) as exc_info:
+            await UserImporter.import_users(CSV, "csv", test_db, max_rows=5)
+
+        assert exc_info.value.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
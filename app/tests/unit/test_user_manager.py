@@ -2,7 +2,9 @@
 
 import pytest
 from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import update
 
+from database.helpers import UserDB
 from managers.user import ErrorMessages, UserManager, pwd_context
 from utils.enums import RoleType
 from models import User
@@ -135,6 +137,15 @@ class TestUserManager:  # pylint: disable=too-many-public-methods
         with pytest.raises(HTTPException, match=ErrorMessages.AUTH_INVALID):
             await UserManager.login(self.test_user, test_db)
 
+    async def test_login_reads_ban_from_database(self, test_db) -> None:
+        """Ensure a ban made where this process can't drop the cache blocks the login."""
+        await UserManager.register(self.test_user, test_db)
+        await UserDB.get(test_db, email=self.test_user["email"])
+        await test_db.execute(update(User).where(User.id == 1).values(banned=True))
+
+        with pytest.raises(HTTPException, match=ErrorMessages.AUTH_INVALID):
+            await UserManager.login(self.test_user, test_db)
+
     # -------------------------- test delete method -------------------------- #
     async def test_delete_user(self, test_db) -> None:
         """Test deleting a user."""
@@ -0,0 +1,328 @@
+"""A small cache layer: bounded in-process storage and a Redis backend.
+
+`TTLCache` is the in-process store. `CacheBackend` is what a shared cache has
+to provide; `MemoryBackend` puts it on a `TTLCache`, `RedisBackend` on a
+Redis-compatible client. `Cache` is one namespace of a backend with its own
+TTL and hit/miss counters, which is what the rest of the code uses.
+
+Every entry can carry tags, and invalidating a tag drops every entry that
+has it, whichever namespace it is in.
+"""
+
+import pickle
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any, Optional, Protocol
+
+
+class TTLCache:
+    """Least-recently-used cache whose entries expire after `ttl` seconds.
+
+    This is only safe to share between coroutines on one event loop; it is
+    not meant to be used from several threads. A `max_size` or `ttl` of 0
+    disables the cache.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """Create an empty cache."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if the cache stores anything at all."""
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires, value, _ = entry
+        if expires <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        """Store a value, evicting the least recently used one if full.
+
+        `ttl` overrides the cache's own TTL for this entry.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if not self.enabled or ttl <= 0:
+            return
+
+        self._remove(key)
+        tags = tuple(tags)
+        self._data[key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._data) > self.max_size:
+            self._remove(next(iter(self._data)))
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key if it is cached."""
+        self._remove(key)
+
+    def invalidate(self, tag: str) -> int:
+        """Remove every entry with this tag and return how many there were."""
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove a key and forget it in the tag index."""
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        self._data.clear()
+        self._tags.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def count(self, prefix: str) -> int:
+        """Return the number of string keys that start with `prefix`."""
+        return sum(1 for key in self._data if isinstance(key, str) and key.startswith(prefix))
+
+    def stats(self) -> dict[str, Any]:
+        """Return the size and hit/miss counters of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CacheBackend(Protocol):
+    """Storage shared by every `Cache` namespace."""
+
+    name: str
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the value stored under `key`, or None."""
+
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()) -> None:
+        """Store a value for `ttl` seconds, tagged with `tags`."""
+
+    async def delete(self, key: str) -> None:
+        """Remove a key."""
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        """Remove every entry that has one of `tags`."""
+
+    async def clear(self) -> None:
+        """Remove every entry."""
+
+    async def stats(self, prefix: str) -> dict[str, Any]:
+        """Return the size of the keys under `prefix`, the capacity and the evictions."""
+
+
+class MemoryBackend:
+    """Keep entries in this process, in a size-bounded LRU `TTLCache`."""
+
+    name = "memory"
+
+    def __init__(self, max_size: int) -> None:
+        """Create an empty backend of at most `max_size` entries."""
+        self.store = TTLCache(max_size=max_size, ttl=float("inf"))
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the value stored under `key`, or None."""
+        return self.store.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()) -> None:
+        """Store a value for `ttl` seconds, tagged with `tags`."""
+        self.store.set(key, value, ttl=ttl, tags=tags)
+
+    async def delete(self, key: str) -> None:
+        """Remove a key."""
+        self.store.delete(key)
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        """Remove every entry that has one of `tags`."""
+        for tag in tags:
+            self.store.invalidate(tag)
+
+    async def clear(self) -> None:
+        """Remove every entry."""
+        self.store.clear()
+
+    async def stats(self, prefix: str) -> dict[str, Any]:
+        """Return the size of the keys under `prefix`, the capacity and the evictions."""
+        return {"size": self.store.count(prefix), "max_size": self.store.max_size, "evictions": self.store.evictions}
+
+
+class RedisBackend:
+    """Keep entries in Redis, so every worker shares them.
+
+    `client` is a `redis.asyncio.Redis` or anything with the same methods.
+    Values are pickled, so only point this at a Redis the app alone writes
+    to. Each tag is a Redis set of the keys that have it. Redis evicts by
+    memory, not by entry count, so the size bound is its `maxmemory`.
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any, prefix: str = "ems:") -> None:
+        """Use `client`, with every key starting with `prefix`."""
+        self.client = client
+        self.prefix = prefix
+
+    def tag_key(self, tag: str) -> str:
+        """Return the Redis key of the set of keys with this tag."""
+        return f"{self.prefix}tag:{tag}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the value stored under `key`, or None."""
+        raw = await self.client.get(self.prefix + key)
+        return None if raw is None else pickle.loads(raw)  # noqa: S301
+
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()) -> None:
+        """Store a value for `ttl` seconds, tagged with `tags`."""
+        if ttl <= 0:
+            return
+        key = self.prefix + key
+        await self.client.set(key, pickle.dumps(value), px=int(ttl * 1000))
+        for tag in tags:
+            # a tag set lives as long as its longest lived key
+            await self.client.sadd(self.tag_key(tag), key)
+            await self.client.expire(self.tag_key(tag), int(ttl) + 1, nx=True)
+            await self.client.expire(self.tag_key(tag), int(ttl) + 1, gt=True)
+
+    async def delete(self, key: str) -> None:
+        """Remove a key."""
+        await self.client.delete(self.prefix + key)
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        """Remove every entry that has one of `tags`."""
+        for tag in tags:
+            keys = await self.client.smembers(self.tag_key(tag))
+            await self.client.delete(self.tag_key(tag), *keys)
+
+    async def clear(self) -> None:
+        """Remove every entry."""
+        keys = [key async for key in self.client.scan_iter(match=f"{self.prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def stats(self, prefix: str) -> dict[str, Any]:
+        """Return the size of the keys under `prefix`, the capacity and the evictions."""
+        size = 0
+        async for _ in self.client.scan_iter(match=f"{self.prefix}{prefix}*"):
+            size += 1
+        info = await self.client.info("stats")
+        return {"size": size, "max_size": None, "evictions": int(info.get("evicted_keys", 0))}
+
+
+class Cache:
+    """One namespace of a backend, with its own TTL and hit/miss counters.
+
+    Keys are prefixed with the namespace, tags are shared by all of them.
+    A `ttl` of 0 disables the namespace.
+    """
+
+    # counts the calls to `invalidate` in this process, see `get_or_load`
+    changes = 0
+
+    def __init__(self, backend: CacheBackend, namespace: str, ttl: float) -> None:
+        """Create a namespace of `backend`."""
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, key: Hashable) -> str:
+        """Return the backend key of a key of this namespace."""
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None."""
+        if self.ttl <= 0:
+            return None
+        value = await self.backend.get(self.key(key))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: Hashable, value: Any, tags: Iterable[str] = ()) -> None:
+        """Store a value, tagged with `tags`."""
+        if self.ttl > 0:
+            await self.backend.set(self.key(key), value, self.ttl, tags)
+
+    async def delete(self, key: Hashable) -> None:
+        """Remove a key."""
+        await self.backend.delete(self.key(key))
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        load: Callable[[], Awaitable[Optional[Any]]],
+        tags: Callable[[Any], Iterable[str]] = lambda value: (),
+    ) -> Optional[Any]:
+        """Return the cached value, or call `load` and cache what it returns.
+
+        `tags` gives the tags of a loaded value. None is not cached. When an
+        invalidation happens while `load` runs, its result may already be
+        out of date and is not cached either.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        changes = Cache.changes
+        value = await load()
+        if value is not None and changes == Cache.changes:
+            await self.set(key, value, tags(value))
+        return value
+
+    async def stats(self) -> dict[str, Any]:
+        """Return the size, hit/miss counters and evictions of the namespace."""
+        lookups = self.hits + self.misses
+        return {
+            **await self.backend.stats(f"{self.namespace}:"),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the hit/miss counters."""
+        self.hits = self.misses = 0
+
+
+async def invalidate(backend: CacheBackend, *tags: str) -> None:
+    """Remove every entry of `backend`, in any namespace, that has one of `tags`."""
+    Cache.changes += 1
+    await backend.invalidate(tags)
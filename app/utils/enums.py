@@ -33,3 +33,5 @@ class PaymentStatus(Enum):
     approved = "approved"
     declined = "declined"
     out_of_balance = "out_of_balance"
+    # the gateway raised while settling, it is not charged again
+    failed = "failed"
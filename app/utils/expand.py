@@ -0,0 +1,19 @@
+"""Helpers for the `?expand=` query parameter of the read routes."""
+
+from collections.abc import Collection
+from typing import Optional
+
+
+def parse_expand(expand: Optional[str], allowed: Collection[str]) -> frozenset[str]:
+    """Return the relationships named in a comma separated `expand` value.
+
+    Raise ValueError if one of them cannot be expanded.
+    """
+    if not expand:
+        return frozenset()
+
+    names = frozenset(name.strip() for name in expand.split(",") if name.strip())
+    unknown = names - set(allowed)
+    if unknown:
+        raise ValueError(f"Cannot expand {', '.join(sorted(unknown))}, choose from {', '.join(sorted(allowed))}")
+    return names
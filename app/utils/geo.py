@@ -0,0 +1,62 @@
+"""Distances on the Earth and the bounding boxes of a radius search."""
+
+import math
+from typing import NamedTuple
+
+# mean radius, the haversine formula treats the Earth as a sphere
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+class BoundingBox(NamedTuple):
+    """The latitude/longitude ranges that hold every point of a circle.
+
+    `min_lon` is greater than `max_lon` when the box crosses the
+    antimeridian, then the longitudes in it are >= min_lon or <= max_lon.
+    """
+
+    min_lat: float
+    max_lat: float
+    min_lon: float
+    max_lon: float
+
+    @property
+    def wraps(self) -> bool:
+        """Return True if the box crosses the antimeridian."""
+        return self.min_lon > self.max_lon
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two points in km."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> BoundingBox:
+    """Return the smallest latitude/longitude box around a circle.
+
+    A degree of longitude shrinks towards the poles, so the box gets wider
+    with the latitude; when the circle reaches a pole it spans every
+    longitude.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:  # noqa: PLR2004
+        return BoundingBox(max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0)
+
+    # the widest point of the circle is north or south of its centre, where
+    # the meridians are closest, see "Finding Points Within a Distance of a
+    # Latitude/Longitude Using Bounding Coordinates" by J. P. Matuschek
+    delta_lon = math.degrees(math.asin(min(1.0, math.sin(math.radians(delta_lat)) / math.cos(math.radians(lat)))))
+    min_lon, max_lon = lon - delta_lon, lon + delta_lon
+    if max_lon - min_lon >= 360:  # noqa: PLR2004
+        return BoundingBox(min_lat, max_lat, -180.0, 180.0)
+    if min_lon < -180:  # noqa: PLR2004
+        min_lon += 360
+    if max_lon > 180:  # noqa: PLR2004
+        max_lon -= 360
+    return BoundingBox(min_lat, max_lat, min_lon, max_lon)
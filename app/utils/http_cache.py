@@ -0,0 +1,57 @@
+"""Helpers for HTTP validators and conditional GET requests."""
+
+import hashlib
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NamedTuple, Optional
+
+from fastapi import Request
+
+
+class CachedBody(NamedTuple):
+    """A rendered response body with its validators."""
+
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+
+
+def version_etag(versions: Iterable[tuple[int, datetime]], extra: Optional[str] = None) -> str:
+    """Return a strong ETag for rows given as (id, updated_at) pairs.
+
+    `extra` is anything else in the body that can change on its own, such as
+    a pagination cursor.
+    """
+    digest = hashlib.sha1(usedforsecurity=False)
+    for row_id, updated_at in versions:
+        digest.update(f"{row_id}:{updated_at.isoformat()};".encode())
+    if extra is not None:
+        digest.update(extra.encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    """Return a datetime as an HTTP date. Naive datetimes are local time."""
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Return True if the client's copy, going by its request headers, is current.
+
+    If-None-Match wins over If-Modified-Since when both are sent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in tags or "*" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have whole seconds
+    return last_modified.astimezone(timezone.utc).replace(microsecond=0) <= since
@@ -0,0 +1,25 @@
+"""Helpers for keyset (cursor) pagination."""
+
+import base64
+from datetime import date
+
+
+def encode_cursor(start_date: date, item_id: int) -> str:
+    """Return an opaque cursor that points just after the given row."""
+    # formatted, so a datetime at midnight gives the same cursor as its date
+    raw = f"{start_date:%Y-%m-%d}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    """Decode a cursor created by `encode_cursor`.
+
+    Raise ValueError if the cursor is malformed.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        start_date, item_id = raw.split("|")
+        return date.fromisoformat(start_date), int(item_id)
+    except ValueError as exc:
+        raise ValueError("Invalid cursor") from exc
@@ -0,0 +1,81 @@
+"""Time each request and the SQL it runs.
+
+`RequestTimingMiddleware` is pure ASGI, so the route runs in the same task
+and its statements reach the `QueryStats` it sets. Every response gets a
+Server-Timing header with the query count, the database time and the
+slowest statement, and every request is logged with the same figures.
+
+The header is sent before the body, so the queries a streamed body runs
+after it are only in the log.
+"""
+
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.instrumentation import QueryStats, current_queries, shorten
+
+logger = logging.getLogger(__name__)
+
+
+def server_timing(stats: QueryStats, seconds: float) -> str:
+    """Return the Server-Timing header value of a request."""
+    return (
+        f'db;dur={stats.total * 1000:.2f};desc="{stats.count} queries", '
+        f"db-slowest;dur={stats.slowest * 1000:.2f}, "
+        f"total;dur={seconds * 1000:.2f}"
+    )
+
+
+class RequestTimingMiddleware:
+    """Add the Server-Timing header and log every request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Wrap `app`."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the request with its own QueryStats."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_queries.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stats, time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_queries.reset(token)
+            seconds = time.perf_counter() - start
+            logger.info(
+                "%s %s %d %.1fms, %d queries in %.1fms",
+                scope["method"],
+                scope["path"],
+                status_code,
+                seconds * 1000,
+                stats.count,
+                stats.total * 1000,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status_code": status_code,
+                    "duration_ms": round(seconds * 1000, 2),
+                    "db_queries": stats.count,
+                    "db_ms": round(stats.total * 1000, 2),
+                    "db_slowest_ms": round(stats.slowest * 1000, 2),
+                    "db_slowest_statement": shorten(stats.slowest_statement) if stats.slowest_statement else None,
+                },
+            )